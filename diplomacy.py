@@ -7,29 +7,19 @@ Supports classic, fog of war, and gunboat modes.
 Usage:
     python diplomacy.py <command>
     python diplomacy.py help
+
+Command handlers are imported when their command runs, so bookkeeping
+commands (help, status, cleanup, snapshot, stats) never load the agent
+and LLM stack. Check with: python diplomacy.py bench --startup
 """
 
-import os
+import importlib
 import sys
 from pathlib import Path
 
-import google.generativeai as genai
-from dotenv import load_dotenv
-
-from src.agent import DiplomacyAgent
-from src.game_manager import cleanup, initialize_game, show_status
-from src.orchestrator import (
-    randomize_order,
-    run_all_turns,
-    run_country_turn,
-    run_country_reflect,
-    run_all_reflects,
-    run_country_plan,
-    run_all_plans,
-    run_season,
-)
 from src.utils import (
     load_config,
+    ConfigError,
     is_gunboat,
     get_all_countries,
     get_current_season,
@@ -39,6 +29,8 @@ from src.utils import (
     print_section_header,
     print_divider,
     handle_error,
+    read_tail_lines,
+    estimate_tokens,
     OVERSEER_LINE_LIMIT,
 )
 
@@ -49,9 +41,11 @@ from src.utils import (
 
 def run_query(country: str, question: str):
     """Ask a country a direct question from the GM."""
+    from src.agent import DiplomacyAgent
+
     try:
-        agent = DiplomacyAgent(country)
         config = load_config()
+        agent = DiplomacyAgent(country, config)
         season = get_current_season(config)
 
         print(f"\nCurrent Season: {season}")
@@ -69,16 +63,22 @@ def run_query(country: str, question: str):
         handle_error(e, f"query to {country}")
 
 
-def run_reflect(country: str, wipe_void: bool = False):
+def run_reflect(country: str, wipe_void: bool = False, config: dict = None):
     """Run a strategic reflection session for a country.
 
     Thin wrapper around run_country_reflect for backwards compatibility.
     """
-    run_country_reflect(country, wipe_void=wipe_void)
+    from src.orchestrator import run_country_reflect
+
+    run_country_reflect(country, wipe_void=wipe_void, config=config)
 
 
 def overseer():
     """Analyze all conversations for loose ends and unresolved discussions."""
+    from src.llm import get_model
+    from src.scheduler import get_scheduler
+    from src.telemetry import finish_call, track_call
+
     print_section_header("OVERSEER ANALYSIS")
     config = load_config()
 
@@ -93,16 +93,13 @@ def overseer():
     print(f"Analyzing all conversations for loose ends...")
     print(f"Using model: {cheap_model_name}\n")
 
-    # Load API key and configure Gemini
-    load_dotenv()
-    api_key = os.getenv('GEMINI_API_KEY')
-    if not api_key:
-        print("Error: GEMINI_API_KEY not found in .env file")
+    # Shared model handle from the configured LLM backend
+    try:
+        model = get_model(cheap_model_name, config)
+    except ValueError as e:
+        print(f"Error: {e}")
         return
 
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel(cheap_model_name)
-
     # Get all conversation files
     conv_dir = get_conversations_dir(config)
     if not conv_dir.exists():
@@ -117,10 +114,8 @@ def overseer():
     # Read all conversations
     all_conversations = []
     for conv_file in sorted(conv_files):
-        content = conv_file.read_text()
-        # Get last N lines
-        lines = content.split('\n')
-        last_lines = lines[-OVERSEER_LINE_LIMIT:] if len(lines) > OVERSEER_LINE_LIMIT else lines
+        # Get last N lines (reads only the tail of the file)
+        last_lines, _ = read_tail_lines(conv_file, OVERSEER_LINE_LIMIT)
         snippet = '\n'.join(last_lines)
 
         all_conversations.append(f"## {conv_file.stem}\n{snippet}\n")
@@ -145,9 +140,13 @@ Based on these conversations, please identify:
 Be concise and focus on actionable insights."""
 
     chat = model.start_chat(history=[])
-    response = chat.send_message(prompt)
+    with track_call(config, None, 'overseer', season, cheap_model_name, prompt) as call:
+        response_text = get_scheduler(config).call(
+            cheap_model_name, lambda: chat.send_message(prompt).text, estimate_tokens(prompt), "Overseer", call)
+        call['response_tokens'] = estimate_tokens(response_text)
+    finish_call(config, call)
 
-    print(response.text)
+    print(response_text)
     print()
 
 
@@ -218,13 +217,25 @@ def show_help(config: dict):
     print("  reflect [country] [--all] [--wipe-void]  Strategic reflection")
     print("  plan [country]      Consider options before diplomacy")
     print("  query <country> \"question\"  Ask a country a direct question")
+    print("  validate [country]  Check orders.md against the units on the board")
+    print("  adjudicate [--dry-run] [--agents]  Resolve orders and write the next game state")
     if not gunboat:
         print("  overseer            Analyze conversations for loose ends")
+    print("  summarize           Update the season summaries of history and conversations")
     print("  status              Show game status and file info")
+    print("  stats [--by phase|season|country|model] [--season S]")
+    print("                      Summarize LLM calls: tokens, latency, retries, parse issues")
+    print("  snapshot list|take|restore <id>|diff <id> [id] [--full]")
+    print("                      Season-start snapshots of the game files")
     print("  init                Initialize game (runs cleanup first)")
     print("  init --no-cleanup   Initialize without running cleanup")
     print("  cleanup             Remove all game files (reset)")
     print("  setup               Install dependencies and configure environment")
+    print("  bench [--seasons N] [--countries N] [--history N] [--latency S] [--parallel]")
+    print("                      Benchmark simulated seasons on the offline stub backend")
+    print("  bench --startup [--budget-ms MS]  Check CLI startup time of the bookkeeping commands")
+    print("  batch <dir> [--games K] [--seasons N] [--workers W] [--set key=value] [--feed DIR]")
+    print("                      Run many games in parallel worker processes (resumable)")
     print("  help, -h, --help    Show this help message")
     print()
     print(f"Countries: {', '.join(countries)}")
@@ -239,20 +250,42 @@ def show_help(config: dict):
 # CLI Dispatcher
 # =============================================================================
 
-# Command dispatch table for simple commands
+# Command dispatch table for simple commands: a function here, or (module, function) imported on use
 COMMANDS = {
-    'randomize': randomize_order,
-    'all': run_all_turns,
-    'season': run_season,
+    'randomize': ('src.game_manager', 'randomize_order'),
+    'all': ('src.orchestrator', 'run_all_turns'),
+    'season': ('src.orchestrator', 'run_season'),
+    'summarize': ('src.summaries', 'update_summaries'),
     'overseer': overseer,
-    'status': show_status,
-    'cleanup': cleanup,
+    'status': ('src.game_manager', 'show_status'),
+    'cleanup': ('src.game_manager', 'cleanup'),
     'setup': setup,
 }
 
+# Commands that take their own argument list: (module, function)
+ARG_COMMANDS = {
+    'bench': ('src.bench', 'main'),
+    'batch': ('src.batch', 'main'),
+    'snapshot': ('src.snapshots', 'snapshot_command'),
+    'stats': ('src.telemetry', 'print_stats'),
+}
+
+
+def load_command(spec):
+    """Return a command handler, importing its module if needed."""
+    if callable(spec):
+        return spec
+    module_name, function_name = spec
+    return getattr(importlib.import_module(module_name), function_name)
+
 
 def main():
-    config = load_config()
+    # Loaded and validated once; every command shares this Config
+    try:
+        config = load_config()
+    except ConfigError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
     countries = get_all_countries(config)
 
     if len(sys.argv) < 2 or sys.argv[1].lower() in ('help', '-h', '--help'):
@@ -261,17 +294,24 @@ def main():
 
     command = sys.argv[1].lower()
 
-    # Check dispatch table first
+    # Check dispatch tables first
     if command in COMMANDS:
-        COMMANDS[command]()
+        load_command(COMMANDS[command])()
+        return
+    if command in ARG_COMMANDS:
+        load_command(ARG_COMMANDS[command])(sys.argv[2:])
         return
 
     # Commands with special handling
     if command == "init":
+        from src.game_manager import initialize_game
+
         skip_cleanup = "--no-cleanup" in sys.argv
         initialize_game(skip_cleanup=skip_cleanup)
 
     elif command == "reflect":
+        from src.orchestrator import run_all_reflects
+
         # Parse flags
         wipe_void = "--wipe-void" in sys.argv
         run_all_from = "--all" in sys.argv
@@ -294,16 +334,18 @@ def main():
                     print("(void.md will be cleared after each reflect)\n")
                 start_index = countries.index(country)
                 for c in countries[start_index:]:
-                    run_reflect(c, wipe_void=wipe_void)
+                    run_reflect(c, wipe_void=wipe_void, config=config)
                     print()
             else:
                 # Single country reflection
-                run_reflect(country, wipe_void=wipe_void)
+                run_reflect(country, wipe_void=wipe_void, config=config)
         else:
             # All countries reflection
-            run_all_reflects(wipe_void=wipe_void)
+            run_all_reflects(wipe_void=wipe_void, config=config)
 
     elif command == "plan":
+        from src.orchestrator import run_all_plans, run_country_plan
+
         # Get non-flag args
         args = [a for a in sys.argv[2:] if not a.startswith('--')]
 
@@ -314,10 +356,28 @@ def main():
                 print(f"Error: '{country_arg}' is not a recognized country")
                 print(f"Countries: {', '.join(countries)}")
                 sys.exit(1)
-            run_country_plan(country)
+            run_country_plan(country, config=config)
         else:
             # All countries plan
-            run_all_plans()
+            run_all_plans(config)
+
+    elif command == "validate":
+        from src.orchestrator import check_orders
+
+        if len(sys.argv) > 2:
+            country = find_country(sys.argv[2], countries)
+            if country is None:
+                print(f"Error: '{sys.argv[2]}' is not a recognized country")
+                print(f"Countries: {', '.join(countries)}")
+                sys.exit(1)
+            check_orders([country], config)
+        else:
+            check_orders(countries, config)
+
+    elif command == "adjudicate":
+        from src.orchestrator import run_adjudication
+
+        run_adjudication(config, with_agents="--agents" in sys.argv, dry_run="--dry-run" in sys.argv)
 
     elif command == "query":
         if len(sys.argv) < 4:
@@ -341,7 +401,9 @@ def main():
             print(f"Countries: {', '.join(countries)}")
             sys.exit(1)
 
-        run_country_turn(country)
+        from src.orchestrator import run_country_turn
+
+        run_country_turn(country, config=config)
 
 
 if __name__ == "__main__":
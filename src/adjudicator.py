@@ -0,0 +1,847 @@
+"""
+Order adjudication for Diplomacy LLM.
+Resolves every country's orders.md against the board in game_state.md and
+writes the next game state and a history entry, so seasons can run without
+a game master editing files by hand.
+
+Phases follow the standard rules:
+- Movement: moves, supports, convoys. Resolved with the guess-and-check
+  algorithm from Lucas Kruijswijk's "The Math of Adjudication", which
+  handles cut supports, head-to-head battles, beleaguered garrisons and
+  circular movement. Convoy paradoxes use the Szykman rule (the convoyed
+  army's move fails). An army moving to an adjacent province goes by convoy
+  if ordered "via convoy" or convoyed by its own country (DATC 4.A.3).
+  Illegal orders are replaced by holds.
+- Retreats: dislodged units retreat or disband. A unit without a valid
+  retreat order disbands; units retreating to the same province all disband.
+- Adjustments (after Fall): supply center ownership is updated, then
+  builds in free owned home centers and disbands. Missing builds are
+  waived; missing disbands remove the units farthest from home (civil
+  disorder rule).
+
+Pending retreats and adjustments are stored in game_state.md (## Dislodged,
+## Adjustments), so each call to adjudicate() resolves exactly one phase.
+
+In fog of war the full board lives in data_dir/paths.board, which agents
+never see; each country gets a filtered game_state.md and history entry
+covering only the provinces it can see.
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from .board import (
+    BoardState,
+    HAS_SPLIT_COASTS,
+    HOME_CENTERS,
+    LOCATION_NAMES,
+    LOCATION_PROVINCE,
+    NEIGHBORS,
+    NUM_PROVINCES,
+    Order,
+    PROVINCE_NAMES,
+    Unit,
+    _bit_indices,
+    can_move,
+    coasts_of,
+    convoy_route_exists,
+    fleet_destinations,
+    format_game_state,
+    is_coastal,
+    is_supply_center,
+    parse_game_state,
+    parse_orders,
+    validate_orders,
+)
+from .context import get_context_cache
+from .utils import (
+    load_config,
+    is_fow,
+    get_all_countries,
+    get_data_dir,
+    get_country_dir,
+    append_line,
+    atomic_write_text,
+)
+
+
+SOLO_CENTERS = 18
+
+UNRESOLVED, GUESSING, RESOLVED = 0, 1, 2
+
+
+# =============================================================================
+# Results
+# =============================================================================
+
+@dataclass
+class PhaseResult:
+    """Outcome of one adjudicated phase.
+
+    lines are (country, text, provinces) so fog-of-war history can show each
+    country only the lines involving provinces it can see.
+    """
+    title: str
+    state: BoardState
+    lines: List[Tuple[str, str, Set[int]]] = field(default_factory=list)
+    notes: List[str] = field(default_factory=list)  # Public lines (center counts, victory)
+
+    def add(self, country: str, text: str, *provinces: int):
+        self.lines.append((country, text, set(provinces)))
+
+    def format(self, countries: List[str], visible: Optional[int] = None) -> str:
+        """History entry; with a visibility bitset, only lines touching visible provinces."""
+        out = [f"## {self.title}", ""]
+        for country in countries:
+            entries = [text for owner, text, provinces in self.lines if owner == country
+                       and (visible is None or any(visible >> p & 1 for p in provinces))]
+            if entries:
+                out += [f"### {country}"] + [f"- {text}" for text in entries] + [""]
+        if len(out) == 2:
+            out += ["*Nothing to report.*", ""]
+        out += self.notes
+        return '\n'.join(out).rstrip() + '\n'
+
+
+# =============================================================================
+# Movement Resolution
+# =============================================================================
+
+class MovementResolver:
+    """Resolves one movement phase. Orders are keyed by the ordered unit's province."""
+
+    def __init__(self, units: Dict[int, Unit], orders: Dict[int, Order]):
+        self.units = units
+        self.orders = orders
+        self.moves_into: Dict[int, List[int]] = {}  # Destination province -> moving units' provinces
+        self.supporters: Dict[int, List[int]] = {}  # Supported unit's province -> supporting units
+        self.convoyers: Dict[int, List[int]] = {}  # Army province -> fleets convoying it
+        for province, order in orders.items():
+            if order.kind == 'move':
+                self.moves_into.setdefault(self.dest(province), []).append(province)
+            elif order.kind == 'support':
+                self.supporters.setdefault(LOCATION_PROVINCE[order.supported], []).append(province)
+            elif order.kind == 'convoy':
+                self.convoyers.setdefault(LOCATION_PROVINCE[order.supported], []).append(province)
+
+        self._state: Dict[int, int] = {}
+        self._resolution: Dict[int, bool] = {}
+        self._deps: List[int] = []
+
+    # --- Order helpers ---
+
+    def dest(self, province: int) -> int:
+        return LOCATION_PROVINCE[self.orders[province].target]
+
+    def is_move(self, province: int) -> bool:
+        order = self.orders.get(province)
+        return order is not None and order.kind == 'move'
+
+    def is_convoy_move(self, province: int) -> bool:
+        order = self.orders[province]
+        if order.kind != 'move' or self.units[province].unit_type != 'A':
+            return False
+        if order.via_convoy or not can_move('A', order.location, self.dest(province)):
+            return True
+        # DATC 4.A.3: an adjacent move is by convoy when its own country ordered a matching convoy
+        country = self.units[province].country
+        return any(self.units[fleet].country == country for fleet in self.convoying_fleets(province))
+
+    def convoying_fleets(self, province: int) -> List[int]:
+        """Fleets ordered to convoy this army's move to its actual destination."""
+        dest = self.dest(province)
+        return [fleet for fleet in self.convoyers.get(province, [])
+                if LOCATION_PROVINCE[self.orders[fleet].supported_target] == dest]
+
+    def head_to_head(self, province: int) -> bool:
+        """Whether the unit at this move's destination is moving straight back, without convoys."""
+        dest = self.dest(province)
+        return (self.is_move(dest) and self.dest(dest) == province
+                and not self.is_convoy_move(province) and not self.is_convoy_move(dest))
+
+    def matching_supports(self, province: int) -> List[int]:
+        """Supports that match what the unit in `province` is actually doing."""
+        moving = self.is_move(province)
+        matches = []
+        for supporter in self.supporters.get(province, []):
+            target = self.orders[supporter].supported_target
+            if moving and target is not None and LOCATION_PROVINCE[target] == self.dest(province):
+                matches.append(supporter)
+            elif not moving and target is None:
+                matches.append(supporter)
+        return matches
+
+    # --- Strengths ---
+
+    def path(self, province: int) -> bool:
+        if not self.is_convoy_move(province):
+            return True
+        fleets = [fleet for fleet in self.convoying_fleets(province) if self.resolve(fleet)]
+        mask = 0
+        for fleet in fleets:
+            mask |= 1 << fleet
+        return convoy_route_exists(province, self.dest(province), mask)
+
+    def hold_strength(self, province: int) -> int:
+        if province not in self.units:
+            return 0
+        if self.is_move(province):
+            return 0 if self.resolve(province) else 1
+        return 1 + sum(1 for s in self.matching_supports(province) if self.resolve(s))
+
+    def attack_strength(self, province: int) -> int:
+        if not self.path(province):
+            return 0
+        dest = self.dest(province)
+        supports = [s for s in self.matching_supports(province) if self.resolve(s)]
+        occupant = self.units.get(dest)
+        if occupant is None or (self.is_move(dest) and not self.head_to_head(province) and self.resolve(dest)):
+            return 1 + len(supports)
+        if occupant.country == self.units[province].country:
+            return 0  # Never dislodge your own unit
+        return 1 + sum(1 for s in supports if self.units[s].country != occupant.country)
+
+    def defend_strength(self, province: int) -> int:
+        return 1 + sum(1 for s in self.matching_supports(province) if self.resolve(s))
+
+    def prevent_strength(self, province: int) -> int:
+        if not self.path(province):
+            return 0
+        if self.head_to_head(province) and self.resolve(self.dest(province)):
+            return 0
+        return 1 + sum(1 for s in self.matching_supports(province) if self.resolve(s))
+
+    # --- Resolution ---
+
+    def _adjudicate(self, province: int) -> bool:
+        order = self.orders[province]
+        if order.kind == 'move':
+            if not self.path(province):
+                return False
+            dest = self.dest(province)
+            attack = self.attack_strength(province)
+            if self.head_to_head(province):
+                if attack <= self.defend_strength(dest):
+                    return False
+            elif attack <= self.hold_strength(dest):
+                return False
+            return all(attack > self.prevent_strength(other)
+                       for other in self.moves_into.get(dest, []) if other != province)
+
+        if order.kind == 'support':
+            target = order.supported_target
+            target = LOCATION_PROVINCE[target] if target is not None else None
+            for attacker in self.moves_into.get(province, []):
+                if self.units[attacker].country == self.units[province].country:
+                    continue
+                if not self.path(attacker):
+                    continue
+                if attacker == target:
+                    # An attack from where the support is aimed only cuts it by dislodging
+                    if self.resolve(attacker):
+                        return False
+                    continue
+                return False
+            return True
+
+        if order.kind == 'convoy':
+            return not any(self.resolve(attacker) for attacker in self.moves_into.get(province, []))
+
+        return True
+
+    def resolve(self, province: int) -> bool:
+        """Resolution of one order: move succeeds, support given, convoy not disrupted."""
+        state = self._state.get(province, UNRESOLVED)
+        if state == RESOLVED:
+            return self._resolution[province]
+        if state == GUESSING:
+            if province not in self._deps:
+                self._deps.append(province)
+            return self._resolution[province]
+
+        old = len(self._deps)
+        self._resolution[province], self._state[province] = False, GUESSING
+        first = self._adjudicate(province)
+
+        if len(self._deps) == old:
+            # No dependency on a guess: the result is final
+            if self._state[province] != RESOLVED:
+                self._resolution[province], self._state[province] = first, RESOLVED
+            return first
+
+        if self._deps[old] != province:
+            # Depends on some other guess further up; let that one decide
+            self._deps.append(province)
+            self._resolution[province] = first
+            return first
+
+        # Part of a cycle started here: try the other guess
+        self._reset(old)
+        self._resolution[province], self._state[province] = True, GUESSING
+        second = self._adjudicate(province)
+        if first == second:
+            self._reset(old)
+            self._resolution[province], self._state[province] = first, RESOLVED
+            return first
+
+        # Both guesses are consistent (or neither is): apply the backup rule
+        self._backup_rule(old)
+        return self.resolve(province)
+
+    def _reset(self, old: int):
+        for province in self._deps[old:]:
+            self._state[province] = UNRESOLVED
+        del self._deps[old:]
+
+    def _backup_rule(self, old: int):
+        cycle = self._deps[old:]
+        del self._deps[old:]
+        # A convoy order in the cycle makes it a paradox; a ring of moves (convoyed or not) is circular movement
+        paradox = any(self.orders[p].kind == 'convoy' for p in cycle)
+        for province in cycle:
+            order = self.orders[province]
+            if not paradox and order.kind == 'move':
+                # Circular movement: every move in the ring succeeds
+                self._resolution[province], self._state[province] = True, RESOLVED
+            elif paradox and (order.kind == 'convoy' or self.is_convoy_move(province)):
+                # Szykman rule: the paradoxical convoy fails and the army stays put
+                self._resolution[province], self._state[province] = False, RESOLVED
+            else:
+                self._state[province] = UNRESOLVED
+
+
+def _retreat_options(unit: Unit, occupied: Set[int], contested: Set[int], attacker_from: Optional[int]) -> List[int]:
+    """Locations a dislodged unit may retreat to."""
+    province = LOCATION_PROVINCE[unit.location]
+    blocked = occupied | contested | ({attacker_from} if attacker_from is not None else set())
+    options = []
+    for neighbor in _bit_indices(NEIGHBORS[province]):
+        if neighbor in blocked:
+            continue
+        if unit.unit_type == 'A':
+            if can_move('A', unit.location, neighbor):
+                options.append(neighbor)
+        else:
+            options.extend(fleet_destinations(unit.location, neighbor))
+    return options
+
+
+def resolve_movement(state: BoardState, orders_by_country: Dict[str, str]) -> Tuple[PhaseResult, BoardState]:
+    """Adjudicate a movement phase. Returns the result lines and the board after it."""
+    result = PhaseResult(f"{state.season} Results", state)
+    orders: Dict[int, Order] = {}
+    labels: Dict[int, str] = {}
+
+    for country in state.countries():
+        report = validate_orders(state, country, orders_by_country.get(country, ""))
+        for order in report.orders:
+            if order.illegal:
+                labels[order.province] = f"illegal: {order.illegal}; holds"
+            else:
+                orders[order.province] = order
+        for unit in report.unordered:
+            labels[LOCATION_PROVINCE[unit.location]] = "no order; holds"
+
+    resolver = MovementResolver(state.units, orders)
+    moved: Dict[int, int] = {}  # Origin province -> new location
+    for province, order in orders.items():
+        if order.kind == 'move' and resolver.resolve(province):
+            # Armies occupy the whole province, even if the order named a coast
+            moved[province] = order.target if order.unit_type == 'F' else LOCATION_PROVINCE[order.target]
+
+    # Dislodged units: a successful move into a province whose unit stayed
+    dislodged_by: Dict[int, int] = {}
+    for origin in moved:
+        dest = LOCATION_PROVINCE[moved[origin]]
+        if dest in state.units and dest not in moved:
+            dislodged_by[dest] = origin
+
+    new_units: Dict[int, Unit] = {}
+    for province, unit in state.units.items():
+        if province in dislodged_by:
+            continue
+        location = moved.get(province, unit.location)
+        new_units[LOCATION_PROVINCE[location]] = Unit(unit.country, unit.unit_type, location)
+
+    # Standoffs leave a province unavailable for retreats
+    contested = set()
+    for dest, movers in resolver.moves_into.items():
+        if dest not in new_units and not any(m in moved for m in movers) \
+                and any(resolver.path(m) for m in movers):
+            contested.add(dest)
+
+    # Result lines, in unit order per country
+    for province, unit in sorted(state.units.items(), key=lambda item: LOCATION_NAMES[item[1].location]):
+        order = orders.get(province)
+        provinces = [province]
+        if order is None:
+            text = f"{unit} H ({labels.get(province, 'holds')})"
+        else:
+            text = _describe(order, unit, state.units)
+            if order.kind == 'move':
+                provinces.append(resolver.dest(province))
+                if province in moved:
+                    text += " (succeeds)"
+                elif not resolver.path(province):
+                    text += " (fails: no convoy)"
+                else:
+                    text += " (bounced)"
+            elif order.kind == 'support':
+                provinces.append(LOCATION_PROVINCE[order.supported])
+                if province not in resolver.matching_supports(LOCATION_PROVINCE[order.supported]):
+                    text += " (void: the supported unit did something else)"
+                elif not resolver.resolve(province):
+                    text += " (cut)"
+            elif order.kind == 'convoy':
+                provinces.append(LOCATION_PROVINCE[order.supported])
+                if not resolver.resolve(province):
+                    text += " (disrupted)"
+        if province in dislodged_by:
+            text += f" (dislodged by {state.units[dislodged_by[province]]})"
+        result.add(unit.country, text, *provinces)
+
+    after = BoardState(season=state.season, units=new_units, centers={c: set(p) for c, p in state.centers.items()})
+    occupied = set(new_units)
+    for province, origin in dislodged_by.items():
+        unit = state.units[province]
+        # A unit may retreat to where its attacker came from only if the attacker was convoyed
+        attacker_from = None if resolver.is_convoy_move(origin) else origin
+        options = _retreat_options(unit, occupied, contested, attacker_from)
+        if options:
+            after.dislodged[province] = (unit, options)
+            result.add(unit.country, f"{unit} must retreat (options: "
+                                     f"{', '.join(LOCATION_NAMES[o] for o in sorted(options, key=LOCATION_NAMES.__getitem__))})",
+                       province)
+        else:
+            result.add(unit.country, f"{unit} is disbanded (no retreat possible)", province)
+    return result, after
+
+
+def _describe(order: Order, unit: Unit, units: Dict[int, Unit]) -> str:
+    """Canonical order text, e.g. 'A Bur S A Par - Mar'."""
+    if order.kind == 'move':
+        return f"{unit} - {LOCATION_NAMES[order.target]}{' via convoy' if order.via_convoy else ''}"
+    if order.kind in ('support', 'convoy'):
+        other = units.get(LOCATION_PROVINCE[order.supported])
+        verb = 'S' if order.kind == 'support' else 'C'
+        if order.supported_target is None:
+            return f"{unit} {verb} {other} H"
+        return f"{unit} {verb} {other} - {LOCATION_NAMES[order.supported_target]}"
+    return f"{unit} H"
+
+
+# =============================================================================
+# Retreats and Adjustments
+# =============================================================================
+
+def _own_orders(orders_text: str, kinds: Tuple[str, ...]) -> List[Order]:
+    orders, _ = parse_orders(orders_text)
+    return [order for order in orders if order.kind in kinds]
+
+
+def resolve_retreats(state: BoardState, orders_by_country: Dict[str, str]) -> Tuple[PhaseResult, BoardState]:
+    """Adjudicate the retreat phase for the units in state.dislodged."""
+    result = PhaseResult(f"{state.season} Retreats", state)
+    retreats: Dict[int, int] = {}  # Dislodged unit's province -> retreat location
+    notes: Dict[int, str] = {}
+
+    for country in state.countries():
+        for order in _own_orders(orders_by_country.get(country, ""), ('retreat', 'move', 'disband')):
+            entry = state.dislodged.get(order.province)
+            if entry is None or entry[0].country != country or order.province in retreats \
+                    or order.province in notes:
+                continue
+            unit, options = entry
+            if order.kind == 'disband':
+                notes[order.province] = "disbands"
+                continue
+            target = order.target
+            if target < NUM_PROVINCES and HAS_SPLIT_COASTS >> target & 1:
+                coasts = [o for o in options if LOCATION_PROVINCE[o] == target]
+                target = coasts[0] if len(coasts) == 1 else target
+            if unit.unit_type == 'A':
+                target = LOCATION_PROVINCE[target]
+            if target in options:
+                retreats[order.province] = target
+            else:
+                notes[order.province] = f"illegal retreat to {LOCATION_NAMES[target]}; disbanded"
+
+    # Units retreating to the same province are all disbanded
+    arrivals: Dict[int, int] = {}
+    for target in retreats.values():
+        arrivals[LOCATION_PROVINCE[target]] = arrivals.get(LOCATION_PROVINCE[target], 0) + 1
+
+    after = BoardState(season=state.season, units=dict(state.units),
+                       centers={c: set(p) for c, p in state.centers.items()})
+    for province, (unit, _) in sorted(state.dislodged.items(), key=lambda item: LOCATION_NAMES[item[1][0].location]):
+        target = retreats.get(province)
+        if target is None:
+            result.add(unit.country, f"{unit} {notes.get(province, 'disbanded (no retreat order)')}", province)
+        elif arrivals[LOCATION_PROVINCE[target]] > 1:
+            result.add(unit.country, f"{unit} R {LOCATION_NAMES[target]} (bounced; disbanded)",
+                       province, LOCATION_PROVINCE[target])
+        else:
+            after.units[LOCATION_PROVINCE[target]] = Unit(unit.country, unit.unit_type, target)
+            result.add(unit.country, f"{unit} R {LOCATION_NAMES[target]} (succeeds)", province, LOCATION_PROVINCE[target])
+    return result, after
+
+
+def home_centers(country: str) -> Set[int]:
+    return {PROVINCE_NAMES.index(name) for name in HOME_CENTERS.get(country, [])}
+
+
+def update_centers(state: BoardState):
+    """After Fall: every supply center with a unit in it now belongs to that unit's country."""
+    for province, unit in state.units.items():
+        if not is_supply_center(province):
+            continue
+        for centers in state.centers.values():
+            centers.discard(province)
+        state.centers.setdefault(unit.country, set()).add(province)
+
+
+def _free_homes(state: BoardState, country: str) -> List[int]:
+    owned = state.centers.get(country, set())
+    return sorted((p for p in home_centers(country) if p in owned and p not in state.units),
+                  key=PROVINCE_NAMES.__getitem__)
+
+
+def pending_adjustments(state: BoardState) -> Dict[str, int]:
+    """Builds (+) and disbands (-) owed by each country; builds capped by free home centers."""
+    adjustments = {}
+    for country in state.countries():
+        delta = len(state.centers.get(country, ())) - len(state.units_of(country))
+        if delta > 0:
+            delta = min(delta, len(_free_homes(state, country)))
+        if delta:
+            adjustments[country] = delta
+    return adjustments
+
+
+def _distance_from_home(state: BoardState, country: str, province: int) -> int:
+    """Steps from the province to the nearest owned home center (any terrain)."""
+    homes = home_centers(country) & state.centers.get(country, set()) or home_centers(country)
+    if not homes:
+        return 0
+    target = 0
+    for home in homes:
+        target |= 1 << home
+    reached = frontier = 1 << province
+    distance = 0
+    while frontier and not frontier & target:
+        expanded = 0
+        for p in _bit_indices(frontier):
+            expanded |= NEIGHBORS[p]
+        frontier = expanded & ~reached
+        reached |= expanded
+        distance += 1
+    return distance
+
+
+def resolve_adjustments(state: BoardState, orders_by_country: Dict[str, str]) -> Tuple[PhaseResult, BoardState]:
+    """Adjudicate builds and disbands listed in state.adjustments."""
+    result = PhaseResult(f"{state.season} Adjustments", state)
+    after = BoardState(season=state.season, units=dict(state.units),
+                       centers={c: set(p) for c, p in state.centers.items()})
+
+    for country in state.countries():
+        count = state.adjustments.get(country, 0)
+        text = orders_by_country.get(country, "")
+        if count > 0:
+            built = 0
+            for order in _own_orders(text, ('build',)):
+                if built >= count:
+                    break
+                problem = _build_problem(after, country, order)
+                if problem:
+                    result.add(country, f"Build {order.unit_type or '?'} {LOCATION_NAMES[order.location]} "
+                                        f"(illegal: {problem})", order.province)
+                    continue
+                after.units[order.province] = Unit(country, order.unit_type, order.location)
+                result.add(country, f"Build {order.unit_type} {LOCATION_NAMES[order.location]}", order.province)
+                built += 1
+            if built < count:
+                result.add(country, f"{count - built} build{'s' if count - built > 1 else ''} waived")
+        elif count < 0:
+            removed = 0
+            for order in _own_orders(text, ('disband',)):
+                unit = after.units.get(order.province)
+                if removed >= -count or unit is None or unit.country != country:
+                    continue
+                del after.units[order.province]
+                result.add(country, f"Disband {unit}", order.province)
+                removed += 1
+            # Civil disorder: farthest from home first, fleets before armies, then alphabetically
+            remaining = sorted(after.units_of(country), key=lambda u: (
+                -_distance_from_home(after, country, LOCATION_PROVINCE[u.location]),
+                u.unit_type != 'F', LOCATION_NAMES[u.location]))
+            for unit in remaining[:-count - removed]:
+                del after.units[LOCATION_PROVINCE[unit.location]]
+                result.add(country, f"Disband {unit} (no disband order)", LOCATION_PROVINCE[unit.location])
+    return result, after
+
+
+def _build_problem(state: BoardState, country: str, order: Order) -> Optional[str]:
+    province = order.province
+    if order.unit_type is None:
+        return "say A or F"
+    if province not in home_centers(country):
+        return f"{PROVINCE_NAMES[province]} is not a {country} home center"
+    if province not in state.centers.get(country, set()):
+        return f"{PROVINCE_NAMES[province]} is not controlled"
+    if province in state.units:
+        return f"{PROVINCE_NAMES[province]} is occupied"
+    if order.unit_type == 'F':
+        if not is_coastal(province):
+            return "fleets can only be built on the coast"
+        if coasts_of(province) and order.location == province:
+            return "specify a coast"
+    elif order.location != province:
+        return "armies don't take a coast"
+    return None
+
+
+# =============================================================================
+# Seasons
+# =============================================================================
+
+def next_season(season: str) -> str:
+    """Spring -> Fall of the same year, Fall/Winter -> Spring of the next."""
+    parts = season.split()
+    if len(parts) != 2 or not parts[1].isdigit():
+        return season
+    name, year = parts[0].lower(), int(parts[1])
+    if name == 'spring':
+        return f"Fall {year}"
+    return f"Spring {year + 1}"
+
+
+def _finish_movement(result: PhaseResult, after: BoardState):
+    """Close the season once there is nothing left to retreat."""
+    if after.dislodged:
+        return
+    season = after.season.split()
+    if season and season[0].lower() == 'fall':
+        update_centers(after)
+        counts = ', '.join(f"{country} {len(centers)}" for country, centers in after.centers.items() if centers)
+        result.notes.append(f"Supply centers: {counts}")
+        for country, centers in after.centers.items():
+            if len(centers) >= SOLO_CENTERS:
+                result.notes.append(f"**{country} controls {len(centers)} supply centers and wins the game.**")
+        after.adjustments = pending_adjustments(after)
+        if after.adjustments:
+            after.season = f"Winter {season[1]}" if len(season) > 1 else after.season
+            return
+    after.season = next_season(after.season)
+
+
+def adjudicate_state(state: BoardState, orders_by_country: Dict[str, str]) -> Tuple[PhaseResult, BoardState]:
+    """Resolve whichever phase the state is in and return the result and the next state."""
+    if state.dislodged:
+        result, after = resolve_retreats(state, orders_by_country)
+        _finish_movement(result, after)
+    elif state.adjustments:
+        result, after = resolve_adjustments(state, orders_by_country)
+        after.season = next_season(after.season)
+    else:
+        result, after = resolve_movement(state, orders_by_country)
+        _finish_movement(result, after)
+    return result, after
+
+
+def phase_name(state: BoardState) -> str:
+    if state.dislodged:
+        return "retreat"
+    if state.adjustments:
+        return "adjustment"
+    return "movement"
+
+
+def phase_countries(state: BoardState) -> List[str]:
+    """Countries with orders to give in a retreat or adjustment phase."""
+    if state.dislodged:
+        return list(dict.fromkeys(unit.country for unit, _ in state.dislodged.values()))
+    return [country for country, count in state.adjustments.items() if count]
+
+
+def phase_options(state: BoardState, country: str) -> str:
+    """What a country may do in the pending retreat or adjustment phase, for its prompt."""
+    if state.dislodged:
+        lines = ["Your dislodged units and where each can retreat:"]
+        for unit, options in state.dislodged.values():
+            if unit.country == country:
+                names = ', '.join(LOCATION_NAMES[o] for o in sorted(options, key=LOCATION_NAMES.__getitem__))
+                lines.append(f"- {unit}: {names} (or disband)")
+        return '\n'.join(lines)
+
+    count = state.adjustments.get(country, 0)
+    centers, units = len(state.centers.get(country, ())), len(state.units_of(country))
+    summary = f"You control {centers} supply centers and have {units} units."
+    if count > 0:
+        homes = ', '.join(PROVINCE_NAMES[p] for p in _free_homes(state, country))
+        return f"{summary} You may build {count} unit{'s' if count > 1 else ''} in: {homes}"
+    units_text = ', '.join(str(u) for u in sorted(state.units_of(country), key=lambda u: LOCATION_NAMES[u.location]))
+    return f"{summary} You must disband {-count} unit{'s' if count < -1 else ''}. Your units: {units_text}"
+
+
+# =============================================================================
+# Files
+# =============================================================================
+
+def get_board_path(config: dict) -> Path:
+    """Authoritative board: the shared game_state.md, or a hidden file in fog of war."""
+    data_dir = get_data_dir(config)
+    if is_fow(config):
+        return data_dir / config['paths'].get('board', '_board.md')
+    return data_dir / config['paths']['game_state']
+
+
+def visible_provinces(state: BoardState, country: str) -> int:
+    """Bitset of provinces a country sees: its units, centers and home centers plus their neighbors."""
+    seen = 0
+    for province in ([LOCATION_PROVINCE[u.location] for u in state.units_of(country)]
+                     + list(state.centers.get(country, ()))):
+        seen |= 1 << province | NEIGHBORS[province]
+    for province in home_centers(country):
+        seen |= 1 << province
+    return seen
+
+
+def filter_state(state: BoardState, country: str, visible: int) -> BoardState:
+    """The part of the board a country can see."""
+    return BoardState(
+        season=state.season,
+        units={p: u for p, u in state.units.items() if u.country == country or visible >> p & 1},
+        centers={c: {p for p in ps if c == country or visible >> p & 1} for c, ps in state.centers.items()},
+        dislodged={p: d for p, d in state.dislodged.items() if d[0].country == country},
+        adjustments={c: n for c, n in state.adjustments.items() if c == country},
+    )
+
+
+MET_HEADING = "## Countries you've met"
+
+
+def met_countries(text: Optional[str], countries: List[str]) -> Set[str]:
+    """Countries listed under "## Countries you've met" in a country's game_state.md."""
+    met: Set[str] = set()
+    listed = False
+    for line in (text or '').split('\n'):
+        line = line.strip()
+        if line.startswith('#'):
+            listed = line.lower() == MET_HEADING.lower()
+        elif listed:
+            name = line.lstrip('-* ').rstrip(':').strip()
+            if name in countries:
+                met.add(name)
+    return met
+
+
+def format_fow_view(view: BoardState, countries: List[str], country: str, visible: int, met: Set[str]) -> str:
+    """A country's game_state.md in fog of war: its view of the board, what it sees and whom it has met."""
+    lines = [format_game_state(view, countries, f"# Current Game State - {country}\n"
+                                                f"# Only provinces you can see are listed; other provinces may hold units."),
+             "## Visible",
+             "# A province listed here without a unit under ## Units is empty.",
+             ', '.join(sorted(PROVINCE_NAMES[p] for p in _bit_indices(visible))),
+             "",
+             MET_HEADING]
+    lines += [f"- {other}" for other in countries if other in met] or ["None yet"]
+    return '\n'.join(lines) + '\n'
+
+
+def write_board(config: dict, state: BoardState, result: Optional[PhaseResult] = None,
+                before: Optional[BoardState] = None):
+    """Write the board (and per-country views in fog of war), appending the result to history."""
+    countries = get_all_countries(config)
+    data_dir = get_data_dir(config)
+    cache = get_context_cache()
+    board_path = get_board_path(config)
+    atomic_write_text(board_path, format_game_state(state, countries))
+    cache.invalidate(board_path)
+
+    if not is_fow(config):
+        if result is not None:
+            history_path = data_dir / config['paths']['game_history']
+            append_line(history_path, '\n' + result.format(countries))
+            cache.invalidate(history_path)
+        return
+
+    for country in countries:
+        country_dir = get_country_dir(config, country)
+        if not country_dir.exists():
+            continue
+        visible = visible_provinces(state, country) | (visible_provinces(before, country) if before else 0)
+        visible_now = visible_provinces(state, country)
+        view = filter_state(state, country, visible_now)
+        state_path = country_dir / config['paths']['game_state']
+
+        # Met: whoever was listed before (by the GM or an earlier phase) plus every country seen now
+        met = met_countries(cache.read(state_path), countries)
+        met |= {unit.country for unit in view.units.values()}
+        met |= {other for other, provinces in view.centers.items() if provinces}
+        met.discard(country)
+
+        atomic_write_text(state_path, format_fow_view(view, countries, country, visible_now, met))
+        cache.invalidate(state_path)
+        if result is not None:
+            history_path = country_dir / config['paths']['game_history']
+            append_line(history_path, '\n' + result.format(countries, visible))
+            cache.invalidate(history_path)
+
+
+def read_orders(config: dict, countries: List[str]) -> Dict[str, str]:
+    orders_file = config['paths']['orders']
+    orders = {}
+    for country in countries:
+        path = get_country_dir(config, country) / orders_file
+        orders[country] = path.read_text() if path.exists() else ""
+    return orders
+
+
+def clear_orders(config: dict, countries: List[str]):
+    """Empty each country's orders.md so old orders can't leak into the next phase."""
+    orders_file = config['paths']['orders']
+    for country in countries:
+        path = get_country_dir(config, country) / orders_file
+        if path.exists():
+            atomic_write_text(path, "")
+            get_context_cache().invalidate(path)
+
+
+def load_board(config: dict) -> Optional[BoardState]:
+    path = get_board_path(config)
+    if not path.exists():
+        return None
+    return parse_game_state(path.read_text())
+
+
+def adjudicate(config: dict = None, dry_run: bool = False) -> Optional[PhaseResult]:
+    """Adjudicate the board's current phase from every country's orders.md.
+
+    Writes the next game_state.md and appends the results to game_history.md
+    (filtered per country in fog of war) unless dry_run is set.
+    """
+    if config is None:
+        config = load_config()
+    state = load_board(config)
+    if state is None or not state.units:
+        print(f"  ! No units found in {get_board_path(config)}; nothing to adjudicate")
+        return None
+    for issue in state.issues:
+        print(f"  ! {issue}")
+
+    countries = get_all_countries(config)
+    result, after = adjudicate_state(state, read_orders(config, countries))
+    print(result.format(countries).rstrip())
+    print()
+
+    if dry_run:
+        print("  (dry run: nothing written)")
+        return result
+
+    write_board(config, after, result, before=state)
+    if config.get('adjudication', {}).get('clear_orders', True):
+        clear_orders(config, countries)
+    print(f"  ✓ Wrote {get_board_path(config).name} ({after.season}, next phase: {phase_name(after)})")
+    return result
@@ -1,23 +1,26 @@
 """
 Agent manager for Diplomacy countries.
-Manages Gemini chat sessions and handles country actions.
+Manages LLM chat sessions (Gemini or the offline stub) and handles country actions.
 Supports classic, fog of war, gunboat modes (and combinations).
 """
 
-import os
-import re
-import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Tuple, TypeVar
-import google.generativeai as genai
-from dotenv import load_dotenv
-import yaml
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
-from .context import ContextLoader
+from . import timing
+from .config import Config, load_config
+from .context import ContextLoader, get_context_cache
+from .conversations import get_conversation_index
+from .llm import get_model
 from .mode_loader import ModeLoader
-from .utils import get_country_dir
-
-T = TypeVar('T')
+from .prefix_cache import get_prefixed_model
+from .response_cache import PermanentLLMError
+from .response_parser import ParsedTag, ParseIssue, ResponseParser, parse_tags
+from .scheduler import get_scheduler
+from .sessions import ChatSession, end_session, get_session, get_session_settings, save_session
+from .telemetry import finish_call, track_call
+from .utils import get_country_dir, append_line, atomic_write_text, estimate_tokens, get_current_season
 
 
 # Files that cannot be modified by the agent
@@ -27,173 +30,289 @@ RESERVED_FILES = {'game_history.md', 'game_state.md'}
 class DiplomacyAgent:
     """Manages a single country's LLM session and actions."""
 
-    def __init__(self, country: str, config_path: str = "config.yaml", use_cheap_model: bool = False):
+    def __init__(self, country: str, config: Union[Config, str, None] = None, use_cheap_model: bool = False):
+        """config is the shared Config, or a path to load it from (default config.yaml)."""
         self.country = country
+        self.config = config if isinstance(config, Config) else load_config(config or "config.yaml")
 
-        # Load config
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
-
-        # Load API key
-        load_dotenv()
-        api_key = os.getenv('GEMINI_API_KEY')
-        if not api_key:
-            raise ValueError("GEMINI_API_KEY not found in .env file")
-
-        # Configure Gemini
-        genai.configure(api_key=api_key)
-        model_name = self.config.get('cheap_model', self.config['model']) if use_cheap_model else self.config['model']
-        self.model = genai.GenerativeModel(model_name)
+        # Shared model handle from the configured LLM backend (see src/llm.py)
+        self.model_name = self.config.get('cheap_model', self.config['model']) if use_cheap_model else self.config['model']
+        self.model = get_model(self.model_name, self.config)
         self.chat = None  # Will be initialized when needed
+        self.cached_prefix = ''  # Context prefix the current chat continues after (see _open_chat)
+        self.session: Optional[ChatSession] = None  # Persistent chat for the season (llm.sessions)
 
         # Context loader
-        self.context_loader = ContextLoader(country, config_path)
+        self.context_loader = ContextLoader(country, self.config)
 
         # Country directory - create on init
         self.country_dir = get_country_dir(self.config, country)
         self.country_dir.mkdir(parents=True, exist_ok=True)
 
-        # Retry settings
-        self.max_retries = self.config.get('api', {}).get('max_retries', 2)
+        # Shared rate limits, retry and backoff for all agents (see src/scheduler.py)
+        self.scheduler = get_scheduler(self.config)
+
+        # Telemetry labels for the current call (see src/telemetry.py)
+        self.phase = None
+        self.season = None
+        self._pending_call = None
+
+    def _send(self, prompt: str, description: str) -> str:
+        """Send a prompt on the current chat through the scheduler and return the response text.
+
+        The .text access is inside the scheduled call because it can also fail.
+        """
+        def get_response():
+            response = self.chat.send_message(prompt)
+            return response.text
+
+        with self._track_call(prompt) as call, timing.timed('llm'):
+            text = self.scheduler.call(self.model_name, get_response, call['prompt_tokens'], description, call)
+            call['response_tokens'] = estimate_tokens(text)
+        self.scheduler.charge(self.model_name, call['response_tokens'])
+        return text
 
-    def _retry(self, fn: Callable[[], T], description: str = "API call") -> T:
-        """Retry a function up to max_retries times on failure."""
-        last_error = None
-        for attempt in range(self.max_retries + 1):
+    async def _send_async(self, prompt: str, description: str) -> str:
+        """Async version of _send."""
+        async def get_response():
+            response = await self.chat.send_message_async(prompt)
+            return response.text
+
+        with self._track_call(prompt) as call, timing.timed('llm'):
+            text = await self.scheduler.call_async(self.model_name, get_response, call['prompt_tokens'],
+                                                   description, call)
+            call['response_tokens'] = estimate_tokens(text)
+        self.scheduler.charge(self.model_name, call['response_tokens'])
+        return text
+
+    def _send_streaming(self, prompt: str, description: str,
+                        on_chunk: Callable[[str], None] = None,
+                        on_tag: Callable[[ParsedTag], None] = None) -> ResponseParser:
+        """Stream a response through the tag parser, via the scheduler.
+
+        on_chunk gets each text chunk as it arrives and on_tag each tag as soon
+        as it closes. A failed call is only retried while no tag has been
+        dispatched, since a retry would apply those actions twice.
+        """
+        def stream_response():
+            parser = ResponseParser()
+            dispatched = False
+            shown = 0  # Response text passed to on_chunk so far
             try:
-                return fn()
+                for chunk in self.chat.send_message(prompt, stream=True):
+                    # Text up to each closing tag is shown before that tag's action runs
+                    for tag in parser.feed(chunk.text):
+                        if on_chunk:
+                            on_chunk(parser.text[shown:tag.end])
+                        shown = tag.end
+                        dispatched = True
+                        if on_tag:
+                            on_tag(tag)
+                    if on_chunk:
+                        on_chunk(parser.text[shown:])
+                    shown = len(parser.text)
+            except PermanentLLMError:
+                raise
             except Exception as e:
-                last_error = e
-                if attempt < self.max_retries:
-                    wait_time = 2 ** attempt  # Exponential backoff: 1s, 2s, 4s...
-                    print(f"  ! {description} failed (attempt {attempt + 1}/{self.max_retries + 1}): {e}")
-                    print(f"    Retrying in {wait_time}s...")
-                    time.sleep(wait_time)
-        raise last_error
+                if dispatched:
+                    raise PermanentLLMError(f"{description} failed after actions were applied: {e}") from e
+                raise
+            parser.close()
+            return parser
+
+        with self._track_call(prompt, streamed=True) as call, timing.timed('llm'):
+            parser = self.scheduler.call(self.model_name, stream_response, call['prompt_tokens'], description, call)
+            call['response_tokens'] = estimate_tokens(parser.text)
+        self.scheduler.charge(self.model_name, call['response_tokens'])
+        return parser
+
+    @contextmanager
+    def _track_call(self, prompt: str, streamed: bool = False) -> Iterator[dict]:
+        """Telemetry for one LLM call; logged by _finish_call once the response is parsed."""
+        history_tokens = self.session.history_tokens if self.session else 0
+        with track_call(self.config, self.country, self.phase, self.season, self.model_name,
+                        prompt, streamed, self.cached_prefix, history_tokens) as call:
+            yield call
+        self._pending_call = call
+
+    def _finish_call(self, issues: Optional[List[str]] = None):
+        """Log the last call's telemetry event with its parse outcome (and keep its chat going)."""
+        call = self._pending_call
+        if call is not None:
+            finish_call(self.config, call, issues)
+            self._pending_call = None
+            if self.phase != 'query':  # A GM query doesn't count as reading the messages
+                self.context_loader.commit_read_cursors()
+            if self.session is not None:
+                sent = call['prompt_tokens'] - call['cached_tokens'] - call['history_tokens']
+                self.session.commit(sent, call['response_tokens'])
+
+    def _open_chat(self, prefix: str) -> str:
+        """Start a fresh chat and return the context the prompt itself must carry.
+
+        With llm.prefix_cache the stable prefix is held by the backend (see
+        src/prefix_cache.py) and the prompt only carries the rest.
+        """
+        self.session = None
+        model = get_prefixed_model(self.model_name, self.config, prefix, self.season)
+        if model is None:
+            self.chat = self.model.start_chat(history=[])
+            self.cached_prefix = ''
+            return prefix
+        self.chat = model.start_chat(history=[])
+        self.cached_prefix = prefix
+        return ''
+
+    def _continue_session(self, prefix: str) -> Optional[str]:
+        """Context update for this country's ongoing chat (llm.sessions), or None to start a new one."""
+        settings = get_session_settings(self.config)
+        if not settings['enabled']:
+            return None
+        session = get_session(self.config, self.country, self.model_name)
+        if session is None:
+            return None
+        if session.stale_reason(self.season, prefix, settings['ttl_seconds']) is None:
+            sections = self.context_loader.context_sections()
+            update = self.context_loader.format_context_update(session.sent, sections)
+            if estimate_tokens(update) <= settings['max_update_tokens']:
+                session.begin(sections)
+                self.session = session
+                self.chat = session.chat
+                self.cached_prefix = session.cached_prefix
+                return update
+        end_session(self.config, self.country, self.model_name)
+        return None
+
+    def _begin_session(self, prefix: str):
+        """Keep the chat just opened as this country's session for the season (llm.sessions)."""
+        if get_session_settings(self.config)['enabled']:
+            self.session = ChatSession(self.chat, self.season, prefix, self.cached_prefix)
+            self.session.begin(self.context_loader.context_sections())
+            save_session(self.config, self.country, self.model_name, self.session)
+
+    def _start_session(self, prompt_name: str, variables: Dict[str, Any]) -> str:
+        """Build the context, start (or continue) a chat and render a phase prompt."""
+        self.phase = prompt_name
+        self.season = get_current_season(self.config)
+        with timing.timed('context'):
+            prefix, rest = self.context_loader.format_context_parts()
+            context = self._continue_session(prefix)
+
+        if context is None:
+            trimmed = self.context_loader.budget_summary()
+            if trimmed:
+                print(f"  ! Context trimmed to token budget (estimated tokens): {trimmed}")
+
+            # Start new chat (the context prefix is either cached or sent with the prompt)
+            context = self._open_chat(prefix) + rest
+            self._begin_session(prefix)
+
+        # Load phase prompt from mode templates
+        with timing.timed('render'):
+            prompt = ModeLoader(self.config).get_prompt(prompt_name, {
+                "context": context,
+                "country": self.country,
+                **variables
+            })
+        timing.record('prompt_chars', len(self.cached_prefix) + len(prompt))
+        return prompt
 
     def initialize_session(self):
         """Initialize or reset the chat session with current context."""
-        context = self.context_loader.format_context()
-        mode_loader = ModeLoader(self.config)
-
-        # Start new chat with full context
-        self.chat = self.model.start_chat(history=[])
-
-        # Load turn prompt from mode templates
-        return mode_loader.get_prompt("turn", {
-            "context": context,
-            "country": self.country
-        })
+        return self._start_session("turn", {})
 
     def initialize_reflect_session(self, wipe_void: bool = False):
         """Initialize a reflection session focused on strategic thinking."""
-        context = self.context_loader.format_context()
-        mode_loader = ModeLoader(self.config)
-
-        # Start new chat with full context
-        self.chat = self.model.start_chat(history=[])
-
-        # Load reflect prompt from mode templates
-        return mode_loader.get_prompt("reflect", {
-            "context": context,
-            "country": self.country,
-            "wipe_void": wipe_void
-        })
+        return self._start_session("reflect", {"wipe_void": wipe_void})
 
     def initialize_react_session(self):
         """Initialize a react session for quick reactions to board state."""
-        context = self.context_loader.format_context()
-        mode_loader = ModeLoader(self.config)
-
-        # Start new chat with full context
-        self.chat = self.model.start_chat(history=[])
-
-        # Load react prompt from mode templates
-        return mode_loader.get_prompt("react", {
-            "context": context,
-            "country": self.country
-        })
+        return self._start_session("react", {})
 
     def initialize_plan_session(self):
         """Initialize a plan session for considering options before diplomacy."""
-        context = self.context_loader.format_context()
-        mode_loader = ModeLoader(self.config)
-
-        # Start new chat with full context
-        self.chat = self.model.start_chat(history=[])
-
         # Check if this is the first season (Spring 1901)
         season = self.config.get('game', {}).get('current_season', '')
         is_first = season.lower().strip() == 'spring 1901'
 
-        # Load plan prompt from mode templates
-        return mode_loader.get_prompt("plan", {
-            "context": context,
-            "country": self.country,
+        return self._start_session("plan", {
             "first_season": is_first,
             "not_first_season": not is_first
         })
 
+    def initialize_orders_session(self, phase: str, options: str):
+        """Initialize a retreat or adjustment session (phase is the template name)."""
+        return self._start_session(phase, {"options": options})
+
     def parse_response(self, response_text: str) -> Dict[str, Any]:
         """Parse XML-style tags from LLM response.
 
-        Extracts MESSAGE and FILE tags from the response text.
+        Extracts MESSAGE, NOTE and FILE tags from the response text in a single
+        pass (see src/response_parser.py).
 
         MESSAGE format: <MESSAGE to="Country1, Country2">content</MESSAGE>
         FILE format: <FILE name="filename.md" mode="append|edit|delete">content</FILE>
+        NOTE format: <NOTE>content</NOTE> (appended to the scratchpad)
 
         Returns:
-            Dict with 'messages' and 'files' lists containing parsed actions.
+            Dict with 'messages' and 'files' lists containing parsed actions,
+            and 'issues' listing malformed or unclosed tags.
         """
+        with timing.timed('parse'):
+            tags, issues = parse_tags(response_text)
+            actions = self._tags_to_actions(tags, issues)
+
+        for issue in actions['issues']:
+            print(f"  ! {self.country}: {issue}")
+        self._finish_call(actions['issues'])
+        return actions
+
+    def _tags_to_actions(self, tags: List[ParsedTag], issues: List[ParseIssue]) -> Dict[str, Any]:
+        """Turn parsed tags into message and file actions, in response order."""
         actions = {
             'messages': [],
-            'files': []
+            'files': [],
+            'issues': [str(issue) for issue in issues]
         }
+        messaging = ModeLoader(self.config).is_feature_enabled("messaging_instructions")
 
-        # Parse MESSAGE tags (skip if messaging disabled)
-        mode_loader = ModeLoader(self.config)
-        if mode_loader.is_feature_enabled("messaging_instructions"):
-            message_pattern = r'<MESSAGE\s+to="([^"]+)"\s*>(.*?)</MESSAGE>'
-            for match in re.finditer(message_pattern, response_text, re.DOTALL | re.IGNORECASE):
-                recipients = match.group(1)
-                message_content = match.group(2).strip()
-
-                # Parse recipient list
-                recipient_list = [r.strip() for r in recipients.split(',')]
-
-                actions['messages'].append({
-                    'to': recipient_list,
-                    'content': message_content
-                })
-
-        # Parse NOTE tags (simple scratchpad notes -> scratchpad file append)
-        note_pattern = r'<NOTE>(.*?)</NOTE>'
-        scratchpad_file = self.config['paths']['scratchpad']
-        for match in re.finditer(note_pattern, response_text, re.DOTALL | re.IGNORECASE):
-            content = match.group(1).strip()
-            if content:
-                actions['files'].append({
-                    'name': scratchpad_file,
-                    'mode': 'append',
-                    'content': content
-                })
-
-        # Parse FILE tags
-        # Supports: <FILE name="x.md">, <FILE name="x.md" mode="append">, etc.
-        file_pattern = r'<FILE\s+name="([^"]+)"(?:\s+mode="([^"]+)")?\s*>(.*?)</FILE>'
-        for match in re.finditer(file_pattern, response_text, re.DOTALL | re.IGNORECASE):
-            filename = match.group(1)
-            mode = match.group(2) or 'append'  # Default to append
-            content = match.group(3).strip()
-
-            actions['files'].append({
-                'name': filename,
-                'mode': mode.lower(),
-                'content': content
-            })
+        for tag in tags:
+            action = self._tag_to_action(tag, messaging)
+            if isinstance(action, str):
+                actions['issues'].append(action)
+            elif action is not None:
+                actions['messages' if tag.name == 'MESSAGE' else 'files'].append(action)
 
         return actions
 
+    def _tag_to_action(self, tag: ParsedTag, messaging: bool):
+        """Action dict for one tag, None if it produces nothing, or an issue string."""
+        content = tag.content.strip()
+
+        if tag.name == 'MESSAGE':
+            if not messaging:
+                return None
+            recipients = [r.strip() for r in tag.attributes.get('to', '').split(',') if r.strip()]
+            if not recipients:
+                return f"MESSAGE without a to=\"...\" attribute at offset {tag.start}"
+            return {'to': recipients, 'content': content}
+
+        if tag.name == 'NOTE':
+            # Simple scratchpad notes -> scratchpad file append
+            if not content:
+                return None
+            return {'name': self.config['paths']['scratchpad'], 'mode': 'append', 'content': content}
+
+        # FILE: <FILE name="x.md">, <FILE name="x.md" mode="append">, etc.
+        filename = tag.attributes.get('name', '').strip()
+        if not filename:
+            return f"FILE without a name=\"...\" attribute at offset {tag.start}"
+        return {
+            'name': filename,
+            'mode': (tag.attributes.get('mode') or 'append').lower(),  # Default to append
+            'content': content
+        }
+
     def execute_actions(self, actions: Dict[str, Any], season: str = None,
                         restrict_files: list = None, append_only_files = None):
         """Execute parsed actions.
@@ -205,6 +324,12 @@ class DiplomacyAgent:
             append_only_files: If True, force append mode for all files.
                                If a list, force append mode for those files (e.g., ['void.md'])
         """
+        with timing.timed('file_io'):
+            self._execute_actions(actions, season, restrict_files, append_only_files)
+
+    def _execute_actions(self, actions: Dict[str, Any], season: str = None,
+                         restrict_files: list = None, append_only_files = None):
+        """Apply messages and file operations (see execute_actions)."""
         # Send messages
         for msg in actions['messages']:
             self.send_message(msg['to'], msg['content'], season)
@@ -239,82 +364,157 @@ class DiplomacyAgent:
 
             self.write_file(filename, file_op['content'], mode)
 
-    def take_turn(self, season: str = None) -> Tuple[str, Dict[str, Any]]:
-        """Take a turn: show context and get LLM response."""
-        prompt = self.initialize_session()
+    def _stream_turn(self, prompt: str, description: str, on_chunk: Callable[[str], None] = None,
+                     on_action: Callable[[Dict[str, Any]], None] = None,
+                     private: bool = False) -> Tuple[str, Dict[str, Any]]:
+        """Stream a turn, handing each action to on_action as soon as its tag closes.
 
-        # Get response from LLM with retry (includes .text access which can also fail)
-        def get_response():
-            response = self.chat.send_message(prompt)
-            return response.text
+        on_action gets an actions dict holding one message or file operation,
+        ready for execute_actions. Private phases drop messages.
 
-        response_text = self._retry(get_response, f"{self.country} turn")
+        Returns:
+            The full response text and all parsed actions (already dispatched).
+        """
+        actions = {'messages': [], 'files': [], 'issues': []}
+        messaging = not private and ModeLoader(self.config).is_feature_enabled("messaging_instructions")
+
+        def on_tag(tag: ParsedTag):
+            action = self._tag_to_action(tag, messaging)
+            if isinstance(action, str):
+                actions['issues'].append(action)
+                print(f"  ! {self.country}: {action}")
+            elif action is not None:
+                kind = 'messages' if tag.name == 'MESSAGE' else 'files'
+                actions[kind].append(action)
+                if on_action:
+                    on_action({'messages': [], 'files': [], 'issues': [], kind: [action]})
+
+        parser = self._send_streaming(prompt, description, on_chunk, on_tag)
+        for issue in parser.issues:
+            actions['issues'].append(str(issue))
+            print(f"  ! {self.country}: {issue}")
+        self._finish_call(actions['issues'])
+        return parser.text, actions
+
+    def take_turn(self, season: str = None, on_chunk: Callable[[str], None] = None,
+                  on_action: Callable[[Dict[str, Any]], None] = None) -> Tuple[str, Dict[str, Any]]:
+        """Take a turn: show context and get LLM response.
+
+        With on_chunk/on_action the response is streamed (see _stream_turn).
+        """
+        prompt = self.initialize_session()
+        if on_chunk or on_action:
+            return self._stream_turn(prompt, f"{self.country} turn", on_chunk, on_action)
+        response_text = self._send(prompt, f"{self.country} turn")
 
         # Parse actions
         actions = self.parse_response(response_text)
 
         return response_text, actions
 
-    def take_reflect_turn(self, wipe_void: bool = False) -> Tuple[str, Dict[str, Any]]:
+    async def take_turn_async(self, season: str = None) -> Tuple[str, Dict[str, Any]]:
+        """Async version of take_turn."""
+        prompt = self.initialize_session()
+        response_text = await self._send_async(prompt, f"{self.country} turn")
+        return response_text, self.parse_response(response_text)
+
+    def take_reflect_turn(self, wipe_void: bool = False, on_chunk: Callable[[str], None] = None,
+                          on_action: Callable[[Dict[str, Any]], None] = None) -> Tuple[str, Dict[str, Any]]:
         """Take a reflection turn focused on strategic thinking.
 
         Args:
             wipe_void: If True, tell agent their void.md will be cleared after response
+            on_chunk, on_action: Stream the response (see _stream_turn)
         """
         prompt = self.initialize_reflect_session(wipe_void=wipe_void)
+        if on_chunk or on_action:
+            return self._stream_turn(prompt, f"{self.country} reflect", on_chunk, on_action, private=True)
+        response_text = self._send(prompt, f"{self.country} reflect")
 
-        # Get response from LLM with retry (includes .text access which can also fail)
-        def get_response():
-            response = self.chat.send_message(prompt)
-            return response.text
+        # Parse actions but filter out messages (reflection is private)
+        actions = self.parse_response(response_text)
+        actions['messages'] = []  # No messaging during reflection
+
+        return response_text, actions
 
-        response_text = self._retry(get_response, f"{self.country} reflect")
+    async def take_reflect_turn_async(self, wipe_void: bool = False) -> Tuple[str, Dict[str, Any]]:
+        """Async version of take_reflect_turn."""
+        prompt = self.initialize_reflect_session(wipe_void=wipe_void)
+        response_text = await self._send_async(prompt, f"{self.country} reflect")
 
-        # Parse actions but filter out messages (reflection is private)
         actions = self.parse_response(response_text)
         actions['messages'] = []  # No messaging during reflection
 
         return response_text, actions
 
-    def take_react_turn(self) -> Tuple[str, Dict[str, Any]]:
+    def take_react_turn(self, on_chunk: Callable[[str], None] = None,
+                        on_action: Callable[[Dict[str, Any]], None] = None) -> Tuple[str, Dict[str, Any]]:
         """Take a react turn for quick reactions to board state.
 
         React turns can only write to void.md and send messages.
+        With on_chunk/on_action the response is streamed (see _stream_turn).
         """
         prompt = self.initialize_react_session()
-
-        # Get response from LLM with retry
-        def get_response():
-            response = self.chat.send_message(prompt)
-            return response.text
-
-        response_text = self._retry(get_response, f"{self.country} react")
+        if on_chunk or on_action:
+            return self._stream_turn(prompt, f"{self.country} react", on_chunk, on_action)
+        response_text = self._send(prompt, f"{self.country} react")
 
         # Parse actions
         actions = self.parse_response(response_text)
 
         return response_text, actions
 
-    def take_plan_turn(self) -> Tuple[str, Dict[str, Any]]:
+    async def take_react_turn_async(self) -> Tuple[str, Dict[str, Any]]:
+        """Async version of take_react_turn."""
+        prompt = self.initialize_react_session()
+        response_text = await self._send_async(prompt, f"{self.country} react")
+        return response_text, self.parse_response(response_text)
+
+    def take_plan_turn(self, on_chunk: Callable[[str], None] = None,
+                       on_action: Callable[[Dict[str, Any]], None] = None) -> Tuple[str, Dict[str, Any]]:
         """Take a plan turn to consider options before diplomacy.
 
         Plan turns can write to any file. No messaging (private phase).
+        With on_chunk/on_action the response is streamed (see _stream_turn).
         """
         prompt = self.initialize_plan_session()
+        if on_chunk or on_action:
+            return self._stream_turn(prompt, f"{self.country} plan", on_chunk, on_action, private=True)
+        response_text = self._send(prompt, f"{self.country} plan")
 
-        # Get response from LLM with retry
-        def get_response():
-            response = self.chat.send_message(prompt)
-            return response.text
+        # Parse actions but filter out messages (plan is private)
+        actions = self.parse_response(response_text)
+        actions['messages'] = []  # No messaging during plan
+
+        return response_text, actions
 
-        response_text = self._retry(get_response, f"{self.country} plan")
+    async def take_plan_turn_async(self) -> Tuple[str, Dict[str, Any]]:
+        """Async version of take_plan_turn."""
+        prompt = self.initialize_plan_session()
+        response_text = await self._send_async(prompt, f"{self.country} plan")
 
-        # Parse actions but filter out messages (plan is private)
         actions = self.parse_response(response_text)
         actions['messages'] = []  # No messaging during plan
 
         return response_text, actions
 
+    def take_orders_turn(self, phase: str, options: str, on_chunk: Callable[[str], None] = None,
+                         on_action: Callable[[Dict[str, Any]], None] = None) -> Tuple[str, Dict[str, Any]]:
+        """Take a retreat or adjustment turn: write orders for the pending phase.
+
+        No messaging (private phase). With on_chunk/on_action the response is
+        streamed (see _stream_turn).
+        """
+        prompt = self.initialize_orders_session(phase, options)
+        if on_chunk or on_action:
+            return self._stream_turn(prompt, f"{self.country} {phase}", on_chunk, on_action, private=True)
+        response_text = self._send(prompt, f"{self.country} {phase}")
+
+        actions = self.parse_response(response_text)
+        actions['messages'] = []  # No messaging between phases
+
+        return response_text, actions
+
     def send_message(self, recipients: List[str], message: str, season: str = None):
         """Send a message to one or more countries.
 
@@ -328,6 +528,8 @@ class DiplomacyAgent:
 
         # If this is a new conversation file, add the season header
         is_new_file = not conv_file.exists()
+        index = get_conversation_index(self.config)
+        dir_mtime = index.dir_mtime() if is_new_file else None
 
         # Format the message
         message_text = f"**{self.country}:** {message}\n\n"
@@ -337,6 +539,9 @@ class DiplomacyAgent:
             if is_new_file and season:
                 f.write(f"## {season}\n")
             f.write(message_text)
+        get_context_cache().invalidate(conv_file)
+        if is_new_file:
+            index.add(conv_file, dir_mtime)
 
         # Format recipients for display
         recipients_str = ', '.join(recipients)
@@ -384,30 +589,25 @@ class DiplomacyAgent:
                 print(f"  ! File {filename} does not exist")
 
         elif mode == 'edit':
-            file_path.write_text(content)
+            atomic_write_text(file_path, content)
             print(f"  ✓ Replaced {filename}")
 
         elif mode == 'append':
-            # Append with newlines
-            if file_path.exists():
-                existing = file_path.read_text()
-                if existing and not existing.endswith('\n'):
-                    existing += '\n'
-                file_path.write_text(existing + content + '\n')
-            else:
-                file_path.write_text(content + '\n')
+            # Append with newlines (only the last byte of the file is read)
+            append_line(file_path, content)
             print(f"  ✓ Appended to {filename}")
 
-    def query(self, question: str) -> str:
-        """Ask the agent a direct question (meta-communication from GM).
-
-        No messages or file operations - just a direct response.
-        """
-        context = self.context_loader.format_context()
+        # Same-size rewrites within one mtime tick would otherwise look unchanged
+        get_context_cache().invalidate(file_path)
 
-        chat = self.model.start_chat(history=[])
+    def initialize_query_session(self, question: str) -> str:
+        """Initialize a GM query session and return the query prompt."""
+        self.phase = 'query'
+        self.season = get_current_season(self.config)
+        prefix, rest = self.context_loader.format_context_parts()
+        context = self._open_chat(prefix) + rest
 
-        prompt = f"""{context}
+        return f"""{context}
 
 ---
 
@@ -417,8 +617,19 @@ The Game Master has a question for you. This is meta-communication - do not send
 
 Question: {question}"""
 
-        def get_response():
-            response = chat.send_message(prompt)
-            return response.text
+    def query(self, question: str) -> str:
+        """Ask the agent a direct question (meta-communication from GM).
 
-        return self._retry(get_response, f"{self.country} query")
+        No messages or file operations - just a direct response.
+        """
+        prompt = self.initialize_query_session(question)
+        response_text = self._send(prompt, f"{self.country} query")
+        self._finish_call()
+        return response_text
+
+    async def query_async(self, question: str) -> str:
+        """Async version of query."""
+        prompt = self.initialize_query_session(question)
+        response_text = await self._send_async(prompt, f"{self.country} query")
+        self._finish_call()
+        return response_text
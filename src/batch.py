@@ -0,0 +1,363 @@
+"""
+Headless batch runner for Diplomacy LLM.
+Runs many independent games, several seasons each, in parallel worker
+processes and aggregates the results.
+
+Layout of a batch directory:
+    <batch>/jobs.json          Batch settings and per-game progress (the job queue)
+    <batch>/summary.json       Aggregated results, rewritten after every game
+    <batch>/game_001/          One isolated game: config.yaml, beginning_info.md,
+                               countries/, turn order, snapshots, telemetry, run.log,
+                               status.json
+
+Each worker process changes into its game's directory, so every CWD-relative
+path (config.yaml, data_dir, turn order, snapshots, response cache) stays
+inside that game. Seasons advance with the adjudicator (adjudication.auto),
+or from a scripted feed of game states.
+
+Batches are resumable: status.json is updated after every season, and
+running the same command again picks up unfinished games. A season that was
+interrupted midway is restarted from the snapshot taken at its start.
+
+Usage:
+    python diplomacy.py batch <dir> [--games K] [--seasons N] [--workers W]
+                                    [--set key=value ...] [--feed DIR] [--seed N]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import shutil
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import yaml
+
+from .config import Config, ConfigError, validate_config
+from .utils import load_config, reload_config, print_section_header, print_divider, atomic_write_text
+
+
+REPO_ROOT = Path(__file__).parent.parent
+
+STATUS_FILE = "status.json"
+LOG_FILE = "run.log"
+
+# Game statuses that need no more work (a game whose feed ran out can't advance either)
+FINISHED = ('done', 'feed_exhausted')
+
+
+# =============================================================================
+# Game Setup
+# =============================================================================
+
+def apply_overrides(config: dict, overrides: List[str]) -> dict:
+    """Apply `section.key=value` overrides; values are parsed as YAML."""
+    for override in overrides:
+        key, sep, value = override.partition('=')
+        if not sep:
+            raise ValueError(f"Override '{override}' is not key=value")
+        target = config
+        parts = key.strip().split('.')
+        for part in parts[:-1]:
+            target = target.setdefault(part, {})
+        target[parts[-1]] = yaml.safe_load(value)
+    return config
+
+
+def game_config(base: Config, overrides: List[str], workers: int, scripted: bool) -> dict:
+    """Config for one game in the batch, derived from the base config.
+
+    Raises ConfigError if the overrides make it invalid, before any game starts.
+    """
+    config = apply_overrides(base.to_dict(), overrides)
+    config.setdefault('adjudication', {})['auto'] = not scripted
+
+    # Rate limits are per process: split the shared budget across the workers
+    limits = (config.get('api', {}) or {}).get('rate_limits') or {}
+    for model_limits in limits.values():
+        for key in ('rpm', 'tpm'):
+            if (model_limits or {}).get(key):
+                model_limits[key] = max(1, model_limits[key] // workers)
+
+    errors = validate_config(config)
+    if errors:
+        raise ConfigError("Invalid batch settings:\n" + '\n'.join(f"  - {e}" for e in errors))
+    return config
+
+
+def beginning_info_path() -> Path:
+    """beginning_info.md from the current directory, else the repo's copy."""
+    local = Path('beginning_info.md')
+    return local if local.exists() else REPO_ROOT / 'beginning_info.md'
+
+
+def create_games(batch_dir: Path, settings: dict) -> List[dict]:
+    """Create the game directories and return their job entries."""
+    base = load_config()
+    config = game_config(base, settings['overrides'], settings['workers'], bool(settings['feed']))
+    beginning_info = beginning_info_path()
+
+    jobs = []
+    for index in range(1, settings['games'] + 1):
+        name = f"game_{index:03d}"
+        game_dir = batch_dir / name
+        game_dir.mkdir(parents=True, exist_ok=True)
+        (game_dir / 'config.yaml').write_text(yaml.safe_dump(config, sort_keys=False))
+        if beginning_info.exists():
+            shutil.copy(beginning_info, game_dir / 'beginning_info.md')
+        jobs.append({'game': name, 'seed': settings['seed'] + index, 'status': 'pending', 'seasons_done': 0})
+    return jobs
+
+
+# =============================================================================
+# Worker
+# =============================================================================
+
+def read_status(game_dir: Path) -> dict:
+    path = game_dir / STATUS_FILE
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def write_status(game_dir: Path, status: dict):
+    atomic_write_text(game_dir / STATUS_FILE, json.dumps(status, indent=2) + '\n')
+
+
+def apply_feed(config: dict, feed_dir: str, season_index: int) -> bool:
+    """Write the scripted state for the season after season_index as the new board."""
+    from .adjudicator import write_board
+    from .board import parse_game_state
+
+    files = sorted(Path(feed_dir).glob('*.md'))
+    if season_index >= len(files):
+        return False
+    write_board(config, parse_game_state(files[season_index].read_text()))
+    print(f"  ✓ Loaded scripted state {files[season_index].name}")
+    return True
+
+
+def game_result(config: dict) -> Dict[str, Any]:
+    """Season, supply center counts and winner from a game's board."""
+    from .adjudicator import SOLO_CENTERS, load_board
+
+    state = load_board(config)
+    if state is None:
+        return {'season': None, 'centers': {}, 'winner': None}
+    centers = {country: len(provinces) for country, provinces in state.centers.items() if provinces}
+    winner = next((country for country, count in centers.items() if count >= SOLO_CENTERS), None)
+    return {'season': state.season, 'centers': centers, 'winner': winner}
+
+
+def run_game(game_dir: str, seasons: int, feed: Optional[str], seed: int) -> dict:
+    """Play one game up to `seasons` seasons. Runs in a worker process."""
+    # Imported here so each worker builds its state after changing directory
+    from .game_manager import initialize_game
+    from .orchestrator import restore_countries, run_season
+    from .scheduler import get_scheduler
+    from .telemetry import flush_telemetry
+
+    game_path = Path(game_dir).resolve()
+    os.chdir(game_path)
+    status = read_status(game_path)
+    status.setdefault('seasons_done', 0)
+    status.setdefault('seconds', 0.0)
+    random.seed(seed + status['seasons_done'])
+
+    scheduler = None
+    calls_before = 0
+    feed_exhausted = False
+    with open(LOG_FILE, 'a') as log, contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        try:
+            # Workers outlive their games: read this game's config.yaml as it is now, not a cached copy
+            config = reload_config()
+            # The scheduler is shared by every game this worker runs; count only this game's calls
+            scheduler = get_scheduler(config)
+            calls_before = scheduler.stats['calls']
+            if not status.get('initialized'):
+                initialize_game(skip_cleanup=True)
+                status['initialized'] = True
+            elif status.get('in_progress'):
+                print(f"Resuming: restarting interrupted season {status['seasons_done'] + 1}")
+                restore_countries(config)
+
+            while status['seasons_done'] < seasons:
+                if game_result(config)['winner']:
+                    break
+                status['in_progress'] = True
+                write_status(game_path, status)
+
+                start = time.perf_counter()
+                run_season(config)
+                if feed and not apply_feed(config, feed, status['seasons_done']):
+                    # No scripted state follows this season: undo it instead of replaying the same board
+                    print(f"Feed has no state after season {status['seasons_done'] + 1}; stopping")
+                    restore_countries(config)
+                    status['in_progress'] = False
+                    feed_exhausted = True
+                    break
+                status['seconds'] += time.perf_counter() - start
+                status['seasons_done'] += 1
+                status['in_progress'] = False
+                write_status(game_path, status)
+
+            status.update(game_result(config))
+            status['status'] = 'feed_exhausted' if feed_exhausted else 'done'
+        except Exception as e:
+            traceback.print_exc()
+            status['status'] = 'failed'
+            status['error'] = f"{type(e).__name__}: {e}"
+        if scheduler is not None:
+            status['llm_calls'] = status.get('llm_calls', 0) + scheduler.stats['calls'] - calls_before
+        flush_telemetry()  # The worker may move on to another game directory
+        write_status(game_path, status)
+    return status
+
+
+# =============================================================================
+# Batch
+# =============================================================================
+
+def load_jobs(batch_dir: Path) -> Optional[dict]:
+    path = batch_dir / 'jobs.json'
+    return json.loads(path.read_text()) if path.exists() else None
+
+
+def save_jobs(batch_dir: Path, jobs: dict):
+    atomic_write_text(batch_dir / 'jobs.json', json.dumps(jobs, indent=2) + '\n')
+
+
+def summarize(jobs: dict) -> Dict[str, Any]:
+    """Aggregate per-game results: completion, timing, center counts and solo wins."""
+    games = jobs['games']
+    finished = [job for job in games if job['status'] in FINISHED]
+    seasons = sum(job.get('seasons_done', 0) for job in games)
+    seconds = sum(job.get('seconds', 0.0) for job in games)
+
+    centers: Dict[str, List[int]] = {}
+    for job in finished:
+        for country, count in (job.get('centers') or {}).items():
+            centers.setdefault(country, []).append(count)
+    wins: Dict[str, int] = {}
+    for job in finished:
+        if job.get('winner'):
+            wins[job['winner']] = wins.get(job['winner'], 0) + 1
+
+    return {
+        'games': len(games),
+        'done': sum(1 for job in games if job['status'] == 'done'),
+        'feed_exhausted': sum(1 for job in games if job['status'] == 'feed_exhausted'),
+        'failed': sum(1 for job in games if job['status'] == 'failed'),
+        'pending': sum(1 for job in games if job['status'] not in FINISHED + ('failed',)),
+        'seasons': seasons,
+        'seconds_per_season': seconds / seasons if seasons else 0.0,
+        'llm_calls': sum(job.get('llm_calls', 0) for job in games),
+        'mean_centers': {country: sum(counts) / len(counts) for country, counts in sorted(centers.items())},
+        'solo_wins': wins,
+        'errors': {job['game']: job['error'] for job in games if job.get('error')},
+    }
+
+
+def print_summary(summary: Dict[str, Any]):
+    print_section_header("BATCH SUMMARY")
+    print(f"Games: {summary['games']} ({summary['done']} done, {summary['feed_exhausted']} feed exhausted, "
+          f"{summary['failed']} failed, {summary['pending']} pending)")
+    print(f"Seasons played: {summary['seasons']}  ({summary['seconds_per_season']:.1f}s per season)")
+    print(f"LLM calls: {summary['llm_calls']}")
+    if summary['mean_centers']:
+        print(f"\n{'Country':<12}{'mean SCs':>10}{'solo wins':>11}")
+        print_divider()
+        for country, mean in summary['mean_centers'].items():
+            print(f"{country:<12}{mean:>10.1f}{summary['solo_wins'].get(country, 0):>11}")
+    for game, error in summary['errors'].items():
+        print(f"  ! {game}: {error}")
+
+
+def run_batch(args: argparse.Namespace):
+    batch_dir = Path(args.batch_dir).resolve()
+    batch_dir.mkdir(parents=True, exist_ok=True)
+    config = load_config()
+    workers = args.workers or config.get('batch', {}).get('workers', 2)
+
+    jobs = load_jobs(batch_dir)
+    if jobs is None:
+        settings = {
+            'games': args.games,
+            'seasons': args.seasons,
+            'workers': workers,
+            'overrides': args.set,
+            'feed': str(Path(args.feed).resolve()) if args.feed else None,
+            'seed': args.seed,
+        }
+        try:
+            jobs = {'settings': settings, 'games': create_games(batch_dir, settings)}
+        except ConfigError as e:
+            print(f"Error: {e}")
+            return
+        print(f"Created {settings['games']} games in {batch_dir}")
+    else:
+        if args.seasons is not None and args.seasons != jobs['settings']['seasons']:
+            jobs['settings']['seasons'] = args.seasons  # Extend (or shorten) a finished batch
+        print(f"Resuming batch in {batch_dir}")
+    settings = jobs['settings']
+    if settings['seasons'] is None:
+        settings['seasons'] = 1
+
+    # Progress in each game's status.json is authoritative (it survives a crashed parent)
+    for job in jobs['games']:
+        job.update(read_status(batch_dir / job['game']))
+        if job['status'] == 'done' and job['seasons_done'] < settings['seasons'] and not job.get('winner'):
+            job['status'] = 'pending'
+    save_jobs(batch_dir, jobs)
+
+    todo = [job for job in jobs['games'] if job['status'] not in FINISHED]
+    print(f"Running {len(todo)} games, {settings['seasons']} seasons each, {workers} workers\n")
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn')) as executor:
+        futures = {
+            executor.submit(run_game, str(batch_dir / job['game']), settings['seasons'], settings['feed'],
+                            job['seed']): job
+            for job in todo
+        }
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                job.update(future.result())
+            except Exception as e:  # Worker process died
+                job.update(status='failed', error=f"{type(e).__name__}: {e}")
+            save_jobs(batch_dir, jobs)
+            if job['status'] == 'done':
+                print(f"  ✓ {job['game']}: {job['seasons_done']} seasons, now {job.get('season')} "
+                      f"({job.get('seconds', 0):.1f}s)")
+            elif job['status'] == 'feed_exhausted':
+                print(f"  ! {job['game']}: feed ran out after {job['seasons_done']} seasons, now {job.get('season')}")
+            else:
+                print(f"  ! {job['game']} failed: {job.get('error')} (see {job['game']}/{LOG_FILE})")
+            atomic_write_text(batch_dir / 'summary.json', json.dumps(summarize(jobs), indent=2) + '\n')
+
+    summary = summarize(jobs)
+    atomic_write_text(batch_dir / 'summary.json', json.dumps(summary, indent=2) + '\n')
+    print_summary(summary)
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="diplomacy.py batch", description="Run many games in parallel")
+    parser.add_argument("batch_dir", help="Directory holding the batch (created if missing, resumed if not)")
+    parser.add_argument("--games", type=int, default=4, help="Number of games (new batches only, default 4)")
+    parser.add_argument("--seasons", type=int, help="Seasons per game (default 1; can be raised on resume)")
+    parser.add_argument("--workers", type=int, help="Worker processes (default batch.workers)")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                        help="Config override for every game, e.g. --set season.turn_rounds=2")
+    parser.add_argument("--feed", help="Directory of scripted game states (*.md, applied in name order) "
+                                       "used instead of the adjudicator")
+    parser.add_argument("--seed", type=int, default=0, help="Base random seed (game N uses seed + N)")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str]):
+    """Entry point for `python diplomacy.py batch`."""
+    run_batch(parse_args(argv))
@@ -0,0 +1,342 @@
+"""
+Season benchmark for Diplomacy LLM.
+Runs simulated seasons against the offline stub backend in a throwaway game
+directory and reports per-phase timings, prompt sizes and seasons/hour.
+
+With --startup it instead times the bookkeeping CLI commands in fresh
+interpreters and fails (exit 1) if one loads the agent/LLM stack or goes
+over --budget-ms.
+
+Usage:
+    python diplomacy.py bench [--seasons N] [--countries N] [--history N]
+                              [--rounds N] [--latency SECONDS] [--parallel] [--stream]
+                              [--json FILE] [--keep]
+    python diplomacy.py bench --startup [--repeat N] [--budget-ms MS]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import yaml
+
+from . import timing
+from .config import Config
+from .context import get_context_cache
+from .scheduler import get_scheduler
+from .utils import load_config, print_section_header, print_divider
+
+
+REPO_ROOT = Path(__file__).parent.parent
+
+STANDARD_COUNTRIES = ["Austria", "England", "France", "Germany", "Italy", "Russia", "Turkey"]
+
+# Phases recorded by DiplomacyAgent, in report order
+PHASES = ["context", "render", "llm", "parse", "file_io"]
+
+# Commands scripts run constantly; none of them should need the agent stack
+STARTUP_COMMANDS = ["help", "status", "randomize", "cleanup", "snapshot list", "stats"]
+
+# Modules a bookkeeping command should never import
+HEAVY_MODULES = ["src.agent", "src.llm", "src.orchestrator", "asyncio", "google.generativeai", "dotenv"]
+
+# Runs one CLI command in a fresh interpreter and reports its time and loaded modules
+STARTUP_PROBE = """
+import contextlib, io, json, runpy, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+sys.argv = ['diplomacy.py'] + {args!r}
+try:
+    with contextlib.redirect_stdout(io.StringIO()):
+        runpy.run_path({script!r}, run_name='__main__')
+except SystemExit:
+    pass
+elapsed = time.perf_counter() - start
+heavy = [name for name in {heavy!r} if name in sys.modules]
+sys.stderr.write(json.dumps({{'seconds': elapsed, 'heavy': heavy}}) + '\\n')
+"""
+
+
+# =============================================================================
+# Synthetic Game Setup
+# =============================================================================
+
+def synthetic_countries(count: int) -> List[str]:
+    """Standard powers for up to 7 countries, numbered powers for large variants."""
+    if count <= len(STANDARD_COUNTRIES):
+        return STANDARD_COUNTRIES[:count]
+    return [f"Power{i:02d}" for i in range(1, count + 1)]
+
+
+def synthetic_game_state(countries: List[str]) -> str:
+    """Game state with three units and centers per country."""
+    if countries == STANDARD_COUNTRIES:
+        return (REPO_ROOT / "beginning_info.md").read_text()
+
+    centers = ["Season: Spring 1901", "", "## Supply Centers"]
+    units = ["", "## Units"]
+    for i, country in enumerate(countries):
+        provinces = [f"P{i:02d}{suffix}" for suffix in "abc"]
+        centers += [country] + [f"- {p}" for p in provinces] + [""]
+        units += [country] + [f"- A {provinces[0]}", f"- F {provinces[1]}", f"- A {provinces[2]}", ""]
+    return '\n'.join(centers + units)
+
+
+def synthetic_history_block(season_index: int, countries: List[str]) -> str:
+    """One season's worth of fake adjudicated orders."""
+    year = 1901 + season_index // 2
+    season = "Spring" if season_index % 2 == 0 else "Fall"
+    lines = [f"\n## {season} {year}\n"]
+    for country in countries:
+        lines.append(f"### {country}")
+        lines.append("- A Xxx - Yyy (succeeds)\n- F Zzz S A Xxx - Yyy\n- A Www H\n")
+    return '\n'.join(lines)
+
+
+def seed_history(data_dir: Path, countries: List[str], history_seasons: int, rng: random.Random):
+    """Pre-fill game_history.md and conversations to simulate a long-running game."""
+    history_path = data_dir / "game_history.md"
+    with open(history_path, 'a') as f:
+        for index in range(history_seasons):
+            f.write(synthetic_history_block(index, countries))
+
+    conv_dir = data_dir / "_conversations"
+    conv_dir.mkdir(parents=True, exist_ok=True)
+    for index in range(history_seasons):
+        for _ in range(len(countries)):
+            pair = sorted(rng.sample(countries, 2)) if len(countries) > 1 else countries
+            with open(conv_dir / ('-'.join(pair) + '.md'), 'a') as f:
+                f.write(f"\n## Season {index + 1}\n")
+                for speaker in pair:
+                    f.write(f"**{speaker}:** Synthetic message {index} from {speaker}. "
+                            "Let's coordinate on the borders this season.\n\n")
+
+
+def write_bench_config(path: Path, base: Config, countries: List[str], args: argparse.Namespace):
+    """Write a config.yaml for the throwaway game, derived from the repo config."""
+    config = base.to_dict()
+    config['countries'] = countries
+    config['paths']['data_dir'] = 'countries'
+    config.setdefault('llm', {})['backend'] = 'stub'
+    config['llm']['stub'] = {'latency': args.latency, 'responses': ''}
+    config['llm']['stream'] = args.stream
+    config.setdefault('season', {})['turn_rounds'] = args.rounds
+    config['concurrency'] = {
+        'parallel_private_phases': args.parallel,
+        'max_in_flight': base.get('concurrency', {}).get('max_in_flight', 4),
+    }
+    path.write_text(yaml.safe_dump(config, sort_keys=False))
+
+
+# =============================================================================
+# Benchmark Run
+# =============================================================================
+
+def run_bench(args: argparse.Namespace) -> Dict[str, object]:
+    """Run the benchmark and return the results dict."""
+    # Imported here so the orchestrator picks up the bench config from the new CWD
+    from .game_manager import initialize_game
+    from .orchestrator import run_season
+
+    base_config = load_config(str(REPO_ROOT / "config.yaml"))
+    countries = synthetic_countries(args.countries)
+    rng = random.Random(args.seed)
+    random.seed(args.seed)
+
+    work_dir = Path(tempfile.mkdtemp(prefix="diplomacy-bench-"))
+    original_cwd = os.getcwd()
+    season_times = []
+    scheduler_stats = {}
+
+    try:
+        os.chdir(work_dir)
+        write_bench_config(work_dir / "config.yaml", base_config, countries, args)
+
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            initialize_game(skip_cleanup=True)
+            data_dir = work_dir / "countries"
+            (data_dir / "game_state.md").write_text(synthetic_game_state(countries))
+            seed_history(data_dir, countries, args.history, rng)
+
+            timing.enable()
+            get_context_cache().clear()
+            for index in range(args.seasons):
+                start = time.perf_counter()
+                run_season()
+                season_times.append(time.perf_counter() - start)
+                with open(data_dir / "game_history.md", 'a') as f:
+                    f.write(synthetic_history_block(args.history + index, countries))
+            timing.disable()
+            scheduler_stats = dict(get_scheduler(load_config()).stats)
+    finally:
+        os.chdir(original_cwd)
+        if args.keep:
+            print(f"Kept benchmark game directory: {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    samples = timing.snapshot()
+    total = sum(season_times)
+    results = {
+        'countries': len(countries),
+        'seasons': args.seasons,
+        'history_seasons': args.history,
+        'turn_rounds': args.rounds,
+        'latency': args.latency,
+        'parallel': args.parallel,
+        'stream': args.stream,
+        'season_seconds': {
+            'p50': timing.percentile(season_times, 50),
+            'p95': timing.percentile(season_times, 95),
+            'total': total,
+        },
+        'seasons_per_hour': (3600 * len(season_times) / total) if total else 0.0,
+        'phases': {},
+        'prompt_chars': {
+            'p50': timing.percentile(samples.get('prompt_chars', []), 50),
+            'p95': timing.percentile(samples.get('prompt_chars', []), 95),
+            'max': max(samples.get('prompt_chars', [0])),
+        },
+        'context_cache': get_context_cache().stats(),
+        'scheduler': scheduler_stats,
+    }
+    for phase in PHASES + sorted(set(samples) - set(PHASES) - {'prompt_chars'}):
+        values = samples.get(phase, [])
+        results['phases'][phase] = {
+            'calls': len(values),
+            'p50_ms': timing.percentile(values, 50) * 1000,
+            'p95_ms': timing.percentile(values, 95) * 1000,
+            'total_s': sum(values),
+        }
+    return results
+
+
+# =============================================================================
+# CLI Startup
+# =============================================================================
+
+def run_startup(args: argparse.Namespace) -> Dict[str, object]:
+    """Time each bookkeeping command in a fresh interpreter, in a throwaway game."""
+    from .game_manager import initialize_game
+
+    base_config = load_config(str(REPO_ROOT / "config.yaml"))
+    work_dir = Path(tempfile.mkdtemp(prefix="diplomacy-startup-"))
+    results = {'budget_ms': args.budget_ms, 'repeat': args.repeat, 'commands': {}}
+    original_cwd = os.getcwd()
+    try:
+        os.chdir(work_dir)
+        write_bench_config(work_dir / "config.yaml", base_config, synthetic_countries(args.countries), args)
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            initialize_game(skip_cleanup=True)
+
+        for command in STARTUP_COMMANDS:
+            probe = STARTUP_PROBE.format(root=str(REPO_ROOT), args=command.split(),
+                                         script=str(REPO_ROOT / "diplomacy.py"), heavy=HEAVY_MODULES)
+            in_process, wall, heavy = [], [], set()
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                done = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True)
+                wall.append(time.perf_counter() - start)
+                report = json.loads(done.stderr.strip().splitlines()[-1])
+                in_process.append(report['seconds'])
+                heavy.update(report['heavy'])
+            median_ms = timing.percentile(in_process, 50) * 1000
+            results['commands'][command] = {
+                'ms': median_ms,
+                'wall_ms': timing.percentile(wall, 50) * 1000,
+                'heavy': sorted(heavy),
+                'ok': not heavy and median_ms <= args.budget_ms,
+            }
+    finally:
+        os.chdir(original_cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+
+def print_startup_report(results: Dict[str, object]):
+    """Print the startup table; commands over budget or loading heavy modules are marked."""
+    print_section_header("CLI STARTUP")
+    print(f"Median of {results['repeat']} runs each; budget {results['budget_ms']:.0f} ms "
+          f"(command time in a fresh interpreter, excluding interpreter startup)\n")
+    print(f"{'Command':<16}{'ms':>8}{'wall ms':>10}  Heavy modules loaded")
+    print_divider()
+    for command, stats in results['commands'].items():
+        mark = "✓" if stats['ok'] else "✗"
+        print(f"{command:<16}{stats['ms']:>8.1f}{stats['wall_ms']:>10.1f}  "
+              f"{', '.join(stats['heavy']) or '-'}  {mark}")
+    print_divider()
+
+
+def print_report(results: Dict[str, object]):
+    """Print a human-readable benchmark report."""
+    print_section_header("BENCHMARK RESULTS")
+    print(f"Countries: {results['countries']}  Seasons: {results['seasons']}  "
+          f"History seasons: {results['history_seasons']}  Turn rounds: {results['turn_rounds']}")
+    print(f"Stub latency: {results['latency']}s  Parallel private phases: {results['parallel']}  "
+          f"Streaming: {results['stream']}\n")
+
+    print(f"{'Phase':<12}{'calls':>8}{'p50 ms':>12}{'p95 ms':>12}{'total s':>12}")
+    print_divider()
+    for phase, stats in results['phases'].items():
+        print(f"{phase:<12}{stats['calls']:>8}{stats['p50_ms']:>12.2f}{stats['p95_ms']:>12.2f}{stats['total_s']:>12.3f}")
+    print_divider()
+
+    prompt = results['prompt_chars']
+    season = results['season_seconds']
+    print(f"Prompt chars: p50 {prompt['p50']:.0f}, p95 {prompt['p95']:.0f}, max {prompt['max']:.0f}")
+    print(f"Season time:  p50 {season['p50']:.3f}s, p95 {season['p95']:.3f}s, total {season['total']:.3f}s")
+    print(f"Throughput:   {results['seasons_per_hour']:.1f} seasons/hour")
+
+    cache = results['context_cache']
+    print(f"Context cache: files {cache['file_hits']} hits / {cache['file_misses']} misses, "
+          f"sections {cache['section_hits']} hits / {cache['section_misses']} misses")
+
+    scheduler = results['scheduler']
+    if scheduler:
+        print(f"Scheduler:    {scheduler['calls']} calls, {scheduler['throttled']} throttled "
+              f"({scheduler['throttle_seconds']:.2f}s), {scheduler['retries']} retries")
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="diplomacy.py bench", description="Benchmark simulated seasons")
+    parser.add_argument("--seasons", type=int, default=3, help="Seasons to simulate (default 3)")
+    parser.add_argument("--countries", type=int, default=7, help="Number of countries (default 7)")
+    parser.add_argument("--history", type=int, default=0, help="Past seasons of synthetic history to pre-fill")
+    parser.add_argument("--rounds", type=int, default=2, help="Turn rounds per season (default 2)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Artificial stub latency in seconds")
+    parser.add_argument("--parallel", action="store_true", help="Run private phases concurrently")
+    parser.add_argument("--stream", action="store_true", help="Stream responses (llm.stream)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for turn order and synthetic data")
+    parser.add_argument("--json", help="Also write results to this JSON file (regression baseline)")
+    parser.add_argument("--keep", action="store_true", help="Keep the throwaway game directory")
+    parser.add_argument("--startup", action="store_true", help="Time bookkeeping CLI commands instead")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per command with --startup (default 5)")
+    parser.add_argument("--budget-ms", type=float, default=150.0,
+                        help="Per-command budget with --startup, excluding interpreter startup (default 150)")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str]):
+    """Entry point for `python diplomacy.py bench`."""
+    args = parse_args(argv)
+    if args.startup:
+        results = run_startup(args)
+        print_startup_report(results)
+    else:
+        results = run_bench(args)
+        print_report(results)
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2) + '\n')
+        print(f"\n✓ Wrote {args.json}")
+    if args.startup and not all(stats['ok'] for stats in results['commands'].values()):
+        print("\n✗ Startup budget exceeded")
+        sys.exit(1)
@@ -0,0 +1,799 @@
+"""
+Standard Diplomacy board for Diplomacy LLM.
+A compact, precomputed map of the standard board plus parsers for
+game_state.md units and orders.md, and an order validator that catches
+illegal or self-inconsistent orders before the season is adjudicated.
+
+Map representation:
+- Provinces have integer IDs (0-74, alphabetical by abbreviation). The six
+  split coasts (Bul/ec, Bul/sc, Spa/nc, Spa/sc, Stp/nc, Stp/sc) are extra
+  locations 75-80, so a unit's location is a single int either way.
+- Adjacency is stored as Python int bitsets: ARMY_ADJ[province] over
+  province IDs and FLEET_ADJ[location] over location IDs. Checking a move
+  is one shift-and-mask.
+- Everything is built once at import time from the edge tables below.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+
+# =============================================================================
+# Map Data
+# =============================================================================
+
+# (abbreviation, name, terrain); terrain is land (inland), coast or sea
+PROVINCE_DATA = [
+    ("Adr", "Adriatic Sea", "sea"), ("Aeg", "Aegean Sea", "sea"), ("Alb", "Albania", "coast"),
+    ("Ank", "Ankara", "coast"), ("Apu", "Apulia", "coast"), ("Arm", "Armenia", "coast"),
+    ("Bal", "Baltic Sea", "sea"), ("Bar", "Barents Sea", "sea"), ("Bel", "Belgium", "coast"),
+    ("Ber", "Berlin", "coast"), ("Bla", "Black Sea", "sea"), ("Boh", "Bohemia", "land"),
+    ("Bot", "Gulf of Bothnia", "sea"), ("Bre", "Brest", "coast"), ("Bud", "Budapest", "land"),
+    ("Bul", "Bulgaria", "coast"), ("Bur", "Burgundy", "land"), ("Cly", "Clyde", "coast"),
+    ("Con", "Constantinople", "coast"), ("Den", "Denmark", "coast"), ("Eas", "Eastern Mediterranean", "sea"),
+    ("Edi", "Edinburgh", "coast"), ("Eng", "English Channel", "sea"), ("Fin", "Finland", "coast"),
+    ("Gal", "Galicia", "land"), ("Gas", "Gascony", "coast"), ("Gol", "Gulf of Lyon", "sea"),
+    ("Gre", "Greece", "coast"), ("Hel", "Heligoland Bight", "sea"), ("Hol", "Holland", "coast"),
+    ("Ion", "Ionian Sea", "sea"), ("Iri", "Irish Sea", "sea"), ("Kie", "Kiel", "coast"),
+    ("Lon", "London", "coast"), ("Lvn", "Livonia", "coast"), ("Lvp", "Liverpool", "coast"),
+    ("Mao", "Mid-Atlantic Ocean", "sea"), ("Mar", "Marseilles", "coast"), ("Mos", "Moscow", "land"),
+    ("Mun", "Munich", "land"), ("Naf", "North Africa", "coast"), ("Nao", "North Atlantic Ocean", "sea"),
+    ("Nap", "Naples", "coast"), ("Nth", "North Sea", "sea"), ("Nwg", "Norwegian Sea", "sea"),
+    ("Nwy", "Norway", "coast"), ("Par", "Paris", "land"), ("Pic", "Picardy", "coast"),
+    ("Pie", "Piedmont", "coast"), ("Por", "Portugal", "coast"), ("Pru", "Prussia", "coast"),
+    ("Rom", "Rome", "coast"), ("Ruh", "Ruhr", "land"), ("Rum", "Rumania", "coast"),
+    ("Ser", "Serbia", "land"), ("Sev", "Sevastopol", "coast"), ("Sil", "Silesia", "land"),
+    ("Ska", "Skagerrak", "sea"), ("Smy", "Smyrna", "coast"), ("Spa", "Spain", "coast"),
+    ("Stp", "St Petersburg", "coast"), ("Swe", "Sweden", "coast"), ("Syr", "Syria", "coast"),
+    ("Tri", "Trieste", "coast"), ("Tun", "Tunis", "coast"), ("Tus", "Tuscany", "coast"),
+    ("Tys", "Tyrrhenian Sea", "sea"), ("Tyr", "Tyrolia", "land"), ("Ukr", "Ukraine", "land"),
+    ("Ven", "Venice", "coast"), ("Vie", "Vienna", "land"), ("Wal", "Wales", "coast"),
+    ("War", "Warsaw", "land"), ("Wes", "Western Mediterranean", "sea"), ("Yor", "Yorkshire", "coast"),
+]
+
+SPLIT_COASTS = ["Bul/ec", "Bul/sc", "Spa/nc", "Spa/sc", "Stp/nc", "Stp/sc"]
+
+ALIASES = {
+    "lyo": "Gol", "gulf of lion": "Gol", "gulf of lions": "Gol", "nat": "Nao", "north atlantic": "Nao",
+    "nrg": "Nwg", "mid": "Mao", "mid atlantic": "Mao", "mid-atlantic": "Mao", "mid atlantic ocean": "Mao",
+    "ech": "Eng", "channel": "Eng", "tyn": "Tys", "tyrrhenian": "Tys", "eme": "Eas",
+    "eastern med": "Eas", "wme": "Wes", "western med": "Wes", "helgoland": "Hel", "heligoland": "Hel",
+    "st petersburg": "Stp", "saint petersburg": "Stp", "marseille": "Mar",
+    "romania": "Rum", "tyrol": "Tyr", "nor": "Nwy", "gob": "Bot", "bothnia": "Bot",
+    "lpl": "Lvp", "lvo": "Lvn", "nwy": "Nwy", "tunisia": "Tun", "bohemia": "Boh",
+}
+
+# Land borders armies can cross
+ARMY_EDGES = """
+Alb-Gre Alb-Ser Alb-Tri Ank-Arm Ank-Con Ank-Smy Apu-Nap Apu-Rom Apu-Ven Arm-Sev Arm-Smy Arm-Syr
+Bel-Bur Bel-Hol Bel-Pic Bel-Ruh Ber-Kie Ber-Mun Ber-Pru Ber-Sil Boh-Gal Boh-Mun Boh-Sil Boh-Tyr
+Boh-Vie Bre-Gas Bre-Par Bre-Pic Bud-Gal Bud-Rum Bud-Ser Bud-Tri Bud-Vie Bul-Con Bul-Gre Bul-Rum
+Bul-Ser Bur-Gas Bur-Mar Bur-Mun Bur-Par Bur-Pic Bur-Ruh Cly-Edi Cly-Lvp Con-Smy Den-Kie Den-Swe
+Edi-Lvp Edi-Yor Fin-Nwy Fin-Stp Fin-Swe Gal-Rum Gal-Sil Gal-Ukr Gal-Vie Gal-War Gas-Mar Gas-Par
+Gas-Spa Gre-Ser Hol-Kie Hol-Ruh Kie-Mun Kie-Ruh Lon-Wal Lon-Yor Lvn-Mos Lvn-Pru Lvn-Stp Lvn-War
+Lvp-Wal Lvp-Yor Mar-Pie Mar-Spa Mos-Sev Mos-Stp Mos-Ukr Mos-War Mun-Ruh Mun-Sil Mun-Tyr Naf-Tun
+Nap-Rom Nwy-Stp Nwy-Swe Par-Pic Pie-Tus Pie-Tyr Pie-Ven Por-Spa Pru-Sil Pru-War Rom-Tus Rom-Ven
+Rum-Ser Rum-Sev Rum-Ukr Ser-Tri Sev-Ukr Sil-War Smy-Syr Tri-Tyr Tri-Ven Tri-Vie Tus-Ven Tyr-Ven
+Tyr-Vie Ukr-War Wal-Yor
+"""
+
+# Sea lanes and coastlines fleets can cross (split coasts named explicitly)
+FLEET_EDGES = """
+Adr-Alb Adr-Apu Adr-Ion Adr-Tri Adr-Ven Aeg-Bul/sc Aeg-Con Aeg-Eas Aeg-Gre Aeg-Ion Aeg-Smy
+Bal-Ber Bal-Bot Bal-Den Bal-Kie Bal-Lvn Bal-Pru Bal-Swe Bar-Nwg Bar-Nwy Bar-Stp/nc
+Bla-Ank Bla-Arm Bla-Bul/ec Bla-Con Bla-Rum Bla-Sev Bot-Fin Bot-Lvn Bot-Stp/sc Bot-Swe
+Eas-Ion Eas-Smy Eas-Syr Eng-Bel Eng-Bre Eng-Iri Eng-Lon Eng-Mao Eng-Nth Eng-Pic Eng-Wal
+Gol-Mar Gol-Pie Gol-Spa/sc Gol-Tus Gol-Tys Gol-Wes Hel-Den Hel-Hol Hel-Kie Hel-Nth
+Ion-Alb Ion-Apu Ion-Gre Ion-Nap Ion-Tun Ion-Tys Iri-Lvp Iri-Mao Iri-Nao Iri-Wal
+Mao-Bre Mao-Gas Mao-Naf Mao-Nao Mao-Por Mao-Spa/nc Mao-Spa/sc Mao-Wes Nao-Cly Nao-Lvp Nao-Nwg
+Nth-Bel Nth-Den Nth-Edi Nth-Hol Nth-Lon Nth-Nwg Nth-Nwy Nth-Ska Nth-Yor Nwg-Cly Nwg-Edi Nwg-Nwy
+Ska-Den Ska-Nwy Ska-Swe Tys-Nap Tys-Rom Tys-Tun Tys-Tus Tys-Wes Wes-Naf Wes-Spa/sc Wes-Tun
+Alb-Gre Alb-Tri Ank-Arm Ank-Con Apu-Nap Apu-Ven Arm-Sev Bel-Hol Bel-Pic Ber-Kie Ber-Pru
+Bre-Gas Bre-Pic Bul/ec-Con Bul/ec-Rum Bul/sc-Con Bul/sc-Gre Cly-Edi Cly-Lvp Con-Smy Den-Kie
+Den-Swe Edi-Yor Fin-Stp/sc Fin-Swe Gas-Spa/nc Hol-Kie Lon-Wal Lon-Yor Lvn-Pru Lvn-Stp/sc
+Lvp-Wal Mar-Pie Mar-Spa/sc Naf-Tun Nap-Rom Nwy-Stp/nc Nwy-Swe Pie-Tus Por-Spa/nc Por-Spa/sc
+Rom-Tus Rum-Sev Smy-Syr Tri-Ven
+"""
+
+SUPPLY_CENTER_NAMES = (
+    "Ank Bel Ber Bre Bud Bul Con Den Edi Gre Hol Kie Lon Lvp Mar Mos Mun Nap Nwy Par Por Rom "
+    "Rum Ser Sev Smy Spa Stp Swe Tri Tun Ven Vie War"
+).split()
+
+HOME_CENTERS = {
+    "Austria": ["Bud", "Tri", "Vie"],
+    "England": ["Edi", "Lon", "Lvp"],
+    "France": ["Bre", "Mar", "Par"],
+    "Germany": ["Ber", "Kie", "Mun"],
+    "Italy": ["Nap", "Rom", "Ven"],
+    "Russia": ["Mos", "Sev", "Stp", "War"],
+    "Turkey": ["Ank", "Con", "Smy"],
+}
+
+
+# =============================================================================
+# Precomputed Tables
+# =============================================================================
+
+NUM_PROVINCES = len(PROVINCE_DATA)
+LOCATION_NAMES: List[str] = [abbr for abbr, _, _ in PROVINCE_DATA] + SPLIT_COASTS
+PROVINCE_NAMES: List[str] = LOCATION_NAMES[:NUM_PROVINCES]
+LONG_NAMES: List[str] = [name for _, name, _ in PROVINCE_DATA]
+_LOCATION_IDS: Dict[str, int] = {name.lower(): i for i, name in enumerate(LOCATION_NAMES)}
+
+# Location -> province ID (identity for provinces, parent province for coasts)
+LOCATION_PROVINCE: List[int] = list(range(NUM_PROVINCES)) + [
+    _LOCATION_IDS[name.split('/')[0].lower()] for name in SPLIT_COASTS
+]
+
+
+def _bits(ids) -> int:
+    mask = 0
+    for i in ids:
+        mask |= 1 << i
+    return mask
+
+
+LAND = _bits(i for i, (_, _, terrain) in enumerate(PROVINCE_DATA) if terrain == "land")
+COASTAL = _bits(i for i, (_, _, terrain) in enumerate(PROVINCE_DATA) if terrain == "coast")
+SEA = _bits(i for i, (_, _, terrain) in enumerate(PROVINCE_DATA) if terrain == "sea")
+SUPPLY_CENTERS = _bits(_LOCATION_IDS[name.lower()] for name in SUPPLY_CENTER_NAMES)
+HAS_SPLIT_COASTS = _bits(LOCATION_PROVINCE[NUM_PROVINCES:])
+
+# Province name/alias lookup (lowercase), including full names
+NAME_TO_PROVINCE: Dict[str, int] = {}
+for _i, (_abbr, _name, _) in enumerate(PROVINCE_DATA):
+    NAME_TO_PROVINCE[_abbr.lower()] = _i
+    NAME_TO_PROVINCE[_name.lower()] = _i
+for _alias, _abbr in ALIASES.items():
+    NAME_TO_PROVINCE[_alias] = _LOCATION_IDS[_abbr.lower()]
+
+
+def _build_adjacency(edges: str, size: int) -> List[int]:
+    adjacency = [0] * size
+    for edge in edges.split():
+        a, b = (_LOCATION_IDS[name.lower()] for name in edge.split('-'))
+        adjacency[a] |= 1 << b
+        adjacency[b] |= 1 << a
+    return adjacency
+
+
+ARMY_ADJ: List[int] = _build_adjacency(ARMY_EDGES, NUM_PROVINCES)
+FLEET_ADJ: List[int] = _build_adjacency(FLEET_EDGES, len(LOCATION_NAMES))
+
+# Province-level fleet adjacency (coasts folded into their province), for supports and convoys
+FLEET_PROVINCE_ADJ: List[int] = [0] * NUM_PROVINCES
+for _loc, _mask in enumerate(FLEET_ADJ):
+    for _other in range(len(LOCATION_NAMES)):
+        if _mask >> _other & 1:
+            FLEET_PROVINCE_ADJ[LOCATION_PROVINCE[_loc]] |= 1 << LOCATION_PROVINCE[_other]
+
+# Provinces bordering each province by land or sea (visibility, distances)
+NEIGHBORS: List[int] = [ARMY_ADJ[_p] | FLEET_PROVINCE_ADJ[_p] for _p in range(NUM_PROVINCES)]
+
+
+# =============================================================================
+# Map Queries
+# =============================================================================
+
+def location_name(loc: int) -> str:
+    return LOCATION_NAMES[loc]
+
+
+def province_of(loc: int) -> int:
+    return LOCATION_PROVINCE[loc]
+
+
+def is_sea(province: int) -> bool:
+    return bool(SEA >> province & 1)
+
+
+def is_coastal(province: int) -> bool:
+    return bool(COASTAL >> province & 1)
+
+
+def is_supply_center(province: int) -> bool:
+    return bool(SUPPLY_CENTERS >> province & 1)
+
+
+def coasts_of(province: int) -> List[int]:
+    """Split-coast locations of a province (empty for most provinces)."""
+    return [loc for loc in range(NUM_PROVINCES, len(LOCATION_NAMES)) if LOCATION_PROVINCE[loc] == province]
+
+
+def fleet_destinations(src: int, province: int) -> List[int]:
+    """Locations in `province` a fleet at location `src` can move to."""
+    candidates = coasts_of(province) or [province]
+    return [loc for loc in candidates if FLEET_ADJ[src] >> loc & 1]
+
+
+def can_move(unit_type: str, src: int, dst: int) -> bool:
+    """Whether a unit at location src can move directly to location dst."""
+    if unit_type == 'A':
+        dst_province = LOCATION_PROVINCE[dst]
+        return not is_sea(dst_province) and bool(ARMY_ADJ[LOCATION_PROVINCE[src]] >> dst_province & 1)
+    return bool(FLEET_ADJ[src] >> dst & 1)
+
+
+def can_reach_province(unit_type: str, src: int, province: int) -> bool:
+    """Whether a unit could move into some part of `province` (used for support)."""
+    if unit_type == 'A':
+        return can_move('A', src, province)
+    return bool(fleet_destinations(src, province))
+
+
+def convoy_route_exists(src: int, dst: int, fleet_provinces: Optional[int] = None) -> bool:
+    """Whether an army could be convoyed from province src to province dst.
+
+    fleet_provinces is a bitset of sea provinces holding convoying fleets;
+    by default any sea province may be used.
+    """
+    if not (is_coastal(src) and is_coastal(dst)) or src == dst:
+        return False
+    allowed = SEA if fleet_provinces is None else fleet_provinces & SEA
+    reached = FLEET_PROVINCE_ADJ[src] & allowed
+    frontier = reached
+    while frontier:
+        if any(FLEET_PROVINCE_ADJ[dst] >> sea & 1 for sea in _bit_indices(frontier)):
+            return True
+        expanded = 0
+        for sea in _bit_indices(frontier):
+            expanded |= FLEET_PROVINCE_ADJ[sea] & allowed
+        frontier = expanded & ~reached
+        reached |= expanded
+    return False
+
+
+def _bit_indices(mask: int):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+# =============================================================================
+# Location Parsing
+# =============================================================================
+
+COAST_WORDS = {
+    "nc": "nc", "north": "nc", "north coast": "nc",
+    "sc": "sc", "south": "sc", "south coast": "sc",
+    "ec": "ec", "east": "ec", "east coast": "ec",
+}
+
+
+def parse_location(text: str) -> Optional[int]:
+    """Parse 'Par', 'paris', 'Stp/sc', 'Spa (nc)', 'St Petersburg south coast' into a location ID."""
+    normalized = re.sub(r'[()/]', ' ', text.lower()).split()
+    return _read_location(normalized, 0, len(normalized))[0] if normalized else None
+
+
+def _read_location(tokens: List[str], i: int, end: int) -> Tuple[Optional[int], int]:
+    """Read a location starting at tokens[i]; returns (location, index after it)."""
+    for length in (4, 3, 2, 1):
+        if i + length > end:
+            continue
+        province = NAME_TO_PROVINCE.get(' '.join(tokens[i:i + length]))
+        if province is None:
+            continue
+        j = i + length
+        for coast_length in (2, 1):
+            coast = COAST_WORDS.get(' '.join(tokens[j:j + coast_length])) if j + coast_length <= end else None
+            if coast:
+                loc = _LOCATION_IDS.get(f"{PROVINCE_NAMES[province].lower()}/{coast}")
+                if loc is not None:
+                    return loc, j + coast_length
+                break
+        return province, j
+    return None, i
+
+
+# =============================================================================
+# Game State
+# =============================================================================
+
+@dataclass(frozen=True)
+class Unit:
+    country: str
+    unit_type: str  # 'A' or 'F'
+    location: int
+
+    def __str__(self) -> str:
+        return f"{self.unit_type} {LOCATION_NAMES[self.location]}"
+
+
+@dataclass
+class BoardState:
+    """Units and supply centers parsed from game_state.md.
+
+    Between phases the state can also hold dislodged units waiting to retreat
+    (## Dislodged) or pending builds and disbands (## Adjustments).
+    """
+    season: str = ""
+    units: Dict[int, Unit] = field(default_factory=dict)  # Province ID -> unit
+    centers: Dict[str, Set[int]] = field(default_factory=dict)  # Country -> province IDs
+    dislodged: Dict[int, Tuple[Unit, List[int]]] = field(default_factory=dict)  # Province -> (unit, retreat locations)
+    adjustments: Dict[str, int] = field(default_factory=dict)  # Country -> builds (+) or disbands (-)
+    issues: List[str] = field(default_factory=list)
+
+    def units_of(self, country: str) -> List[Unit]:
+        return [unit for unit in self.units.values() if unit.country == country]
+
+    def countries(self) -> List[str]:
+        """Countries with units or centers, in order of first appearance."""
+        seen = dict.fromkeys(self.centers)
+        seen.update(dict.fromkeys(unit.country for unit in self.units.values()))
+        seen.update(dict.fromkeys(unit.country for unit, _ in self.dislodged.values()))
+        return list(seen)
+
+
+UNIT_LINE = re.compile(r'^[-*]\s*(A|F|Army|Fleet)\s+(.+?)\s*$', re.IGNORECASE)
+CENTER_LINE = re.compile(r'^[-*]\s*(.+?)\s*$')
+DISLODGED_LINE = re.compile(r'^[-*]\s*(A|F|Army|Fleet)\s+([^(]+?)\s*(?:\((?:retreat to:\s*)?([^)]*)\))?\s*$',
+                            re.IGNORECASE)
+ADJUSTMENT_LINE = re.compile(r'^[-*]\s*(build|disband)s?\s+(\d+)', re.IGNORECASE)
+SECTIONS = {'units': 'units', 'dislodged': 'dislodged', 'adjustments': 'adjustments'}
+
+
+def parse_game_state(text: str) -> BoardState:
+    """Parse the Season line and the ## Supply Centers / ## Units sections
+    (plus ## Dislodged and ## Adjustments between phases)."""
+    state = BoardState()
+    section = None
+    country = None
+
+    for raw_line in text.split('\n'):
+        line = raw_line.strip()
+        if not line:
+            continue
+        if line.lower().startswith('season:'):
+            state.season = line.split(':', 1)[1].strip()
+            continue
+        if line.startswith('#'):
+            title = line.lstrip('#').strip().lower()
+            section = 'centers' if 'supply center' in title else SECTIONS.get(title)
+            country = None
+            continue
+        if section is None:
+            continue
+        if not line.startswith(('-', '*')):
+            country = line.rstrip(':')
+            continue
+        if country is None:
+            continue
+
+        if section == 'dislodged':
+            match = DISLODGED_LINE.match(line)
+            loc = parse_location(match.group(2)) if match else None
+            if loc is None:
+                state.issues.append(f"Unreadable dislodged unit line for {country}: {line}")
+                continue
+            options = [parse_location(name) for name in (match.group(3) or '').split(',')]
+            unit = Unit(country, match.group(1)[0].upper(), loc)
+            state.dislodged[LOCATION_PROVINCE[loc]] = (unit, [o for o in options if o is not None])
+        elif section == 'adjustments':
+            match = ADJUSTMENT_LINE.match(line)
+            if match is None:
+                state.issues.append(f"Unreadable adjustment line for {country}: {line}")
+                continue
+            count = int(match.group(2))
+            state.adjustments[country] = count if match.group(1).lower() == 'build' else -count
+        elif section == 'units':
+            match = UNIT_LINE.match(line)
+            loc = parse_location(match.group(2)) if match else None
+            if loc is None:
+                state.issues.append(f"Unreadable unit line for {country}: {line}")
+                continue
+            unit_type = match.group(1)[0].upper()
+            state.units[LOCATION_PROVINCE[loc]] = Unit(country, unit_type, loc)
+        else:
+            province = parse_location(CENTER_LINE.match(line).group(1))
+            if province is None:
+                state.issues.append(f"Unreadable supply center line for {country}: {line}")
+                continue
+            state.centers.setdefault(country, set()).add(LOCATION_PROVINCE[province])
+
+    return state
+
+
+def format_game_state(state: BoardState, countries: Optional[List[str]] = None, title: str = "") -> str:
+    """Render a BoardState in the format parse_game_state reads.
+
+    countries sets the listing order (defaults to the state's own order);
+    title is an optional heading placed under the Season line.
+    """
+    order = list(countries or [])
+    order += [country for country in state.countries() if country not in order]
+    lines = [f"Season: {state.season}", ""]
+    if title:
+        lines += [title, ""]
+
+    def by_name(locations):
+        return sorted(locations, key=lambda loc: LOCATION_NAMES[loc])
+
+    lines.append("## Supply Centers")
+    for country in order:
+        if state.centers.get(country):
+            lines.append(country)
+            lines += [f"- {PROVINCE_NAMES[p]}" for p in by_name(state.centers[country])]
+            lines.append("")
+
+    lines += ["## Units"]
+    for country in order:
+        units = sorted(state.units_of(country), key=lambda u: LOCATION_NAMES[u.location])
+        if units:
+            lines.append(country)
+            lines += [f"- {unit}" for unit in units]
+            lines.append("")
+
+    if state.dislodged:
+        lines += ["## Dislodged"]
+        for country in order:
+            entries = sorted((entry for entry in state.dislodged.values() if entry[0].country == country),
+                             key=lambda entry: LOCATION_NAMES[entry[0].location])
+            if entries:
+                lines.append(country)
+                for unit, options in entries:
+                    lines.append(f"- {unit} (retreat to: {', '.join(LOCATION_NAMES[o] for o in by_name(options))})")
+                lines.append("")
+
+    if state.adjustments:
+        lines += ["## Adjustments"]
+        for country in order:
+            count = state.adjustments.get(country)
+            if count:
+                lines += [country, f"- {'build' if count > 0 else 'disband'} {abs(count)}", ""]
+
+    return '\n'.join(lines).rstrip() + '\n'
+
+
+# =============================================================================
+# Orders
+# =============================================================================
+
+@dataclass
+class Order:
+    """One parsed order. Locations are location IDs as written in the order."""
+    kind: str  # hold, move, support, convoy; retreat, disband, build between phases
+    location: int
+    unit_type: Optional[str] = None
+    target: Optional[int] = None  # Move destination
+    via_convoy: bool = False
+    supported: Optional[int] = None  # Support/convoy: the other unit's location
+    supported_type: Optional[str] = None
+    supported_target: Optional[int] = None  # Support-to-move/convoy destination (None = support hold)
+    text: str = ""
+    illegal: Optional[str] = None  # Set by validate_orders when the order will be rejected
+
+    @property
+    def province(self) -> int:
+        return LOCATION_PROVINCE[self.location]
+
+
+HOLD_WORDS = {"h", "hold", "holds", "stand", "stands"}
+MOVE_WORDS = {"-", "to", "move", "moves", "m"}
+SUPPORT_WORDS = {"s", "support", "supports"}
+CONVOY_WORDS = {"c", "convoy", "convoys"}
+RETREAT_WORDS = {"r", "retreat", "retreats"}
+DISBAND_WORDS = {"d", "disband", "disbands", "remove", "removes"}
+BUILD_WORDS = {"b", "build", "builds"}
+UNIT_WORDS = {"a": "A", "army": "A", "f": "F", "fleet": "F"}
+
+LIST_PREFIX = re.compile(r'^\s*(?:[-*+]|\d+[.)])\s+')
+
+
+def _normalize_order_line(line: str) -> List[str]:
+    line = LIST_PREFIX.sub('', line.split('#', 1)[0].split('//', 1)[0])
+    line = line.replace('**', '').replace('`', '').lower()
+    line = re.sub(r'->|→|–|—|=>', ' - ', line)
+    line = re.sub(r'(?<=\w)-(?=\s|$)|(?<=\s)-(?=\w)', ' - ', line)  # "Par -Bur", "Par- Bur"
+    line = re.sub(r'[()/,;:.]', ' ', line)
+
+    tokens = []
+    for token in line.split():
+        if '-' in token and token != '-' and token not in NAME_TO_PROVINCE:
+            parts = token.split('-')  # "par-bur"
+            for k, part in enumerate(parts):
+                if k:
+                    tokens.append('-')
+                if part:
+                    tokens.append(part)
+        else:
+            tokens.append(token)
+    return tokens
+
+
+def _read_unit(tokens: List[str], i: int) -> Tuple[Optional[str], Optional[int], int]:
+    """Read an optional unit type and a location."""
+    unit_type = None
+    if i < len(tokens) and tokens[i] in UNIT_WORDS:
+        unit_type = UNIT_WORDS[tokens[i]]
+        i += 1
+    loc, i = _read_location(tokens, i, len(tokens))
+    return unit_type, loc, i
+
+
+def parse_order(line: str) -> Optional[Order]:
+    """Parse one order line, or return None if it isn't a valid order."""
+    tokens = _normalize_order_line(line)
+
+    # "Build F Stp/nc", "Disband A Mun"
+    if tokens and (tokens[0] in BUILD_WORDS or tokens[0] in DISBAND_WORDS) and len(tokens) > 1:
+        unit_type, loc, i = _read_unit(tokens, 1)
+        if loc is None or i != len(tokens):
+            return None
+        return Order('build' if tokens[0] in BUILD_WORDS else 'disband', loc, unit_type, text=line.strip())
+
+    unit_type, loc, i = _read_unit(tokens, 0)
+    if loc is None:
+        return None
+    order = Order('hold', loc, unit_type, text=line.strip())
+    rest = tokens[i:]
+
+    if not rest or rest[0] in HOLD_WORDS:
+        return order if len(rest) <= 1 else None
+
+    # "A Mun D", "A Par B"
+    if len(rest) == 1 and (rest[0] in DISBAND_WORDS or rest[0] in BUILD_WORDS):
+        order.kind = 'disband' if rest[0] in DISBAND_WORDS else 'build'
+        return order
+
+    if rest[0] in RETREAT_WORDS:
+        j = 2 if len(rest) > 1 and rest[1] == "to" else 1
+        target, j = _read_location(rest, j, len(rest))
+        if target is None or j != len(rest):
+            return None
+        order.kind, order.target = 'retreat', target
+        return order
+
+    if rest[0] in MOVE_WORDS:
+        j = 2 if rest[0] == "moves" and len(rest) > 1 and rest[1] == "to" else 1
+        target, j = _read_location(rest, j, len(rest))
+        if target is None:
+            return None
+        order.kind, order.target = 'move', target
+        tail = rest[j:]
+        if tail and tail[0] in ("via", "by"):
+            order.via_convoy = True
+        elif tail:
+            return None
+        return order
+
+    if rest[0] in SUPPORT_WORDS or rest[0] in CONVOY_WORDS:
+        order.kind = 'support' if rest[0] in SUPPORT_WORDS else 'convoy'
+        supported_type, supported, j = _read_unit(rest, 1)
+        if supported is None:
+            return None
+        order.supported, order.supported_type = supported, supported_type
+        tail = rest[j:]
+        if tail and tail[0] in MOVE_WORDS:
+            target, k = _read_location(tail, 1, len(tail))
+            if target is None or k != len(tail):
+                return None
+            order.supported_target = target
+        elif tail and not (tail[0] in HOLD_WORDS and len(tail) == 1):
+            return None
+        if order.kind == 'convoy' and order.supported_target is None:
+            return None
+        return order
+
+    return None
+
+
+def looks_like_order(line: str) -> bool:
+    """Whether a line is meant as an order (starts with a unit type or a province)."""
+    tokens = _normalize_order_line(line)
+    if tokens and (tokens[0] in BUILD_WORDS or tokens[0] in DISBAND_WORDS):
+        tokens = tokens[1:]
+    if not tokens:
+        return False
+    if tokens[0] in UNIT_WORDS and len(tokens) > 1:
+        return _read_location(tokens, 1, len(tokens))[0] is not None
+    return False
+
+
+def parse_orders(text: str) -> Tuple[List[Order], List[str]]:
+    """Parse orders.md. Returns the orders and the order-like lines that couldn't be parsed.
+
+    Headings, prose and blank lines are ignored; only lines starting with a
+    unit (A/F/Army/Fleet + province) are treated as orders.
+    """
+    orders, unparsed = [], []
+    for line in text.split('\n'):
+        stripped = line.strip()
+        if not stripped or stripped.startswith('#'):
+            continue
+        order = parse_order(stripped)
+        if order is not None and (order.unit_type or order.kind != 'hold'):
+            orders.append(order)
+        elif looks_like_order(stripped):
+            unparsed.append(stripped)
+    return orders, unparsed
+
+
+# =============================================================================
+# Validation
+# =============================================================================
+
+@dataclass
+class OrderIssue:
+    severity: str  # error (illegal, will fail) or warning (legal but self-defeating)
+    message: str
+    order: str = ""
+
+    def __str__(self) -> str:
+        return f"{self.order}: {self.message}" if self.order else self.message
+
+
+@dataclass
+class OrderReport:
+    country: str
+    orders: List[Order] = field(default_factory=list)
+    issues: List[OrderIssue] = field(default_factory=list)
+    unordered: List[Unit] = field(default_factory=list)
+
+    @property
+    def errors(self) -> List[OrderIssue]:
+        return [issue for issue in self.issues if issue.severity == 'error']
+
+    @property
+    def warnings(self) -> List[OrderIssue]:
+        return [issue for issue in self.issues if issue.severity == 'warning']
+
+
+def validate_orders(state: BoardState, country: str, orders_text: str) -> OrderReport:
+    """Check a country's movement orders against the units on the board.
+
+    Errors are orders the adjudicator will reject (no such unit, not
+    adjacent, bad support or convoy). Warnings are legal orders that work
+    against each other, such as moving into a province your own unit is
+    holding, or supporting a move your unit isn't making.
+    """
+    report = OrderReport(country)
+    orders, unparsed = parse_orders(orders_text)
+    for line in unparsed:
+        report.issues.append(OrderIssue('error', "could not parse order", line))
+
+    def error(order: Order, message: str):
+        order.illegal = order.illegal or message
+        report.issues.append(OrderIssue('error', message, order.text))
+
+    def warning(order: Order, message: str):
+        report.issues.append(OrderIssue('warning', message, order.text))
+
+    # Match orders to this country's units
+    by_province: Dict[int, Order] = {}
+    for order in orders:
+        if order.kind in ('retreat', 'disband', 'build'):
+            error(order, f"{order.kind} orders are only used in the retreat and adjustment phases")
+            continue
+        unit = state.units.get(order.province)
+        if unit is None or unit.country != country:
+            owner = f" ({unit.country}'s {unit})" if unit else ""
+            error(order, f"no {country} unit in {PROVINCE_NAMES[order.province]}{owner}")
+            continue
+        if order.unit_type and order.unit_type != unit.unit_type:
+            warning(order, f"the unit in {PROVINCE_NAMES[order.province]} is {'an army' if unit.unit_type == 'A' else 'a fleet'}")
+        if order.province in by_province:
+            error(order, f"{unit} already has an order ({by_province[order.province].text})")
+            continue
+        order.unit_type = unit.unit_type
+        order.location = unit.location
+        by_province[order.province] = order
+        report.orders.append(order)
+
+    report.unordered = [unit for unit in state.units_of(country) if LOCATION_PROVINCE[unit.location] not in by_province]
+
+    # Legality of each order
+    checks = {'move': _check_move, 'support': _check_support, 'convoy': _check_convoy}
+    for order in report.orders:
+        if order.kind in checks:
+            checks[order.kind](state, country, order, by_province, error, warning)
+
+    # Self-consistency between this country's own orders
+    destinations: Dict[int, Order] = {}
+    for order in report.orders:
+        if order.kind != 'move' or order.target is None:
+            continue
+        dst = LOCATION_PROVINCE[order.target]
+        if dst in destinations:
+            warning(order, f"also ordered into {PROVINCE_NAMES[dst]} by {destinations[dst].text}; they will bounce")
+        destinations[dst] = order
+        occupant = by_province.get(dst)
+        if occupant is not None and occupant.kind != 'move':
+            warning(order, f"your {occupant.unit_type} {PROVINCE_NAMES[dst]} is staying there ({occupant.kind}), "
+                           f"so this move will bounce")
+        if occupant is not None and occupant.kind == 'move' and occupant.target is not None \
+                and LOCATION_PROVINCE[occupant.target] == order.province and not (order.via_convoy or occupant.via_convoy):
+            warning(order, f"swaps places with {occupant.text}; units can't swap without a convoy, both will bounce")
+
+    return report
+
+
+def _check_move(state, country, order, by_province, error, warning):
+    target = order.target
+    if order.unit_type == 'F':
+        if target < NUM_PROVINCES and HAS_SPLIT_COASTS >> target & 1:
+            options = fleet_destinations(order.location, target)
+            if len(options) == 1:
+                order.target = target = options[0]  # Only one coast reachable: infer it
+            elif len(options) > 1:
+                error(order, f"specify a coast ({' or '.join(LOCATION_NAMES[o] for o in options)})")
+                return
+        if not can_move('F', order.location, target):
+            error(order, f"a fleet in {LOCATION_NAMES[order.location]} can't reach {LOCATION_NAMES[target]}")
+        return
+
+    src, dst = order.province, LOCATION_PROVINCE[target]
+    if is_sea(dst):
+        error(order, "armies can't move to sea provinces")
+        return
+    if dst == src:
+        error(order, "a unit can't move to its own province")
+        return
+    if can_move('A', order.location, dst) and not order.via_convoy:
+        return
+    if not convoy_route_exists(src, dst):
+        error(order, f"{PROVINCE_NAMES[src]} is not adjacent to {PROVINCE_NAMES[dst]} and no convoy route exists")
+        return
+    own_fleets = _bits(province for province, other in by_province.items()
+                       if other.kind == 'convoy' and other.supported is not None
+                       and LOCATION_PROVINCE[other.supported] == src)
+    if not convoy_route_exists(src, dst, own_fleets) and not can_move('A', order.location, dst):
+        warning(order, "needs a convoy; none of your fleets is ordered to convoy it (fine if an ally is)")
+
+
+def _check_support(state, country, order, by_province, error, warning):
+    supported_province = LOCATION_PROVINCE[order.supported]
+    supported_unit = state.units.get(supported_province)
+    if supported_province == order.province:
+        error(order, "a unit can't support itself")
+        return
+    if supported_unit is None:
+        error(order, f"there is no unit in {PROVINCE_NAMES[supported_province]} to support")
+        return
+
+    # The supporter must be able to move to where the support is given (coasts don't matter)
+    aim = LOCATION_PROVINCE[order.supported_target] if order.supported_target is not None else supported_province
+    if not can_reach_province(order.unit_type, order.location, aim):
+        error(order, f"{order.unit_type} {LOCATION_NAMES[order.location]} can't reach {PROVINCE_NAMES[aim]}, "
+                     f"so it can't support into it")
+        return
+
+    if order.supported_target is not None:
+        if not (can_reach_province(supported_unit.unit_type, supported_unit.location, aim)
+                or (supported_unit.unit_type == 'A' and convoy_route_exists(supported_province, aim))):
+            error(order, f"{supported_unit} can't reach {PROVINCE_NAMES[aim]}")
+            return
+
+    # Own supported units: does their order match?
+    other = by_province.get(supported_province)
+    if other is None:
+        if order.supported_target is not None and supported_unit.country == country:
+            warning(order, f"{supported_unit} has no order, so it holds and this support is wasted")
+        return
+    if order.supported_target is None and other.kind == 'move':
+        warning(order, f"supports {supported_unit} holding, but it is ordered to move ({other.text})")
+    elif order.supported_target is not None and (
+            other.kind != 'move' or LOCATION_PROVINCE[other.target] != aim):
+        warning(order, f"supports a move {supported_unit} isn't making ({other.text})")
+
+
+def _check_convoy(state, country, order, by_province, error, warning):
+    if order.unit_type != 'F' or not is_sea(order.province):
+        error(order, "only fleets in sea provinces can convoy")
+        return
+    army_province = LOCATION_PROVINCE[order.supported]
+    army = state.units.get(army_province)
+    if army is None or army.unit_type != 'A':
+        error(order, f"there is no army in {PROVINCE_NAMES[army_province]} to convoy")
+        return
+    dst = LOCATION_PROVINCE[order.supported_target]
+    if not convoy_route_exists(army_province, dst):
+        error(order, f"no convoy route from {PROVINCE_NAMES[army_province]} to {PROVINCE_NAMES[dst]}")
+        return
+    other = by_province.get(army_province)
+    if other is not None and (other.kind != 'move' or LOCATION_PROVINCE[other.target] != dst):
+        warning(order, f"convoys a move {army} isn't making ({other.text})")
+
@@ -0,0 +1,264 @@
+"""
+Configuration for Diplomacy LLM.
+config.yaml is parsed and validated once per process and shared as a
+read-only Config: a Mapping, so the usual config.get('section', {}).get(key)
+lookups work unchanged, but nothing can modify it mid-season.
+
+- load_config(): cached per (absolute) path; batch workers that chdir into
+  another game directory get that game's config
+- reload_config(): explicit re-read after config.yaml was edited
+- validate_config(): every problem is reported at startup as a ConfigError,
+  instead of a KeyError or TypeError halfway through a season
+
+To change settings programmatically, copy with to_dict(), edit, and write a
+new config.yaml (see batch.py and bench.py).
+"""
+
+import threading
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import yaml
+
+
+# libyaml's loader when PyYAML was built with it (about 10x faster to parse config.yaml)
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+class ConfigError(ValueError):
+    """config.yaml is missing, unreadable or has invalid settings."""
+
+
+class Config(Mapping):
+    """Read-only config section. Nested sections are Configs, lists are tuples."""
+
+    __slots__ = ('_data', 'path')
+
+    def __init__(self, data: Mapping, path: Optional[Path] = None):
+        self._data = {key: _freeze(value) for key, value in data.items()}
+        self.path = path
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return f"Config({self.to_dict()!r})"
+
+    def to_dict(self) -> dict:
+        """Mutable deep copy (plain dicts and lists), e.g. to write a derived config."""
+        return _thaw(self)
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return Config(value)
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+# =============================================================================
+# Validation
+# =============================================================================
+
+_MISSING = object()
+
+# Path keys read with config['paths'][key] (the rest have defaults)
+REQUIRED_PATHS = ['data_dir', 'shared_conversations_dir', 'game_history', 'game_state',
+                  'scratchpad', 'orders', 'lessons']
+OPTIONAL_PATHS = ['conversation_index', 'board', 'turn_order', 'snapshots_dir', 'telemetry', 'read_cursors',
+                  'summaries_dir']
+
+BUDGET_SECTIONS = ['state', 'orders', 'conversations', 'files', 'history']
+
+# (key, type, minimum) for optional settings; None = any value of that type
+TYPED_SETTINGS: List[Tuple[str, type, Optional[float]]] = [
+    ('cheap_model', str, None),
+    ('features.fog_of_war', bool, None),
+    ('features.gunboat', bool, None),
+    ('features.chess', bool, None),
+    ('llm.stream', bool, None),
+    ('llm.stub.latency', float, 0),
+    ('llm.stub.responses', str, None),
+    ('llm.cache.dir', str, None),
+    ('llm.cache.max_mb', float, 0),
+    ('llm.prefix_cache.enabled', bool, None),
+    ('llm.prefix_cache.ttl_minutes', float, 1),
+    ('llm.prefix_cache.min_tokens', int, 0),
+    ('llm.sessions.enabled', bool, None),
+    ('llm.sessions.max_update_tokens', int, 0),
+    ('llm.sessions.ttl_minutes', float, 0),
+    ('context.conversation_line_limit', int, None),
+    ('context.read_cursors.enabled', bool, None),
+    ('context.read_cursors.recent_lines', int, 0),
+    ('context.summaries.enabled', bool, None),
+    ('context.summaries.recent_seasons', int, 0),
+    ('context.summaries.max_season_summaries', int, 0),
+    ('context.summaries.max_words', int, 10),
+    ('context.token_budget.enabled', bool, None),
+    ('context.token_budget.total', int, 0),
+    ('api.max_retries', int, 0),
+    ('api.backoff_base', float, 0),
+    ('api.backoff_max', float, 0),
+    ('validation.check_orders', bool, None),
+    ('adjudication.auto', bool, None),
+    ('adjudication.clear_orders', bool, None),
+    ('batch.workers', int, 1),
+    ('telemetry.enabled', bool, None),
+    ('telemetry.flush_seconds', float, 0),
+    ('snapshots.keep', int, 0),
+    ('season.turn_rounds', int, 1),
+    ('concurrency.parallel_private_phases', bool, None),
+    ('concurrency.max_in_flight', int, 1),
+]
+
+CHOICES = {
+    'llm.backend': ['gemini', 'stub'],
+    'llm.cache.mode': ['off', 'record', 'replay'],
+}
+
+TYPE_NAMES = {bool: 'true/false', int: 'an integer', float: 'a number', str: 'a string'}
+
+
+def _lookup(data: Mapping, key: str) -> Any:
+    value = data
+    for part in key.split('.'):
+        if not isinstance(value, Mapping) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def _type_ok(value: Any, kind: type) -> bool:
+    if kind is bool:
+        return isinstance(value, bool)
+    if kind is int:
+        return isinstance(value, int) and not isinstance(value, bool)
+    if kind is float:
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    return isinstance(value, kind)
+
+
+def validate_config(data: Any) -> List[str]:
+    """Return every problem with a config, as 'key: problem' strings (empty if valid)."""
+    if not isinstance(data, Mapping):
+        return ["config must be a mapping of sections (is the file empty?)"]
+    errors = []
+
+    countries = data.get('countries')
+    if not isinstance(countries, (list, tuple)) or not countries:
+        errors.append("countries: must be a non-empty list of country names")
+    elif not all(isinstance(c, str) and c.strip() for c in countries):
+        errors.append("countries: every entry must be a country name")
+    elif len(set(countries)) != len(countries):
+        errors.append("countries: contains duplicates")
+
+    if not isinstance(data.get('model'), str) or not data.get('model'):
+        errors.append("model: must be a model name")
+
+    paths = data.get('paths')
+    if not isinstance(paths, Mapping):
+        errors.append("paths: missing")
+    else:
+        for key in REQUIRED_PATHS:
+            if not isinstance(paths.get(key), str) or not paths.get(key):
+                errors.append(f"paths.{key}: must be a file or directory name")
+        for key in OPTIONAL_PATHS:
+            if key in paths and not isinstance(paths[key], str):
+                errors.append(f"paths.{key}: must be a file or directory name")
+
+    for key, kind, minimum in TYPED_SETTINGS:
+        value = _lookup(data, key)
+        if value is _MISSING or value is None:
+            continue
+        if not _type_ok(value, kind):
+            errors.append(f"{key}: must be {TYPE_NAMES[kind]}, got {value!r}")
+        elif minimum is not None and value < minimum:
+            errors.append(f"{key}: must be at least {minimum:g}, got {value!r}")
+
+    for key, choices in CHOICES.items():
+        value = _lookup(data, key)
+        if value is _MISSING:
+            continue
+        if value not in choices:
+            hint = ' (quote "off" in YAML, unquoted off means false)' if value is False else ''
+            errors.append(f"{key}: must be one of {', '.join(choices)}, got {value!r}{hint}")
+
+    budget = _lookup(data, 'context.token_budget')
+    if isinstance(budget, Mapping):
+        for name in budget.get('priority') or []:
+            if name not in BUDGET_SECTIONS:
+                errors.append(f"context.token_budget.priority: unknown section {name!r}")
+        for name, value in (budget.get('sections') or {}).items():
+            if name not in BUDGET_SECTIONS:
+                errors.append(f"context.token_budget.sections: unknown section {name!r}")
+            elif not _type_ok(value, int) or value < 0:
+                errors.append(f"context.token_budget.sections.{name}: must be an integer >= 0")
+
+    limits = _lookup(data, 'api.rate_limits')
+    if isinstance(limits, Mapping):
+        for model_name, model_limits in limits.items():
+            for key, value in (model_limits or {}).items():
+                if key not in ('rpm', 'tpm') or not _type_ok(value, float) or value < 0:
+                    errors.append(f"api.rate_limits.{model_name}.{key}: expected rpm/tpm >= 0")
+    return errors
+
+
+# =============================================================================
+# Loading
+# =============================================================================
+
+_configs_lock = threading.Lock()
+_configs: Dict[Path, Config] = {}
+
+
+def parse_config(config_path: Path) -> Config:
+    """Read and validate a config file (uncached)."""
+    try:
+        with open(config_path, 'r') as f:
+            data = yaml.load(f, Loader=YAML_LOADER)
+    except OSError as e:
+        raise ConfigError(f"Cannot read {config_path}: {e}") from e
+    except yaml.YAMLError as e:
+        raise ConfigError(f"{config_path} is not valid YAML: {e}") from e
+
+    errors = validate_config(data)
+    if errors:
+        raise ConfigError(f"Invalid settings in {config_path}:\n" + '\n'.join(f"  - {e}" for e in errors))
+    return Config(data, config_path)
+
+
+def load_config(config_path: str = "config.yaml") -> Config:
+    """The shared, validated config for a path; parsed on first use only."""
+    path = Path(config_path).resolve()
+    with _configs_lock:
+        config = _configs.get(path)
+    if config is None:
+        config = parse_config(path)
+        with _configs_lock:
+            config = _configs.setdefault(path, config)
+    return config
+
+
+def reload_config(config_path: str = "config.yaml") -> Config:
+    """Re-read a config file, replacing the shared copy (later load_config calls see it)."""
+    path = Path(config_path).resolve()
+    config = parse_config(path)
+    with _configs_lock:
+        _configs[path] = config
+    return config
@@ -4,28 +4,198 @@ Loads and formats all context needed for a country to make decisions.
 Supports classic, fog of war, and gunboat modes (and combinations).
 """
 
+import json
+import os
+import re
+import threading
+from collections import Counter
 from pathlib import Path
-from typing import Dict, List
-import yaml
+from typing import Callable, Dict, Hashable, List, Optional, Tuple, Union
 
+from .config import Config, load_config
+from .conversations import get_conversation_index
 from .mode_loader import ModeLoader
-from .utils import is_fow, get_data_dir, get_country_dir, get_conversations_dir
-
+from .summaries import get_summary_settings, get_summary_path, parse_store, split_summarized
+from .utils import (
+    is_fow,
+    get_current_season,
+    get_data_dir,
+    get_country_dir,
+    get_conversations_dir,
+    read_tail_lines,
+    estimate_tokens,
+    trim_to_tokens,
+    atomic_write_text,
+)
+
+
+# =============================================================================
+# Context Cache
+# =============================================================================
+
+FileSignature = Tuple[int, int, int]  # (mtime_ns, size, invalidation generation)
+
+
+class ContextCache:
+    """Process-wide cache for context building, shared by all ContextLoaders.
+
+    Two levels:
+    - files: file text keyed on path, reused while (mtime_ns, size) is unchanged
+    - sections: rendered context sections, rebuilt only when their inputs change
+
+    Each slot keeps only its latest version, so memory stays bounded by the
+    number of files and sections rather than the number of turns.
+
+    Signatures also carry a per-file generation that invalidate() bumps, so an
+    in-process rewrite that keeps the same size within one mtime tick is still
+    seen as a change.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._generations: Dict[str, int] = {}
+        self._files: Dict[str, Tuple[FileSignature, str]] = {}
+        self._sections: Dict[Hashable, Tuple[Hashable, str]] = {}
+        self.file_hits = 0
+        self.file_misses = 0
+        self.section_hits = 0
+        self.section_misses = 0
+
+    def signature(self, path: Path) -> Optional[FileSignature]:
+        """Return (mtime_ns, size, generation) for a file, or None if it doesn't exist."""
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        generation = self._generations.get(os.path.abspath(path), 0)
+        return (stat.st_mtime_ns, stat.st_size, generation)
+
+    def read(self, path: Path) -> Optional[str]:
+        """Return a file's text (None if missing), reading from disk only when it changed."""
+        signature = self.signature(path)
+        if signature is None:
+            return None
+
+        key = os.path.abspath(path)  # Relative paths differ between game directories
+        with self._lock:
+            entry = self._files.get(key)
+            if entry is not None and entry[0] == signature:
+                self.file_hits += 1
+                return entry[1]
+            self.file_misses += 1
+
+        text = path.read_text()
+        with self._lock:
+            self._files[key] = (signature, text)
+        return text
+
+    def section(self, slot: Hashable, inputs: Hashable, build: Callable[[], str]) -> str:
+        """Return the cached section for slot if inputs match, otherwise build and store it."""
+        with self._lock:
+            entry = self._sections.get(slot)
+            if entry is not None and entry[0] == inputs:
+                self.section_hits += 1
+                return entry[1]
+            self.section_misses += 1
+
+        text = build()
+        with self._lock:
+            self._sections[slot] = (inputs, text)
+        return text
+
+    def invalidate(self, path: Path):
+        """Mark a file as changed (used after in-process writes)."""
+        key = os.path.abspath(path)
+        with self._lock:
+            self._generations[key] = self._generations.get(key, 0) + 1
+            self._files.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters for files and sections."""
+        with self._lock:
+            return {
+                'file_hits': self.file_hits,
+                'file_misses': self.file_misses,
+                'section_hits': self.section_hits,
+                'section_misses': self.section_misses,
+            }
+
+    def clear(self):
+        """Drop all cached files and sections and reset counters."""
+        with self._lock:
+            self._generations.clear()
+            self._files.clear()
+            self._sections.clear()
+            self.file_hits = self.file_misses = 0
+            self.section_hits = self.section_misses = 0
+
+
+_context_cache = ContextCache()
+
+
+def get_context_cache() -> ContextCache:
+    """Return the process-wide context cache."""
+    return _context_cache
+
+
+# =============================================================================
+# Read Conversations
+# =============================================================================
+
+MESSAGE_LINE_PATTERN = re.compile(r'^\*\*([^*:]+):\*\*')
+SEASON_LINE_PATTERN = re.compile(r'^#+\s*(.+?)\s*$')
+
+
+def summarize_read_messages(text: str, recent_lines: int) -> str:
+    """Compact stand-in for already-read conversation text.
+
+    Message counts per sender and the seasons covered, followed by the last
+    recent_lines lines verbatim. Short texts are returned as they are.
+    """
+    lines = [line for line in text.splitlines() if line.strip()]
+    if len(lines) <= recent_lines:
+        return '\n'.join(lines)
+
+    senders: Counter = Counter()
+    seasons: List[str] = []
+    for line in lines:
+        message = MESSAGE_LINE_PATTERN.match(line)
+        if message:
+            senders[message.group(1)] += 1
+            continue
+        season = SEASON_LINE_PATTERN.match(line)
+        if season:
+            seasons.append(season.group(1))
+
+    by_sender = ', '.join(f"{name} {count}" for name, count in sorted(senders.items()))
+    summary = f"*Already read: {sum(senders.values())} messages ({by_sender or 'none'})"
+    if seasons:
+        summary += f", {seasons[0]} to {seasons[-1]}" if seasons[0] != seasons[-1] else f", {seasons[0]}"
+    if recent_lines <= 0:
+        return summary + ".*"
+    return summary + ". Most recent:*\n" + '\n'.join(lines[-recent_lines:])
+
+
+# =============================================================================
+# Context Loader
+# =============================================================================
 
 class ContextLoader:
     """Loads context for a specific country from their files."""
 
-    def __init__(self, country: str, config_path: str = "config.yaml"):
+    def __init__(self, country: str, config: Union[Config, str, None] = None):
+        """config is the shared Config, or a path to load it from (default config.yaml)."""
         self.country = country
-
-        # Load config
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+        self.config = config if isinstance(config, Config) else load_config(config or "config.yaml")
 
         # Get conversation line limit from config (0 or negative = no limit)
         limit = self.config.get('context', {}).get('conversation_line_limit', 0)
         self.conversation_line_limit = limit if limit > 0 else None
 
+        # Optional token budget for the game data sections (see format_context)
+        self.token_budget = self.config.get('context', {}).get('token_budget', {}) or {}
+        self.last_budget_report: List[Dict[str, int]] = []
+
         # Set up paths using utils
         self.data_dir = get_data_dir(self.config)
         self.country_dir = get_country_dir(self.config, country)
@@ -35,139 +205,416 @@ class ContextLoader:
         self.game_history_file = self.country_dir / self.config['paths']['game_history']
         self.game_state_file = self.country_dir / self.config['paths']['game_state']
 
-    def load_game_history(self) -> str:
-        """Load game history. FoW uses per-country files; classic/gunboat use shared."""
+        # Read cursors: bytes of each conversation file already shown (context.read_cursors)
+        cursors = self.config.get('context', {}).get('read_cursors', {}) or {}
+        self.read_cursors_enabled = cursors.get('enabled', False)
+        self.recent_read_lines = cursors.get('recent_lines', 6)
+        self.read_cursors_file = self.country_dir / self.config['paths'].get('read_cursors', 'read_cursors.json')
+        self._read_cursors: Optional[Dict[str, int]] = None  # Loaded on first use
+        self.pending_read_cursors: Dict[str, int] = {}  # Offsets shown in the last context, until committed
+
+        # Older seasons of history and conversations as summaries (context.summaries, see src/summaries.py)
+        self.summary_settings = get_summary_settings(self.config)
+
+    def game_history_path(self) -> Path:
+        """Game history path. FoW uses per-country files; classic/gunboat use shared."""
         if is_fow(self.config):
-            path = self.game_history_file  # Per-country file
-        else:
-            path = self.data_dir / self.config['paths']['game_history']  # Shared file
+            return self.game_history_file  # Per-country file
+        return self.data_dir / self.config['paths']['game_history']  # Shared file
 
-        if path.exists():
-            return path.read_text()
+    def game_state_path(self) -> Path:
+        """Game state path. FoW uses per-country files; classic/gunboat use shared."""
+        if is_fow(self.config):
+            return self.game_state_file  # Per-country file
+        return self.data_dir / self.config['paths']['game_state']  # Shared file
+
+    def load_game_history(self) -> str:
+        """Load game history (older seasons summarized with context.summaries). FoW uses per-country files."""
+        path = self.game_history_path()
+        content = _context_cache.read(path)
+        if content is not None:
+            return ''.join(self._split_summarized(path, content))
         return "# Game History\n\nNo game history yet. The game is just beginning!"
 
     def load_game_state(self) -> str:
         """Load game state. FoW uses per-country files; classic/gunboat use shared."""
-        if is_fow(self.config):
-            path = self.game_state_file  # Per-country file
-        else:
-            path = self.data_dir / self.config['paths']['game_state']  # Shared file
-
-        if path.exists():
-            return path.read_text()
+        content = _context_cache.read(self.game_state_path())
+        if content is not None:
+            return content
         return "# Game State\n\nNo game state yet."
 
-    def load_country_files(self) -> Dict[str, str]:
-        """Load all .md files from the country directory except game_history and game_state."""
-        files = {}
-
+    def _country_file_paths(self) -> List[Path]:
+        """All .md files in the country directory except game_history and game_state."""
         if not self.country_dir.exists():
-            return files
+            return []
 
         reserved_files = {
             self.config['paths']['game_history'],
             self.config['paths']['game_state']
         }
+        return [f for f in self.country_dir.glob("*.md") if f.name not in reserved_files]
 
-        for md_file in self.country_dir.glob("*.md"):
-            if md_file.name not in reserved_files:
-                content = md_file.read_text().strip()
-                if content:  # Only include non-empty files
-                    files[md_file.name] = content
+    def load_country_files(self) -> Dict[str, str]:
+        """Load all .md files from the country directory except game_history and game_state."""
+        files = {}
+
+        for md_file in self._country_file_paths():
+            content = (_context_cache.read(md_file) or '').strip()
+            if content:  # Only include non-empty files
+                files[md_file.name] = content
 
         return files
 
+    def _conversation_paths(self) -> Dict[str, Path]:
+        """Map conversation label (other participants) to file, for this country's conversations."""
+        paths = {}
+
+        # Filenames like "Austria-France.md" or "England-France-Germany.md", looked up by participant
+        for conv_file in get_conversation_index(self.config).files_for(self.country):
+            # Use the full participant list as the key (minus this country)
+            other_participants = [p for p in conv_file.stem.split('-') if p != self.country]
+            if other_participants:
+                paths['-'.join(other_participants)] = conv_file
+
+        return paths
+
+    def read_cursors(self) -> Dict[str, int]:
+        """Byte offset up to which this country has read each conversation file."""
+        if self._read_cursors is None:
+            try:
+                self._read_cursors = json.loads(self.read_cursors_file.read_text())
+            except (OSError, ValueError):
+                self._read_cursors = {}
+        return self._read_cursors
+
+    def commit_read_cursors(self):
+        """Mark the conversations shown in the last context as read (once the call succeeded)."""
+        if not self.pending_read_cursors:
+            return
+        cursors = {**self.read_cursors(), **self.pending_read_cursors}
+        atomic_write_text(self.read_cursors_file, json.dumps(cursors, indent=2, sort_keys=True) + '\n')
+        self._read_cursors = cursors
+        self.pending_read_cursors = {}
+
+    def _split_summarized(self, path: Path, text: str) -> Tuple[str, str]:
+        """(older seasons as summaries, rest verbatim) when summaries are enabled, else ('', text)."""
+        if not self.summary_settings['enabled']:
+            return '', text
+        store = parse_store(_context_cache.read(get_summary_path(self.config, path)))
+        return split_summarized(text, store, self.summary_settings, get_current_season(self.config))
+
+    def _summary_inputs(self, paths: List[Path]) -> Tuple:
+        """Section cache inputs for the summaries of `paths` (the season decides which are used)."""
+        if not self.summary_settings['enabled']:
+            return ()
+        return (_context_cache.signature(self.game_state_path()),
+                tuple(_context_cache.signature(get_summary_path(self.config, path)) for path in paths))
+
+    def _load_unread_conversation(self, conv_file: Path) -> str:
+        """Load one conversation as a summary of what was read plus every unread message."""
+        text = _context_cache.read(conv_file) or ''
+        raw = text.encode('utf-8')
+        offset = self.read_cursors().get(conv_file.name, 0)
+        if offset > len(raw):
+            offset = 0  # The file was rewritten (e.g. a snapshot was restored)
+        self.pending_read_cursors[conv_file.name] = len(raw)
+
+        # Older seasons with a season summary are shown as that, read or not
+        summarized, rest = self._split_summarized(conv_file, text)
+        start = len(raw) - len(rest.encode('utf-8'))
+        offset = max(offset, start)
+
+        read = raw[start:offset].decode('utf-8', errors='replace')
+        unread = raw[offset:].decode('utf-8', errors='replace').strip()
+        parts = [summarized.strip()] if summarized.strip() else []
+        if read.strip():
+            parts.append(summarize_read_messages(read, self.recent_read_lines))
+        if unread:
+            parts.append(f"**New since your last turn:**\n{unread}" if parts else unread)
+        else:
+            parts.append("(No new messages since your last turn.)")
+        return '\n\n'.join(parts)
+
+    def _load_conversation(self, conv_file: Path) -> str:
+        """Load one conversation, keeping only the last N lines if a limit is set."""
+        if self.read_cursors_enabled:
+            return self._load_unread_conversation(conv_file)
+        if self.summary_settings['enabled']:
+            return self._load_summarized_conversation(conv_file)
+        if self.conversation_line_limit is None:
+            return _context_cache.read(conv_file) or ''
+
+        # Apply line limit (read only the tail of the file)
+        lines, truncated = read_tail_lines(conv_file, self.conversation_line_limit)
+        content = '\n'.join(lines)
+        if truncated:
+            content = f"[... earlier messages truncated ...]\n\n" + content
+
+        return content
+
+    def _load_summarized_conversation(self, conv_file: Path) -> str:
+        """Load one conversation with older seasons summarized, line-limiting only the verbatim rest."""
+        summarized, rest = self._split_summarized(conv_file, _context_cache.read(conv_file) or '')
+        lines = rest.split('\n')
+        if self.conversation_line_limit is not None and len(lines) > self.conversation_line_limit:
+            rest = "[... earlier messages truncated ...]\n\n" + '\n'.join(lines[-self.conversation_line_limit:])
+        return summarized + rest
+
     def load_conversations(self) -> Dict[str, str]:
         """Load all conversation files where this country is a participant."""
-        conversations = {}
-
         # No conversations if messaging is disabled
         mode_loader = ModeLoader(self.config)
         if not mode_loader.is_feature_enabled("messaging_instructions"):
-            return conversations
-
-        if not self.conversations_dir.exists():
-            return conversations
+            return {}
 
-        # Load any conversation file that contains this country's name
-        for conv_file in self.conversations_dir.glob("*.md"):
-            # Parse filename like "Austria-France.md" or "England-France-Germany.md"
-            participants = conv_file.stem.split('-')
-
-            # Only load if this country is a participant
-            if self.country in participants:
-                # Use the full participant list as the key (minus this country)
-                other_participants = [p for p in participants if p != self.country]
-                if other_participants:
-                    label = '-'.join(other_participants)
-                    content = conv_file.read_text()
-
-                    # Apply line limit if set (take last N lines)
-                    if self.conversation_line_limit is not None:
-                        lines = content.split('\n')
-                        if len(lines) > self.conversation_line_limit:
-                            content = f"[... earlier messages truncated ...]\n\n" + '\n'.join(lines[-self.conversation_line_limit:])
-
-                    conversations[label] = content
-
-        return conversations
+        return {label: self._load_conversation(path)
+                for label, path in self._conversation_paths().items()}
 
     def format_context(self) -> str:
         """Format all context into a single prompt for the LLM.
 
-        Combines mode-specific prompts with game data.
+        Combines mode-specific prompts with game data. Each section is cached in
+        the shared ContextCache and only rebuilt when its input files change.
+        With context.token_budget.enabled, sections are trimmed to fit instead.
         """
-        mode_loader = ModeLoader(self.config)
-
-        # Load game data
-        game_state = self.load_game_state()
-        game_history = self.load_game_history()
-        country_files = self.load_country_files()
-        conversations = self.load_conversations()
+        return ''.join(self.format_context_parts())
 
-        # Build context from mode templates
-        header = mode_loader.get_prompt("context_header", {"country": self.country})
-        rules = mode_loader.get_prompt("rules")
+    def format_context_parts(self) -> Tuple[str, str]:
+        """The context split into (stable prefix, volatile rest).
 
-        context = f"{header}\n"
-
-        if rules:
-            context += f"\n{rules}\n"
-
-        # Add game data sections
-        context += f"""
----
-
-# YOUR CURRENT STATE
-{game_state}
-
----
-
-# YOUR GAME HISTORY
-{game_history}
+        The prefix (context header, rules, game state and game history) only
+        changes between seasons, so it can be cached by the provider (see
+        src/prefix_cache.py). With a token budget, state and history are
+        trimmed against what the other sections leave, so only the header
+        and rules are stable.
+        """
+        mode_loader = ModeLoader(self.config)
+        messaging = mode_loader.is_feature_enabled("messaging_instructions")
+        self.pending_read_cursors = {}
 
----
+        if self.token_budget.get('enabled', False):
+            return self._format_budgeted_context(mode_loader, messaging)
 
-# YOUR FILES
-"""
+        prefix = ''.join([
+            self._preamble_section(mode_loader),
+            self._file_section("state", "YOUR CURRENT STATE", self.game_state_path(), self.load_game_state),
+            self._file_section("history", "YOUR GAME HISTORY", self.game_history_path(), self.load_game_history,
+                               self._summary_inputs([self.game_history_path()])),
+        ])
+        parts = [self._country_files_section()]
 
+        # Only show conversation section if messaging is enabled
+        if messaging:
+            parts.append(self._conversations_section())
+
+        return prefix, ''.join(parts)
+
+    def _preamble_section(self, mode_loader: ModeLoader) -> str:
+        """Context header and rules (static for a country and set of active modes)."""
+        def build():
+            header = mode_loader.get_prompt("context_header", {"country": self.country})
+            rules = mode_loader.get_prompt("rules")
+            if rules:
+                return f"{header}\n\n{rules}\n"
+            return f"{header}\n"
+
+        inputs = (tuple(mode_loader.get_active_modes()), tuple(sorted(self.config['paths'].items())))
+        return _context_cache.section(("preamble", self.country), inputs, build)
+
+    @staticmethod
+    def _format_text_section(title: str, content: str) -> str:
+        return f"\n---\n\n# {title}\n{content}\n"
+
+    @staticmethod
+    def _format_files(country_files: Dict[str, str]) -> str:
+        parts = ["\n---\n\n# YOUR FILES\n"]
         if country_files:
             for filename, content in sorted(country_files.items()):
-                context += f"\n## {filename}\n{content}\n"
+                parts.append(f"\n## {filename}\n{content}\n")
+        else:
+            parts.append("\nNo files yet. Create some to organize your thoughts!\n")
+        return ''.join(parts)
+
+    @staticmethod
+    def _format_conversations(conversations: Dict[str, str]) -> str:
+        parts = ["\n---\n\n# CONVERSATION HISTORY\n"]
+        if conversations:
+            for participants, conv_text in sorted(conversations.items()):
+                parts.append(f"\n## Conversation with {participants}\n{conv_text}\n")
         else:
-            context += "\nNo files yet. Create some to organize your thoughts!\n"
+            parts.append("\nNo conversations yet. You may want to reach out to other countries!\n")
+        return ''.join(parts)
+
+    def _file_section(self, name: str, title: str, path: Path, load: Callable[[], str],
+                      extra_inputs: Hashable = ()) -> str:
+        """A titled section holding a single file's contents."""
+        return _context_cache.section(
+            (name, os.path.abspath(path)), (_context_cache.signature(path), extra_inputs),
+            lambda: self._format_text_section(title, load()))
+
+    def _country_files_section(self) -> str:
+        """The YOUR FILES section with every non-empty country file."""
+        paths = sorted(self._country_file_paths())
+        inputs = tuple((p.name, _context_cache.signature(p)) for p in paths)
+        return _context_cache.section(
+            ("files", os.path.abspath(self.country_dir)), inputs,
+            lambda: self._format_files(self.load_country_files()))
+
+    def _conversations_section(self) -> str:
+        """The CONVERSATION HISTORY section with all of this country's conversations."""
+        paths = self._conversation_paths()
+        signatures = {label: _context_cache.signature(path) for label, path in paths.items()}
+        inputs = (self.conversation_line_limit, tuple(sorted(signatures.items())),
+                  self._summary_inputs([paths[label] for label in sorted(paths)]))
+        if self.read_cursors_enabled:
+            # Cached sections are reused too, so the offsets shown come from the file sizes
+            inputs += (tuple(sorted(self.read_cursors().items())),)
+            self.pending_read_cursors.update(
+                {paths[label].name: sig[1] for label, sig in signatures.items() if sig is not None})
+
+        def build():
+            return self._format_conversations(
+                {label: self._load_conversation(path) for label, path in paths.items()})
+
+        return _context_cache.section(
+            ("conversations", self.country, os.path.abspath(self.conversations_dir)), inputs, build)
+
+    # -------------------------------------------------------------------------
+    # Token budget
+    # -------------------------------------------------------------------------
+
+    DEFAULT_BUDGET_PRIORITY = ["state", "orders", "conversations", "files", "history"]
+
+    def _format_budgeted_context(self, mode_loader: ModeLoader, messaging: bool) -> Tuple[str, str]:
+        """Build the context with each game data section trimmed to its token budget.
+
+        Sections are funded in priority order (context.token_budget.priority,
+        default: state > orders > conversations > files > history). Each gets
+        the smaller of its own cap (token_budget.sections) and what is left of
+        token_budget.total; 0 means no limit. History, conversations and files
+        keep their most recent lines; state keeps its first lines. What was
+        trimmed is kept in self.last_budget_report.
+        """
+        caps = self.token_budget.get('sections', {}) or {}
+        priority = self.token_budget.get('priority') or self.DEFAULT_BUDGET_PRIORITY
+        remaining = self.token_budget.get('total', 0) or None
+        report = []
+
+        def allowance(section: str) -> Optional[int]:
+            cap = caps.get(section, 0) or None
+            if remaining is None:
+                return cap
+            return remaining if cap is None else min(cap, remaining)
+
+        def spend(section: str, items: Dict[str, str], keep: str) -> Dict[str, str]:
+            """Fit items into the section's allowance, sharing it evenly (water-filling)."""
+            nonlocal remaining
+            budget = allowance(section)
+            before = sum(estimate_tokens(text) for text in items.values())
+            result = dict(items)
+            if budget is not None:
+                left = budget
+                ordered = sorted(items, key=lambda k: estimate_tokens(items[k]))
+                for i, key in enumerate(ordered):
+                    share = left // (len(ordered) - i)
+                    result[key], _ = trim_to_tokens(items[key], share, keep)
+                    left -= min(estimate_tokens(result[key]), share)
+            after = sum(estimate_tokens(text) for text in result.values())
+            if remaining is not None:
+                remaining = max(0, remaining - after)
+            report.append({'section': section, 'tokens': before, 'kept': after,
+                           'budget': budget if budget is not None else 0})
+            return result
+
+        orders_file = self.config['paths']['orders']
+        country_files = self.load_country_files()
+        sources = {
+            'state': ({'state': self.load_game_state()}, "head"),
+            'history': ({'history': self.load_game_history()}, "tail"),
+            'orders': ({k: v for k, v in country_files.items() if k == orders_file}, "tail"),
+            'files': ({k: v for k, v in country_files.items() if k != orders_file}, "tail"),
+            'conversations': (self.load_conversations() if messaging else {}, "tail"),
+        }
 
-        # Only show conversation section if messaging is enabled
-        if mode_loader.is_feature_enabled("messaging_instructions"):
-            context += "\n---\n\n# CONVERSATION HISTORY\n"
+        fitted = {}
+        for section in priority:
+            if section in sources:
+                items, keep = sources.pop(section)
+                fitted[section] = spend(section, items, keep)
+        for section, (items, keep) in sources.items():  # Sections missing from priority go last
+            fitted[section] = spend(section, items, keep)
+
+        self.last_budget_report = report
+
+        parts = [
+            self._format_text_section("YOUR CURRENT STATE", fitted['state']['state']),
+            self._format_text_section("YOUR GAME HISTORY", fitted['history']['history']),
+            self._format_files({**fitted['orders'], **fitted['files']}),
+        ]
+        if messaging:
+            parts.append(self._format_conversations(fitted['conversations']))
+        return self._preamble_section(mode_loader), ''.join(parts)
+
+    # -------------------------------------------------------------------------
+    # Context updates (persistent chat sessions)
+    # -------------------------------------------------------------------------
+
+    def context_sections(self) -> Dict[str, Dict[str, str]]:
+        """Country files and full conversation texts, to diff later prompts against (see src/sessions.py)."""
+        conversations = {}
+        if ModeLoader(self.config).is_feature_enabled("messaging_instructions"):
+            for label, path in self._conversation_paths().items():
+                conversations[label] = _context_cache.read(path) or ''
+                if self.read_cursors_enabled:
+                    self.pending_read_cursors[path.name] = len(conversations[label].encode('utf-8'))
+        return {'files': self.load_country_files(), 'conversations': conversations}
+
+    def format_context_update(self, sent: Dict[str, Dict[str, str]], current: Dict[str, Dict[str, str]]) -> str:
+        """What changed between two context_sections(): new conversation lines and changed files.
+
+        Text appended to a file or conversation (void.md, messages) is shown
+        on its own; anything rewritten is shown in full.
+        """
+        header = ModeLoader(self.config).get_prompt("context_update", {"country": self.country})
+        parts = [f"{header.rstrip()}\n"]
 
-            if conversations:
-                for participants, conv_text in sorted(conversations.items()):
-                    context += f"\n## Conversation with {participants}\n{conv_text}\n"
+        files = {}
+        for name, text in current['files'].items():
+            old = sent['files'].get(name)
+            if text == old:
+                continue
+            if old and text.startswith(old):
+                files[f"{name} (new lines)"] = text[len(old):].strip('\n')
             else:
-                context += "\nNo conversations yet. You may want to reach out to other countries!\n"
+                files[name] = text
+        emptied = sorted(name for name in sent['files'] if name not in current['files'])
+        if files or emptied:
+            parts.append("\n---\n\n# YOUR FILES (changed)\n")
+            for name, text in sorted(files.items()):
+                parts.append(f"\n## {name}\n{text}\n")
+            for name in emptied:
+                parts.append(f"\n## {name}\n(now empty)\n")
 
-        return context
+        conversations = {}
+        for label, text in current['conversations'].items():
+            old = sent['conversations'].get(label, '')
+            if text == old:
+                continue
+            conversations[label] = text[len(old):].strip('\n') if text.startswith(old) else text
+        if conversations:
+            parts.append("\n---\n\n# NEW CONVERSATION MESSAGES\n")
+            for participants, new_text in sorted(conversations.items()):
+                parts.append(f"\n## Conversation with {participants}\n{new_text}\n")
+
+        if len(parts) == 1:
+            parts.append("\nNothing has changed since your last prompt.\n")
+        return ''.join(parts)
+
+    def budget_summary(self) -> str:
+        """One-line summary of sections trimmed by the last budgeted format_context()."""
+        trimmed = [f"{r['section']} {r['tokens']}→{r['kept']}"
+                   for r in self.last_budget_report if r['kept'] < r['tokens']]
+        return ', '.join(trimmed)
 
     def get_conversation_filename(self, participants: List[str]) -> str:
         """Generate standardized conversation filename from participant list."""
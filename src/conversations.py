@@ -0,0 +1,149 @@
+"""
+Conversation index for Diplomacy LLM.
+Keeps a persistent participant -> conversation file index so each country's
+conversations can be looked up directly instead of globbing and splitting
+every filename in the conversations directory on every turn.
+
+The index lives in data_dir (paths.conversation_index) rather than inside the
+conversations directory, so it can record the directory's mtime: creating or
+deleting a conversation file changes that mtime, which marks the index stale
+and triggers a rebuild from a single directory scan. Files created by the
+agents are added incrementally: add() gets the mtime from before the file was
+created, so their own change doesn't count as an external one.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .utils import get_data_dir, get_conversations_dir
+
+
+DEFAULT_INDEX_FILE = "_conversation_index.json"
+
+
+class ConversationIndex:
+    """Participant -> conversation filenames, persisted as JSON and kept in memory."""
+
+    def __init__(self, config: dict):
+        self.conversations_dir = get_conversations_dir(config)
+        self.index_path = get_data_dir(config) / config['paths'].get('conversation_index', DEFAULT_INDEX_FILE)
+        self._lock = threading.Lock()
+        self._dir_mtime_ns: Optional[int] = None
+        self._participants: Dict[str, List[str]] = {}
+        self._files: List[str] = []
+        self._loaded = False
+
+    def _current_dir_mtime(self) -> Optional[int]:
+        try:
+            return self.conversations_dir.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _load_locked(self):
+        """Load the index from disk if present (caller holds _lock)."""
+        self._loaded = True
+        try:
+            data = json.loads(self.index_path.read_text())
+            self._dir_mtime_ns = data['dir_mtime_ns']
+            self._files = list(data['files'])
+            self._participants = {k: list(v) for k, v in data['participants'].items()}
+        except (FileNotFoundError, ValueError, KeyError, TypeError):
+            self._dir_mtime_ns = None
+            self._files = []
+            self._participants = {}
+
+    def _save_locked(self):
+        """Atomically write the index to disk (caller holds _lock)."""
+        if not self.index_path.parent.exists():
+            return
+        data = {
+            'dir_mtime_ns': self._dir_mtime_ns,
+            'files': self._files,
+            'participants': self._participants,
+        }
+        tmp_path = self.index_path.with_name(self.index_path.name + '.tmp')
+        tmp_path.write_text(json.dumps(data, indent=1, sort_keys=True))
+        os.replace(tmp_path, self.index_path)
+
+    def _add_locked(self, filename: str):
+        if filename in self._files:
+            return
+        self._files.append(filename)
+        self._files.sort()
+        for participant in Path(filename).stem.split('-'):
+            names = self._participants.setdefault(participant, [])
+            names.append(filename)
+            names.sort()
+
+    def _rebuild_locked(self):
+        """Rebuild from one scan of the conversations directory (caller holds _lock)."""
+        self._files = []
+        self._participants = {}
+        self._dir_mtime_ns = self._current_dir_mtime()
+        if self._dir_mtime_ns is not None:
+            for entry in os.scandir(self.conversations_dir):
+                if entry.name.endswith('.md') and entry.is_file():
+                    self._add_locked(entry.name)
+        self._save_locked()
+
+    def _ensure_fresh_locked(self):
+        if not self._loaded:
+            self._load_locked()
+        if self._dir_mtime_ns is None or self._dir_mtime_ns != self._current_dir_mtime():
+            self._rebuild_locked()
+
+    def rebuild(self):
+        """Force a rebuild from the conversations directory."""
+        with self._lock:
+            self._loaded = True
+            self._rebuild_locked()
+
+    def dir_mtime(self) -> Optional[int]:
+        """The conversations directory's mtime (read it before creating a file, for add())."""
+        return self._current_dir_mtime()
+
+    def add(self, conv_file: Path, dir_mtime_before: Optional[int] = None):
+        """Record a newly created conversation file.
+
+        If the index matched the directory just before the file was created
+        (dir_mtime_before), only that file is added; otherwise it is rebuilt.
+        """
+        with self._lock:
+            if not self._loaded:
+                self._load_locked()
+            if dir_mtime_before is None or self._dir_mtime_ns != dir_mtime_before:
+                self._rebuild_locked()
+                return
+            self._add_locked(conv_file.name)
+            self._dir_mtime_ns = self._current_dir_mtime()
+            self._save_locked()
+
+    def files_for(self, country: str) -> List[Path]:
+        """Conversation files where country is a participant."""
+        with self._lock:
+            self._ensure_fresh_locked()
+            return [self.conversations_dir / name for name in self._participants.get(country, [])]
+
+    def all_files(self) -> List[Path]:
+        """All conversation files."""
+        with self._lock:
+            self._ensure_fresh_locked()
+            return [self.conversations_dir / name for name in self._files]
+
+
+_indexes_lock = threading.Lock()
+_indexes: Dict[str, ConversationIndex] = {}
+
+
+def get_conversation_index(config: dict) -> ConversationIndex:
+    """Return the process-wide index for the configured conversations directory."""
+    key = os.path.abspath(get_conversations_dir(config))
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = ConversationIndex(config)
+            _indexes[key] = index
+        return index
@@ -1,10 +1,14 @@
 """
 Game state management for Diplomacy LLM.
-Handles initialization, cleanup, status display, and templates.
+Handles initialization, cleanup, status display, turn order, and templates.
+Imports stay light: `status`, `cleanup` and `randomize` run without loading
+the agent stack.
 """
 
+import random
 from pathlib import Path
 
+from .board import parse_game_state
 from .utils import (
     load_config,
     is_fow,
@@ -103,6 +107,11 @@ def cleanup():
     else:
         print("- No conversations directory")
 
+    index_path = data_dir / config['paths'].get('conversation_index', '_conversation_index.json')
+    if index_path.exists():
+        index_path.unlink()
+        print("✓ Removed conversation index")
+
     # Clear ALL country folders (not just current config countries)
     # This handles switching between variants with different country lists
     import shutil
@@ -123,15 +132,72 @@ def cleanup():
                 shared_path.unlink()
                 print(f"✓ Removed shared {shared_file}")
 
+    # The adjudicator's full board (fog of war)
+    board_path = data_dir / config['paths'].get('board', '_board.md')
+    if board_path.exists():
+        board_path.unlink()
+        print(f"✓ Removed {board_path.name}")
+
+    # Season snapshots belong to the game being reset
+    snapshots_dir = Path(config['paths'].get('snapshots_dir', 'snapshots'))
+    if snapshots_dir.exists():
+        shutil.rmtree(snapshots_dir)
+        print(f"✓ Removed {snapshots_dir}/ snapshots")
+
+    telemetry_path = Path(config['paths'].get('telemetry', 'telemetry.jsonl'))
+    if telemetry_path.exists():
+        telemetry_path.unlink()
+        print(f"✓ Removed {telemetry_path}")
+
     print("\n✓ Cleanup complete!")
 
 
+# =============================================================================
+# Turn Order Management
+# =============================================================================
+
+def get_turn_order_path(config: dict = None) -> Path:
+    """Turn order file (paths.turn_order, relative to the game directory)."""
+    if config is None:
+        config = load_config()
+    return Path(config.get('paths', {}).get('turn_order', 'turn_order.txt'))
+
+
+def load_turn_order(config: dict = None) -> list:
+    """Load turn order from turn_order.txt."""
+    turn_order_file = get_turn_order_path(config)
+    if not turn_order_file.exists():
+        return []
+    lines = turn_order_file.read_text().strip().split('\n')
+    return [line.strip() for line in lines if line.strip()]
+
+
+def save_turn_order(turn_order: list, config: dict = None):
+    """Save turn order to turn_order.txt."""
+    turn_order_file = get_turn_order_path(config)
+    turn_order_file.write_text('\n'.join(turn_order) + '\n')
+
+
+def randomize_order():
+    """Randomize and save turn order to turn_order.txt."""
+    config = load_config()
+    countries = get_all_countries(config)
+    turn_order = countries.copy()
+    random.shuffle(turn_order)
+    save_turn_order(turn_order, config)
+    print(f"Turn order saved to {get_turn_order_path(config)}:")
+    for country in turn_order:
+        print(f"  {country}")
+
+
 # =============================================================================
 # Initialization
 # =============================================================================
 
 def initialize_game(skip_cleanup: bool = False):
     """Initialize the game. Runs cleanup first by default."""
+    from .adjudicator import get_board_path, write_board
+
     if not skip_cleanup:
         cleanup()
         print()  # Add spacing between cleanup and init output
@@ -167,6 +233,14 @@ def initialize_game(skip_cleanup: bool = False):
         else:
             print(f"✓ Created {country}/")
 
+    if fow_enabled and Path('beginning_info.md').exists():
+        # FoW: the full board stays hidden; each country gets the part it can see
+        state = parse_game_state(Path('beginning_info.md').read_text())
+        if state.units:
+            write_board(config, state)
+            print(f"✓ Wrote {get_board_path(config).name} and each country's visible game_state.md "
+                  f"from beginning_info.md")
+
     if not fow_enabled:
         # Classic/Gunboat mode: copy beginning_info.md to game_state.md, create game_history.md
         beginning_info = Path('beginning_info.md')
@@ -184,7 +258,7 @@ def initialize_game(skip_cleanup: bool = False):
     print("\n✓ Game initialized!")
     print(f"\nMode: {mode_name}")
     print("\nNext steps:")
-    if fow_enabled:
+    if fow_enabled and not get_board_path(config).exists():
         print("  1. Fill in each country's game_state.md with their starting visibility")
         print("  2. Make sure your .env file has your Gemini API key")
         print("  3. Run: python diplomacy.py status")
@@ -0,0 +1,387 @@
+"""
+LLM backends for Diplomacy LLM.
+Selects the backend from config.yaml (llm.backend) and shares one model handle
+per model name across the process.
+
+Backends hand out model objects that mirror the parts of the Gemini SDK the
+agents use: model.start_chat(history=[]) -> chat, chat.send_message(prompt)
+-> response with .text, plus send_message_async. chat.send_message(prompt,
+stream=True) returns an iterable of chunks, each with .text.
+
+- gemini: google.generativeai (imported lazily, needs GEMINI_API_KEY)
+- stub:   offline stand-in that returns templated responses with MESSAGE,
+          FILE and NOTE tags after a configurable artificial latency
+
+With llm.cache.mode set to record or replay, models are wrapped in the
+response cache (see src/response_cache.py). Backends also create the model
+handles for cached prompt prefixes (see src/prefix_cache.py).
+"""
+
+import asyncio
+import datetime
+import hashlib
+import os
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import yaml
+
+from .response_cache import CachedModel, get_cache_mode, get_response_cache
+
+
+# =============================================================================
+# Backend Interface
+# =============================================================================
+
+class LLMBackend(ABC):
+    """Base class for LLM backends. Subclasses create model handles."""
+
+    name = "base"
+
+    def __init__(self, config: dict):
+        self.config = config
+        self._lock = threading.Lock()
+        self._models: Dict[str, Any] = {}
+
+    def get_model(self, model_name: str) -> Any:
+        """Return the shared model handle for a model name, creating it on first use."""
+        with self._lock:
+            model = self._models.get(model_name)
+            if model is None:
+                model = self._create_model(model_name)
+                self._models[model_name] = model
+            return model
+
+    @abstractmethod
+    def _create_model(self, model_name: str) -> Any:
+        """Create the model handle for a model name (called once per name)."""
+
+    def create_cached_prefix(self, model_name: str, prefix: str, ttl_seconds: float) -> Tuple[Any, Any]:
+        """Register a prompt prefix; returns (cache handle, model whose chats continue after it).
+
+        The default is the local stand-in: nothing is registered and each
+        chat's first message carries the prefix inline.
+        """
+        return None, InlinePrefixModel(self.get_model(model_name), prefix)
+
+    def delete_cached_prefix(self, handle: Any):
+        """Release a prefix registered by create_cached_prefix."""
+
+
+class InlinePrefixChat:
+    """Chat that sends the prefix in front of its first message."""
+
+    def __init__(self, chat: Any, prefix: str):
+        self._chat = chat
+        self._prefix = prefix
+
+    def _with_prefix(self, prompt: str) -> str:
+        prefix, self._prefix = self._prefix, ''
+        return f"{prefix}\n---\n\n{prompt}" if prefix else prompt
+
+    def send_message(self, prompt: str, stream: bool = False):
+        return self._chat.send_message(self._with_prefix(prompt), stream=stream)
+
+    async def send_message_async(self, prompt: str):
+        return await self._chat.send_message_async(self._with_prefix(prompt))
+
+
+class InlinePrefixModel:
+    """Model handle for a prefix that is sent inline (stand-in for provider caching)."""
+
+    def __init__(self, model: Any, prefix: str):
+        self._model = model
+        self.prefix = prefix
+
+    def start_chat(self, history: Optional[List[Any]] = None) -> InlinePrefixChat:
+        return InlinePrefixChat(self._model.start_chat(history=history), self.prefix)
+
+
+# =============================================================================
+# Gemini Backend
+# =============================================================================
+
+class GeminiBackend(LLMBackend):
+    """Google Gemini via google.generativeai. The SDK is configured once."""
+
+    name = "gemini"
+
+    def __init__(self, config: dict):
+        super().__init__(config)
+        self._configured = False
+
+    def _configure_locked(self):
+        """Configure the Gemini SDK with the API key from .env (caller holds _lock)."""
+        if self._configured:
+            return
+
+        import google.generativeai as genai
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        api_key = os.getenv('GEMINI_API_KEY')
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY not found in .env file")
+
+        genai.configure(api_key=api_key)
+        self._configured = True
+
+    def _create_model(self, model_name: str) -> Any:
+        import google.generativeai as genai
+
+        self._configure_locked()
+        return genai.GenerativeModel(model_name)
+
+    def create_cached_prefix(self, model_name: str, prefix: str, ttl_seconds: float) -> Tuple[Any, Any]:
+        """Gemini context caching: the prefix is stored server-side and billed at the cached rate."""
+        import google.generativeai as genai
+        from google.generativeai import caching
+
+        with self._lock:
+            self._configure_locked()
+        digest = hashlib.sha256(prefix.encode('utf-8')).hexdigest()
+        cache = caching.CachedContent.create(
+            model=model_name,
+            display_name=f"diplomacy-{digest[:16]}",
+            contents=[prefix],
+            ttl=datetime.timedelta(seconds=ttl_seconds),
+        )
+        return cache, genai.GenerativeModel.from_cached_content(cached_content=cache)
+
+    def delete_cached_prefix(self, handle: Any):
+        handle.delete()
+
+
+# =============================================================================
+# Stub Backend (offline)
+# =============================================================================
+
+DEFAULT_STUB_RESPONSES = {
+    'plan': [
+        "Planning as {country}.\n\n"
+        "<NOTE>{country} plan: hold the line and sound out {other}.</NOTE>\n"
+        "<FILE name=\"strategy.md\" mode=\"append\">Season goal: keep home centers safe, probe {other}.</FILE>",
+    ],
+    'turn': [
+        "<MESSAGE to=\"{other}\">Hello from {country}. Can we agree not to attack each other this season?</MESSAGE>\n"
+        "<NOTE>Asked {other} for a non-aggression pact.</NOTE>",
+        "<MESSAGE to=\"{other}\">{country} here. What are your plans for this season?</MESSAGE>\n"
+        "<NOTE>Waiting on {other}'s answer.</NOTE>",
+        "DONE",
+    ],
+    'react': [
+        "<NOTE>{country} holds this season.</NOTE>\n"
+        "<FILE name=\"{orders_file}\" mode=\"edit\">{orders}</FILE>",
+    ],
+    'reflect': [
+        "Reflecting as {country}.\n\n"
+        "<FILE name=\"strategy.md\" mode=\"edit\">Keep home centers. Watch {other}.</FILE>\n"
+        "<FILE name=\"{orders_file}\" mode=\"edit\">{orders}</FILE>",
+    ],
+    'query': [
+        "{country} has nothing to hide from the GM.",
+    ],
+    'summarize': [
+        "- Quiet season: no agreements, betrayals or center changes worth noting (stub summary).",
+    ],
+    'default': [
+        "<NOTE>{country} received a prompt.</NOTE>",
+    ],
+}
+
+
+class StubResponse:
+    """Response object with the .text attribute agents read."""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class StubStream:
+    """Streamed response: yields chunks of the text, spreading the latency across them."""
+
+    CHUNK_CHARS = 64
+
+    def __init__(self, text: str, latency: float):
+        self.text = text
+        self.latency = latency
+
+    def __iter__(self):
+        chunks = [self.text[i:i + self.CHUNK_CHARS] for i in range(0, len(self.text), self.CHUNK_CHARS)] or ['']
+        for chunk in chunks:
+            if self.latency > 0:
+                time.sleep(self.latency / len(chunks))
+            yield StubResponse(chunk)
+
+
+class StubChat:
+    """Chat session returning templated responses after an artificial delay."""
+
+    def __init__(self, model: "StubModel", history: Optional[List[Any]] = None):
+        self.model = model
+        self.history = list(history or [])
+
+    def send_message(self, prompt: str, stream: bool = False):
+        if stream:
+            return StubStream(self._respond(prompt).text, self.model.latency)
+        if self.model.latency > 0:
+            time.sleep(self.model.latency)
+        return self._respond(prompt)
+
+    async def send_message_async(self, prompt: str) -> StubResponse:
+        if self.model.latency > 0:
+            await asyncio.sleep(self.model.latency)
+        return self._respond(prompt)
+
+    def _respond(self, prompt: str) -> StubResponse:
+        earlier = '\n'.join(part for turn in self.history if turn['role'] == 'user' for part in turn['parts'])
+        text = self.model.render(prompt, earlier)
+        self.history.append({'role': 'user', 'parts': [prompt]})
+        self.history.append({'role': 'model', 'parts': [text]})
+        return StubResponse(text)
+
+
+class StubModel:
+    """Deterministic offline model. The response depends only on the prompt."""
+
+    PHASE_PATTERN = re.compile(r'\*\*([A-Z]+) PHASE\*\*')
+    COUNTRY_PATTERN = re.compile(r'You are playing as (\w+)')
+
+    def __init__(self, model_name: str, config: dict, responses: Dict[str, List[str]], latency: float):
+        self.model_name = model_name
+        self.config = config
+        self.responses = responses
+        self.latency = latency
+
+    def start_chat(self, history: Optional[List[Any]] = None) -> StubChat:
+        return StubChat(self, history)
+
+    def render(self, prompt: str, earlier: str = '') -> str:
+        """Pick a template for the prompt's phase and fill in its variables.
+
+        A continued chat's prompt may leave out the country and units; they
+        are then taken from the earlier prompts.
+        """
+        if 'GM QUERY' in prompt:
+            phase = 'query'
+        else:
+            match = self.PHASE_PATTERN.search(prompt)
+            phase = match.group(1).lower() if match else 'default'
+
+        templates = self.responses.get(phase) or self.responses.get('default') or ['']
+        digest = int(hashlib.sha1(prompt.encode('utf-8')).hexdigest(), 16)
+        template = templates[digest % len(templates)]
+
+        match = self.COUNTRY_PATTERN.search(prompt) or self.COUNTRY_PATTERN.search(earlier)
+        country = match.group(1) if match else 'Unknown'
+        others = [c for c in self.config.get('countries', []) if c != country] or [country]
+
+        variables = {
+            'country': country,
+            'phase': phase,
+            'other': others[digest % len(others)],
+            'orders': self._hold_orders(prompt if '## Units' in prompt else earlier, country),
+            'orders_file': self.config['paths']['orders'],
+            'scratchpad_file': self.config['paths']['scratchpad'],
+        }
+        for key, value in variables.items():
+            template = template.replace(f"{{{key}}}", value)
+        return template
+
+    @staticmethod
+    def _hold_orders(prompt: str, country: str) -> str:
+        """Build hold orders for the country's units listed under '## Units' in the prompt."""
+        units_section = prompt.split('## Units', 1)
+        if len(units_section) < 2:
+            return "All units hold."
+
+        orders = []
+        in_country = False
+        for line in units_section[1].split('\n'):
+            stripped = line.strip()
+            if not stripped:
+                continue
+            if stripped.startswith('#') or stripped == '---':
+                break
+            if not stripped.startswith('-'):
+                in_country = stripped == country
+            elif in_country:
+                orders.append(f"{stripped.lstrip('- ').strip()} H")
+        return '\n'.join(orders) if orders else "All units hold."
+
+
+class StubBackend(LLMBackend):
+    """Offline backend for load tests, benchmarks and CI. Never touches the network.
+
+    Settings (config.yaml, llm.stub):
+        latency: artificial seconds per response
+        responses: optional YAML file mapping phase (plan/turn/react/reflect/query/default)
+                   to a list of response templates. Templates may use {country},
+                   {other}, {phase}, {orders}, {orders_file} and {scratchpad_file}.
+    """
+
+    name = "stub"
+
+    def __init__(self, config: dict):
+        super().__init__(config)
+        settings = config.get('llm', {}).get('stub', {}) or {}
+        self.latency = float(settings.get('latency', 0.0) or 0.0)
+        self.responses = dict(DEFAULT_STUB_RESPONSES)
+
+        responses_file = settings.get('responses')
+        if responses_file:
+            scripted = yaml.safe_load(Path(responses_file).read_text()) or {}
+            if isinstance(scripted, list):
+                scripted = {'default': scripted}
+            for phase, templates in scripted.items():
+                self.responses[phase] = [templates] if isinstance(templates, str) else list(templates)
+
+    def _create_model(self, model_name: str) -> StubModel:
+        return StubModel(model_name, self.config, self.responses, self.latency)
+
+
+# =============================================================================
+# Backend Registry
+# =============================================================================
+
+BACKENDS = {
+    GeminiBackend.name: GeminiBackend,
+    StubBackend.name: StubBackend,
+}
+
+_registry_lock = threading.Lock()
+_backends: Dict[str, LLMBackend] = {}
+
+
+def get_backend(config: dict) -> LLMBackend:
+    """Return the process-wide backend selected by config (llm.backend, default gemini)."""
+    llm_config = config.get('llm', {}) or {}
+    name = llm_config.get('backend', GeminiBackend.name)
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown LLM backend '{name}' (available: {', '.join(sorted(BACKENDS))})")
+
+    # Stub settings are part of the key so differently-configured runs don't share state
+    key = f"{name}:{llm_config.get(name)!r}"
+    with _registry_lock:
+        backend = _backends.get(key)
+        if backend is None:
+            backend = BACKENDS[name](config)
+            _backends[key] = backend
+        return backend
+
+
+def get_model(model_name: str, config: dict) -> Any:
+    """Return the shared model handle for model_name from the configured backend.
+
+    In record/replay cache modes the handle is wrapped in a CachedModel, which
+    only creates the backend model when a live call is needed.
+    """
+    backend = get_backend(config)
+    mode = get_cache_mode(config)
+    if mode == "off":
+        return backend.get_model(model_name)
+    return CachedModel(model_name, lambda: backend.get_model(model_name), get_response_cache(config), mode)
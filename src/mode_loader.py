@@ -10,12 +10,95 @@ Hybrid approach:
 """
 
 import re
+import threading
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, FrozenSet, List, Optional, Tuple, Union
+
+
+# =============================================================================
+# Compiled Templates
+# =============================================================================
+
+# A compiled template is a list of segments:
+#   str                      literal text
+#   ("var", name)            {name}, substituted at render time
+#   ("if", name, segments)   {if:name}...{endif}, rendered if variables[name] is truthy
+Segment = Union[str, Tuple]
+
+VARIABLE_PATTERN = re.compile(r'\{(\w+)\}')
+CONDITIONAL_PATTERN = re.compile(r'\{if:(\w+)\}(.*?)\{endif\}', re.DOTALL)
+BLOCK_PATTERN = re.compile(r'\{block:(\w+)\}')
+
+
+def _compile_variables(text: str) -> List[Segment]:
+    segments: List[Segment] = []
+    pos = 0
+    for match in VARIABLE_PATTERN.finditer(text):
+        if match.start() > pos:
+            segments.append(text[pos:match.start()])
+        segments.append(("var", match.group(1)))
+        pos = match.end()
+    if pos < len(text):
+        segments.append(text[pos:])
+    return segments
+
+
+def compile_template(text: str) -> List[Segment]:
+    """Parse template text (blocks already resolved) into a segment list."""
+    segments: List[Segment] = []
+    pos = 0
+    for match in CONDITIONAL_PATTERN.finditer(text):
+        segments.extend(_compile_variables(text[pos:match.start()]))
+        # Conditional content is stripped, as it always has been
+        segments.append(("if", match.group(1), _compile_variables(match.group(2).strip())))
+        pos = match.end()
+    segments.extend(_compile_variables(text[pos:]))
+    return segments
+
+
+def render_template(segments: List[Segment], variables: Dict[str, object]) -> str:
+    """Render compiled segments in a single pass.
+
+    Substituted values are never re-scanned, so a {name} inside a value
+    (e.g. an agent's file in the context) is left alone. Unknown variables
+    render as their literal {name}.
+    """
+    parts = []
+    for segment in segments:
+        if isinstance(segment, str):
+            parts.append(segment)
+        elif segment[0] == "var":
+            name = segment[1]
+            parts.append(str(variables[name]) if name in variables else f"{{{name}}}")
+        elif variables.get(segment[1]):
+            parts.append(render_template(segment[2], variables))
+    return ''.join(parts)
+
+
+# Process-wide caches, shared by every ModeLoader
+_cache_lock = threading.Lock()
+_mode_files: Dict[Path, FrozenSet[str]] = {}
+_file_contents: Dict[Path, str] = {}
+_templates: Dict[Tuple[Path, Tuple[str, ...], str], List[Segment]] = {}
+_features: Dict[Tuple[Path, Tuple[str, ...], str], bool] = {}
+
+
+def clear_template_cache():
+    """Forget all loaded prompt files and compiled templates (for development)."""
+    with _cache_lock:
+        _mode_files.clear()
+        _file_contents.clear()
+        _templates.clear()
+        _features.clear()
 
 
 class ModeLoader:
-    """Loads and combines mode-specific prompts from external files."""
+    """Loads and combines mode-specific prompts from external files.
+
+    Mode folders are listed once per process and templates are compiled once
+    per (active modes, prompt name), so creating a ModeLoader is cheap and
+    rendering is a single pass over the compiled segments.
+    """
 
     MODES_DIR = Path(__file__).parent.parent / "modes"
 
@@ -32,8 +115,8 @@ class ModeLoader:
 
     def __init__(self, config: dict):
         self.config = config
-        self._cache: Dict[str, str] = {}
         self._active_modes = self._determine_active_modes()
+        self._modes_key = tuple(self._active_modes)
 
     def _determine_active_modes(self) -> List[str]:
         """Determine which modes are active, in priority order.
@@ -57,27 +140,61 @@ class ModeLoader:
 
         return modes
 
+    def _list_mode(self, mode_name: str) -> FrozenSet[str]:
+        """Filenames in a mode folder (listed once per process)."""
+        mode_dir = self.MODES_DIR / mode_name
+        with _cache_lock:
+            files = _mode_files.get(mode_dir)
+        if files is None:
+            files = frozenset(p.name for p in mode_dir.iterdir()) if mode_dir.is_dir() else frozenset()
+            with _cache_lock:
+                _mode_files[mode_dir] = files
+        return files
+
+    def _read(self, path: Path) -> str:
+        with _cache_lock:
+            content = _file_contents.get(path)
+        if content is None:
+            content = path.read_text().strip()
+            with _cache_lock:
+                _file_contents[path] = content
+        return content
+
     def _load_prompt(self, mode_name: str, prompt_name: str) -> Optional[str]:
         """Load a single prompt file from a mode folder.
 
         Returns None if the file doesn't exist.
         Returns empty string if a .disable file exists.
         """
-        mode_dir = self.MODES_DIR / mode_name
+        files = self._list_mode(mode_name)
 
         # Check for .disable file (signals this prompt should be suppressed)
-        disable_file = mode_dir / f"{prompt_name}.md.disable"
-        if disable_file.exists():
+        if f"{prompt_name}.md.disable" in files:
             return ""  # Explicitly disabled
 
         # Try .md then .txt
         for ext in [".md", ".txt"]:
-            prompt_file = mode_dir / f"{prompt_name}{ext}"
-            if prompt_file.exists():
-                return prompt_file.read_text().strip()
+            if f"{prompt_name}{ext}" in files:
+                return self._read(self.MODES_DIR / mode_name / f"{prompt_name}{ext}")
 
         return None  # File doesn't exist
 
+    def _compiled(self, prompt_name: str) -> List[Segment]:
+        """Compiled template for prompt_name under the active modes (cached process-wide)."""
+        key = (self.MODES_DIR, self._modes_key, prompt_name)
+        with _cache_lock:
+            segments = _templates.get(key)
+        if segments is None:
+            segments = compile_template(self._resolve_blocks(self._load_raw(prompt_name)))
+            with _cache_lock:
+                _templates[key] = segments
+        return segments
+
+    def _load_raw(self, prompt_name: str) -> str:
+        if prompt_name in self.CONCAT_PROMPTS:
+            return self._load_concatenated(prompt_name)
+        return self._load_override(prompt_name)
+
     def get_prompt(self, prompt_name: str, variables: Optional[Dict[str, str]] = None) -> str:
         """Load a prompt by name, combining active mode overlays.
 
@@ -88,57 +205,19 @@ class ModeLoader:
         Returns:
             The combined prompt text with blocks resolved and variables substituted.
         """
-        cache_key = prompt_name
-
-        if cache_key not in self._cache:
-            if prompt_name in self.CONCAT_PROMPTS:
-                content = self._load_concatenated(prompt_name)
-            else:
-                content = self._load_override(prompt_name)
-            self._cache[cache_key] = content
-
-        result = self._cache[cache_key]
-
-        # Resolve block references: {block:name}
-        result = self._resolve_blocks(result)
-
-        # Inject filename variables from config (always available)
-        if variables is None:
-            variables = {}
-        variables.setdefault('scratchpad_file', self.config['paths']['scratchpad'])
-        variables.setdefault('orders_file', self.config['paths']['orders'])
-        variables.setdefault('lessons_file', self.config['paths']['lessons'])
-
-        # Process conditionals: {if:var}...{endif}
-        result = self._process_conditionals(result, variables)
-
-        # Substitute variables
-        for key, value in variables.items():
-            result = result.replace(f"{{{key}}}", str(value))
-
-        return result
-
-    def _process_conditionals(self, content: str, variables: Dict[str, str]) -> str:
-        """Process {if:var}...{endif} conditional blocks.
-
-        If var is truthy, include the content. Otherwise, remove the block entirely.
-        """
-        pattern = r'\{if:(\w+)\}(.*?)\{endif\}'
-
-        def replacer(match):
-            var_name = match.group(1)
-            block_content = match.group(2)
-            # Check if variable is truthy
-            if variables.get(var_name):
-                return block_content.strip()
-            return ""
+        # Filename variables from config are always available
+        merged = {
+            'scratchpad_file': self.config['paths']['scratchpad'],
+            'orders_file': self.config['paths']['orders'],
+            'lessons_file': self.config['paths']['lessons'],
+        }
+        if variables:
+            merged.update(variables)
 
-        return re.sub(pattern, replacer, content, flags=re.DOTALL)
+        return render_template(self._compiled(prompt_name), merged)
 
     def _resolve_blocks(self, content: str) -> str:
         """Replace {block:name} references with loaded block content."""
-        pattern = r'\{block:(\w+)\}'
-
         def replacer(match):
             block_name = match.group(1)
             prompt_name = self.BLOCK_MAPPING.get(block_name, block_name)
@@ -147,13 +226,10 @@ class ModeLoader:
             if not self.is_feature_enabled(prompt_name):
                 return ""
 
-            # Load the block (bypass cache to avoid recursion issues)
-            if prompt_name in self.CONCAT_PROMPTS:
-                return self._load_concatenated(prompt_name)
-            else:
-                return self._load_override(prompt_name)
+            # Blocks are inserted as-is (no nested block resolution)
+            return self._load_raw(prompt_name)
 
-        return re.sub(pattern, replacer, content)
+        return BLOCK_PATTERN.sub(replacer, content)
 
     def _load_override(self, prompt_name: str) -> str:
         """Load prompt with override behavior (last active mode wins)."""
@@ -181,20 +257,30 @@ class ModeLoader:
         """Check if a prompt/feature is enabled (not disabled by any active mode).
 
         Useful for conditional logic like showing/hiding message sections.
+        Answered from an in-memory table after the first lookup.
         """
+        key = (self.MODES_DIR, self._modes_key, prompt_name)
+        with _cache_lock:
+            enabled = _features.get(key)
+        if enabled is not None:
+            return enabled
+
+        enabled = False
         for mode in reversed(self._active_modes):
-            mode_dir = self.MODES_DIR / mode
+            files = self._list_mode(mode)
 
             # Check for .disable marker
-            if (mode_dir / f"{prompt_name}.md.disable").exists():
-                return False
+            if f"{prompt_name}.md.disable" in files:
+                break
 
             # Check if prompt exists (enabled)
-            if (mode_dir / f"{prompt_name}.md").exists() or \
-               (mode_dir / f"{prompt_name}.txt").exists():
-                return True
+            if f"{prompt_name}.md" in files or f"{prompt_name}.txt" in files:
+                enabled = True
+                break
 
-        return False
+        with _cache_lock:
+            _features[key] = enabled
+        return enabled
 
     def get_active_modes(self) -> List[str]:
         """Return list of active mode names."""
@@ -202,4 +288,4 @@ class ModeLoader:
 
     def clear_cache(self):
         """Clear the prompt cache. Useful for development/testing."""
-        self._cache.clear()
+        clear_template_cache()
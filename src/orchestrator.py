@@ -1,13 +1,23 @@
 """
 Game orchestration for Diplomacy LLM.
-Handles season execution, turn order management, and order collection.
+Handles season execution and order collection (turn order lives in game_manager.py).
 """
 
 import random
-import shutil
-from pathlib import Path
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
 
+from .adjudicator import adjudicate, load_board, phase_countries, phase_name, phase_options
 from .agent import DiplomacyAgent
+from .board import parse_game_state, validate_orders
+from .conversations import get_conversation_index
+from .game_manager import load_turn_order, save_turn_order
+from .prefix_cache import release_prefix_caches
+from .sessions import end_sessions
+from .response_cache import get_cache_mode
+from .snapshots import restore_latest_season, take_season_snapshot
+from .summaries import get_summary_settings, update_summaries
 from .utils import (
     load_config,
     is_gunboat,
@@ -16,6 +26,9 @@ from .utils import (
     print_section_header,
     handle_error,
     print_divider,
+    buffered_output,
+    get_country_dir,
+    get_game_state_path,
 )
 
 
@@ -23,25 +36,25 @@ from .utils import (
 # Season Header Management
 # =============================================================================
 
-def add_season_headers():
+def add_season_headers(config: dict = None):
     """Add season headers to all conversation and void files.
 
     Called at the start of each season to add a single header for the season,
     rather than prepending to each message.
     """
-    config = load_config()
+    if config is None:
+        config = load_config()
     season = get_current_season(config)
     countries = get_all_countries(config)
 
     header = f"\n## {season}\n"
 
-    # Add headers to all conversation files
-    from .utils import get_conversations_dir
-    conversations_dir = get_conversations_dir(config)
-    if conversations_dir.exists():
-        for conv_file in conversations_dir.glob("*.md"):
-            with open(conv_file, 'a') as f:
-                f.write(header)
+    # Add headers to all conversation files (rebuilding the index once per season)
+    index = get_conversation_index(config)
+    index.rebuild()
+    for conv_file in index.all_files():
+        with open(conv_file, 'a') as f:
+            f.write(header)
 
     # Add headers to all scratchpad files
     from .utils import get_country_dir
@@ -55,68 +68,124 @@ def add_season_headers():
 
 
 # =============================================================================
-# Turn Order Management
+# Private Phase Execution
 # =============================================================================
 
-def load_turn_order() -> list:
-    """Load turn order from turn_order.txt."""
-    turn_order_file = Path("turn_order.txt")
-    if not turn_order_file.exists():
-        return []
-    lines = turn_order_file.read_text().strip().split('\n')
-    return [line.strip() for line in lines if line.strip()]
+def run_for_countries(run_fn: Callable[..., None], countries: List[str], config: dict = None, **kwargs):
+    """Run a private phase (plan, react, reflect) for each country.
+
+    Private phases only touch the country's own folder, so with
+    concurrency.parallel_private_phases enabled they run in a thread pool of
+    concurrency.max_in_flight workers. Each country's output is buffered and
+    printed in the original order, so the transcript reads like a sequential run.
+    run_fn gets the shared config as config=.
+    """
+    if config is None:
+        config = load_config()
+    kwargs['config'] = config
+    settings = config.get('concurrency', {})
+    max_in_flight = settings.get('max_in_flight', 4)
+
+    if not settings.get('parallel_private_phases', False) or max_in_flight <= 1 or len(countries) <= 1:
+        for country in countries:
+            run_fn(country, **kwargs)
+            print()
+        return
+
+    def run_buffered(country: str) -> str:
+        with buffered_output() as buffer:
+            run_fn(country, **kwargs)
+            print()
+        return buffer.getvalue()
 
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        futures = [executor.submit(run_buffered, country) for country in countries]
+        for future in futures:
+            sys.stdout.write(future.result())
+            sys.stdout.flush()
 
-def save_turn_order(turn_order: list):
-    """Save turn order to turn_order.txt."""
-    turn_order_file = Path("turn_order.txt")
-    turn_order_file.write_text('\n'.join(turn_order) + '\n')
 
+def is_streaming(config: dict) -> bool:
+    """Whether LLM responses are streamed (llm.stream)."""
+    return bool((config.get('llm', {}) or {}).get('stream', False))
 
-def randomize_order():
-    """Randomize and save turn order to turn_order.txt."""
-    config = load_config()
-    countries = get_all_countries(config)
-    turn_order = countries.copy()
-    random.shuffle(turn_order)
-    save_turn_order(turn_order)
-    print(f"Turn order saved to turn_order.txt:")
-    for country in turn_order:
-        print(f"  {country}")
+
+def take_and_execute(agent: DiplomacyAgent, take_fn: Callable, execute_fn: Callable[[dict], None],
+                     config: dict, **kwargs) -> dict:
+    """Take a phase turn, show the response and execute its actions.
+
+    Without streaming the full response is shown first and its actions are
+    executed afterwards. With llm.stream enabled the response is printed as it
+    arrives and each action is executed as soon as its tag closes.
+
+    Returns:
+        The parsed actions dict.
+    """
+    print(f"{agent.country} says:")
+    print_divider()
+
+    if not is_streaming(config):
+        response_text, actions = take_fn(**kwargs)
+        print(response_text)
+        print_divider()
+        if actions['messages'] or actions['files']:
+            print(f"\nExecuting actions:")
+            execute_fn(actions)
+        return actions
+
+    at_line_start = True
+    after_action = False
+
+    def on_chunk(text: str):
+        nonlocal at_line_start, after_action
+        if after_action and text.startswith('\n'):
+            text = text[1:]  # The action's output already ended the line
+        if text:
+            sys.stdout.write(text)
+            sys.stdout.flush()
+            at_line_start = text.endswith('\n')
+            after_action = False
+
+    def on_action(action: dict):
+        nonlocal at_line_start, after_action
+        if not at_line_start:
+            print()
+        execute_fn(action)
+        at_line_start = after_action = True
+
+    _, actions = take_fn(on_chunk=on_chunk, on_action=on_action, **kwargs)
+    if not at_line_start:
+        print()
+    print_divider()
+    return actions
 
 
 # =============================================================================
 # Individual Turn Execution
 # =============================================================================
 
-def run_country_turn(country: str, use_cheap_model: bool = True):
+def run_country_turn(country: str, use_cheap_model: bool = True, config: dict = None):
     """Run a single turn for a country (classic mode - messaging + void.md only)."""
     try:
-        agent = DiplomacyAgent(country, use_cheap_model=use_cheap_model)
-        config = load_config()
+        if config is None:
+            config = load_config()
+        agent = DiplomacyAgent(country, config, use_cheap_model=use_cheap_model)
         season = get_current_season(config)
 
         print(f"\nCurrent Season: {season}")
         print_section_header(f"{country}'s Turn")
 
-        # Take turn and get response
-        response_text, actions = agent.take_turn(season)
-
-        # Show LLM's response
-        print(f"{country} says:")
-        print_divider()
-        print(response_text)
-        print_divider()
-
-        # Execute actions if any were parsed (scratchpad only, append-only)
-        has_actions = (actions['messages'] or actions['files'])
+        # Take turn, show the response and execute actions (scratchpad only, append-only)
         scratchpad = config['paths']['scratchpad']
+        actions = take_and_execute(
+            agent, agent.take_turn,
+            lambda a: agent.execute_actions(a, season,
+                                            restrict_files=[scratchpad],
+                                            append_only_files=[scratchpad]),
+            config, season=season)
+        has_actions = (actions['messages'] or actions['files'])
 
         if has_actions:
-            print(f"\nExecuting actions:")
-            agent.execute_actions(actions, season,
-                                  restrict_files=[scratchpad],
-                                  append_only_files=[scratchpad])
             print(f"\n✓ Turn complete")
         else:
             print(f"\nNo actions taken this turn.")
@@ -125,11 +194,12 @@ def run_country_turn(country: str, use_cheap_model: bool = True):
         handle_error(e, f"{country}'s turn")
 
 
-def run_country_react(country: str):
+def run_country_react(country: str, config: dict = None):
     """Run a react phase for a country (gunboat mode - scratchpad + orders)."""
     try:
-        agent = DiplomacyAgent(country, use_cheap_model=True)
-        config = load_config()
+        if config is None:
+            config = load_config()
+        agent = DiplomacyAgent(country, config, use_cheap_model=True)
         season = get_current_season(config)
         scratchpad = config['paths']['scratchpad']
         orders_file = config['paths']['orders']
@@ -137,23 +207,16 @@ def run_country_react(country: str):
         print(f"\nCurrent Season: {season}")
         print_section_header(f"{country}'s React")
 
-        # Take react turn
-        response_text, actions = agent.take_react_turn()
-
-        # Show LLM's response
-        print(f"{country} says:")
-        print_divider()
-        print(response_text)
-        print_divider()
-
-        # Execute actions (scratchpad append-only, orders full access)
+        # Take react turn and execute actions (scratchpad append-only, orders full access)
+        actions = take_and_execute(
+            agent, agent.take_react_turn,
+            lambda a: agent.execute_actions(a, season,
+                                            restrict_files=[scratchpad, orders_file],
+                                            append_only_files=[scratchpad]),
+            config)
         has_actions = (actions['messages'] or actions['files'])
 
         if has_actions:
-            print(f"\nExecuting actions:")
-            agent.execute_actions(actions, season,
-                                  restrict_files=[scratchpad, orders_file],
-                                  append_only_files=[scratchpad])
             print(f"\n✓ React complete")
         else:
             print(f"\nNo actions taken this phase.")
@@ -162,31 +225,25 @@ def run_country_react(country: str):
         handle_error(e, f"{country}'s react")
 
 
-def run_country_reflect(country: str, wipe_void: bool = False):
+def run_country_reflect(country: str, wipe_void: bool = False, config: dict = None):
     """Run a reflect phase for a country."""
     try:
-        agent = DiplomacyAgent(country, use_cheap_model=False)  # Use main model
-        config = load_config()
+        if config is None:
+            config = load_config()
+        agent = DiplomacyAgent(country, config, use_cheap_model=False)  # Use main model
         season = get_current_season(config)
 
         print(f"\nCurrent Season: {season}")
         print_section_header(f"{country}'s Reflect")
 
-        # Take reflect turn
-        response_text, actions = agent.take_reflect_turn(wipe_void=wipe_void)
-
-        # Show LLM's response
-        print(f"{country} says:")
-        print_divider()
-        print(response_text)
-        print_divider()
-
-        # Execute actions (full file access during reflect)
+        # Take reflect turn and execute actions (full file access during reflect)
+        actions = take_and_execute(
+            agent, agent.take_reflect_turn,
+            lambda a: agent.execute_actions(a, season),  # No file restrictions
+            config, wipe_void=wipe_void)
         has_actions = actions['files']
 
         if has_actions:
-            print(f"\nExecuting actions:")
-            agent.execute_actions(actions, season)  # No file restrictions
             print(f"\n✓ Reflect complete")
         else:
             print(f"\nNo file operations this phase.")
@@ -204,31 +261,131 @@ def run_country_reflect(country: str, wipe_void: bool = False):
         handle_error(e, f"{country}'s reflect")
 
 
-def run_all_turns():
+def run_all_turns(config: dict = None):
     """Run turns for all countries in order from turn_order.txt."""
-    turn_order = load_turn_order()
+    if config is None:
+        config = load_config()
+    turn_order = load_turn_order(config)
     if not turn_order:
         print("Error: turn_order.txt not found or empty. Run 'randomize' first.")
         return
 
     print(f"Running turns for: {', '.join(turn_order)}\n")
     for country in turn_order:
-        run_country_turn(country)
+        run_country_turn(country, config=config)
         print()
 
 
+# =============================================================================
+# Order Validation
+# =============================================================================
+
+def check_orders(countries: List[str], config: dict = None):
+    """Validate each country's orders.md against its units in game_state.md.
+
+    Runs after the phases that submit orders (reflect, react) so illegal or
+    self-defeating orders show up before adjudication. Disable with
+    validation.check_orders: false.
+    """
+    if config is None:
+        config = load_config()
+    if not config.get('validation', {}).get('check_orders', True):
+        return
+
+    print_section_header("ORDER CHECK")
+    orders_file = config['paths']['orders']
+    for country in countries:
+        state_path = get_game_state_path(config, country)
+        state = parse_game_state(state_path.read_text()) if state_path.exists() else None
+        if state is None or not state.units_of(country):
+            print(f"  ! {country}: no units found in {state_path.name}, skipped")
+            continue
+
+        orders_path = get_country_dir(config, country) / orders_file
+        report = validate_orders(state, country, orders_path.read_text() if orders_path.exists() else "")
+
+        if not report.issues and not report.unordered:
+            print(f"  ✓ {country}: {len(report.orders)} orders OK")
+            continue
+        for issue in report.issues:
+            label = "illegal" if issue.severity == 'error' else "warning"
+            print(f"  ! {country} ({label}): {issue}")
+        if report.unordered:
+            units = ', '.join(str(unit) for unit in report.unordered)
+            print(f"  ! {country}: no orders for {units} (will hold)")
+
+
+# =============================================================================
+# Adjudication
+# =============================================================================
+
+def run_country_orders(country: str, phase: str, config: dict = None):
+    """Ask a country for its retreat or adjustment orders (scratchpad append + orders only)."""
+    try:
+        if config is None:
+            config = load_config()
+        agent = DiplomacyAgent(country, config, use_cheap_model=True)
+        season = get_current_season(config)
+        scratchpad = config['paths']['scratchpad']
+        orders_file = config['paths']['orders']
+        state = load_board(config)
+
+        print(f"\nCurrent Season: {season}")
+        print_section_header(f"{country}'s {phase.capitalize()}")
+
+        actions = take_and_execute(
+            agent, agent.take_orders_turn,
+            lambda a: agent.execute_actions(a, season,
+                                            restrict_files=[scratchpad, orders_file],
+                                            append_only_files=[scratchpad]),
+            config, phase=phase, options=phase_options(state, country))
+
+        if actions['files']:
+            print(f"\n✓ {phase.capitalize()} orders submitted")
+        else:
+            print(f"\nNo orders this phase.")
+
+    except Exception as e:
+        handle_error(e, f"{country}'s {phase}")
+
+
+def run_adjudication(config: dict = None, with_agents: bool = False, dry_run: bool = False):
+    """Adjudicate the current phase from every orders.md.
+
+    With agents, the retreat and adjustment phases that follow are played
+    out too: the countries involved write their orders and each phase is
+    adjudicated in turn, until the board is back at a movement phase.
+    """
+    if config is None:
+        config = load_config()
+    print_section_header(f"ADJUDICATION: {get_current_season(config)}")
+    if adjudicate(config, dry_run=dry_run) is None or dry_run or not with_agents:
+        return
+
+    while True:
+        state = load_board(config)
+        phase = phase_name(state)
+        if phase == 'movement':
+            return
+        print_section_header(f"{phase.upper()} PHASE: {state.season}")
+        run_for_countries(run_country_orders, phase_countries(state), config, phase=phase)
+        print_section_header(f"ADJUDICATION: {state.season} {phase}s")
+        adjudicate(config)
+
+
 # =============================================================================
 # Season Execution
 # =============================================================================
 
-def run_gunboat_season():
+def run_gunboat_season(config: dict = None):
     """Run a season in gunboat mode: plan then react phase.
 
     Flow:
     1. PLAN (all countries) - cheap_model, consider options
     2. REACT (all countries) - cheap_model, void.md + orders.md
     """
-    config = load_config()
+    if config is None:
+        config = load_config()
     season = get_current_season(config)
     countries = get_all_countries(config)
 
@@ -237,25 +394,22 @@ def run_gunboat_season():
     print(f"Countries: {', '.join(countries)}\n")
 
     # Add season headers to void files (no conversations in gunboat mode)
-    add_season_headers()
+    add_season_headers(config)
 
     # Plan phase - consider options before diplomacy
     print_section_header("PLAN PHASE")
-    for country in countries:
-        run_country_plan(country)
-        print()
+    run_for_countries(run_country_plan, countries, config)
 
     # React phase - each country submits orders
     print_section_header("REACT PHASE")
-    for country in countries:
-        run_country_react(country)
-        print()
+    run_for_countries(run_country_react, countries, config)
+    check_orders(countries, config)
 
     print_section_header("SEASON COMPLETE")
     print(f"Season {season} finished. Orders in each country's orders.md")
 
 
-def run_classic_season():
+def run_classic_season(config: dict = None):
     """Run a season in classic mode: plan, turn rounds, then reflect with orders.
 
     Flow:
@@ -263,14 +417,17 @@ def run_classic_season():
     2. TURN ROUNDS (turn_rounds × all countries) - cheap_model, messages + void.md
     3. REFLECT (all countries) - main model, full file access + orders.md
     """
-    config = load_config()
+    if config is None:
+        config = load_config()
     season = get_current_season(config)
     countries = get_all_countries(config)
 
-    # Randomize order for the season
-    turn_order = countries.copy()
-    random.shuffle(turn_order)
-    save_turn_order(turn_order)
+    # Randomize order for the season (replay reuses the recorded order so prompts match)
+    turn_order = load_turn_order(config) if get_cache_mode(config) == "replay" else []
+    if sorted(turn_order) != sorted(countries):
+        turn_order = countries.copy()
+        random.shuffle(turn_order)
+    save_turn_order(turn_order, config)
 
     print_section_header(f"RUNNING SEASON: {season}")
     print("Mode: Classic")
@@ -280,67 +437,68 @@ def run_classic_season():
     print(f"Turn rounds: {turn_rounds}\n")
 
     # Add season headers to conversations and void files
-    add_season_headers()
+    add_season_headers(config)
 
     # Plan phase - consider options before diplomacy
     print_section_header("PLAN PHASE")
-    for country in turn_order:
-        run_country_plan(country)
-        print()
+    run_for_countries(run_country_plan, turn_order, config)
 
     # Run turn rounds (messaging + void.md only)
     for round_num in range(1, turn_rounds + 1):
         print_section_header(f"TURN ROUND {round_num}/{turn_rounds}")
 
         for country in turn_order:
-            run_country_turn(country)
+            run_country_turn(country, config=config)
             print()
 
     # Reflect phase - all countries reflect and submit orders
     print_section_header("REFLECT PHASE")
-    for country in turn_order:
-        run_country_reflect(country)
-        print()
+    run_for_countries(run_country_reflect, turn_order, config)
+    check_orders(countries, config)
 
     print_section_header("SEASON COMPLETE")
     print(f"Season {season} finished. Orders in each country's orders.md")
 
 
-def backup_countries():
-    """Backup countries folder before running a season."""
-    config = load_config()
-    data_dir = Path(config.get('paths', {}).get('data_dir', 'countries'))
-    backup_dir = Path('countries_backup')
-
-    # Remove old backup if it exists
-    if backup_dir.exists():
-        shutil.rmtree(backup_dir)
-        print(f"Removed old backup: {backup_dir}")
-
-    # Copy countries to backup
-    shutil.copytree(data_dir, backup_dir)
-    print(f"Backed up {data_dir} to {backup_dir}\n")
+def restore_countries(config: dict = None) -> bool:
+    """Put the data directory back as it was at the start of the last season."""
+    if config is None:
+        config = load_config()
+    return restore_latest_season(config) is not None
 
 
-def run_season():
+def run_season(config: dict = None):
     """Run a full season based on the current game mode."""
-    # Backup countries folder first
-    backup_countries()
+    if config is None:
+        config = load_config()
+
+    # Snapshot the data directory first
+    take_season_snapshot(config, get_current_season(config))
+    if get_summary_settings(config)['enabled']:
+        update_summaries(config)
+    print()
 
-    config = load_config()
     if is_gunboat(config):
-        run_gunboat_season()
+        run_gunboat_season(config)
     else:
-        run_classic_season()
+        run_classic_season(config)
+
+    if config.get('adjudication', {}).get('auto', False):
+        run_adjudication(config, with_agents=True)
+
+    # Chats and cached prompt prefixes hold this season's game state
+    end_sessions(config)
+    release_prefix_caches(config)
 
 
-def run_all_reflects(wipe_void: bool = False):
+def run_all_reflects(wipe_void: bool = False, config: dict = None):
     """Run reflect for all countries.
 
     Args:
         wipe_void: If True, clear each country's void.md after reflect
     """
-    config = load_config()
+    if config is None:
+        config = load_config()
     countries = get_all_countries(config)
     season = get_current_season(config)
 
@@ -348,40 +506,33 @@ def run_all_reflects(wipe_void: bool = False):
     if wipe_void:
         print("(void.md will be cleared after each reflect)\n")
 
-    for country in countries:
-        run_country_reflect(country, wipe_void=wipe_void)
-        print()
+    run_for_countries(run_country_reflect, countries, config, wipe_void=wipe_void)
+    check_orders(countries, config)
 
 
 # =============================================================================
 # Plan Phase (Consider Options Before Diplomacy)
 # =============================================================================
 
-def run_country_plan(country: str):
+def run_country_plan(country: str, config: dict = None):
     """Run a plan phase for a country to consider options before diplomacy."""
     try:
-        agent = DiplomacyAgent(country, use_cheap_model=True)  # Use cheap model
-        config = load_config()
+        if config is None:
+            config = load_config()
+        agent = DiplomacyAgent(country, config, use_cheap_model=True)  # Use cheap model
         season = get_current_season(config)
 
         print(f"\nCurrent Season: {season}")
         print_section_header(f"{country}'s Plan")
 
-        # Take plan turn
-        response_text, actions = agent.take_plan_turn()
-
-        # Show LLM's response
-        print(f"{country} says:")
-        print_divider()
-        print(response_text)
-        print_divider()
-
-        # Execute actions (any file, no restrictions)
+        # Take plan turn and execute actions (any file, no restrictions)
+        actions = take_and_execute(
+            agent, agent.take_plan_turn,
+            lambda a: agent.execute_actions(a, season),
+            config)
         has_actions = actions['files']
 
         if has_actions:
-            print(f"\nExecuting actions:")
-            agent.execute_actions(actions, season)
             print(f"\n✓ Plan complete")
         else:
             print(f"\nNo actions this phase.")
@@ -390,15 +541,14 @@ def run_country_plan(country: str):
         handle_error(e, f"{country}'s plan")
 
 
-def run_all_plans():
+def run_all_plans(config: dict = None):
     """Run plan phase for all countries to consider options."""
-    config = load_config()
+    if config is None:
+        config = load_config()
     countries = get_all_countries(config)
     season = get_current_season(config)
 
     print_section_header(f"PLAN PHASE: {season}")
     print("Considering options before diplomacy...\n")
 
-    for country in countries:
-        run_country_plan(country)
-        print()
+    run_for_countries(run_country_plan, countries, config)
@@ -0,0 +1,170 @@
+"""
+Prompt prefix caching for Diplomacy LLM.
+Every prompt for a country starts with the same block within a season:
+context header, rules, game state and game history (see
+ContextLoader.format_context_parts). With llm.prefix_cache.enabled that
+block is registered once with the backend and each call only sends the
+phase instructions, files and conversations after it.
+
+- gemini: context caching (CachedContent); cached tokens are billed at a
+          reduced rate while the cache lives for llm.prefix_cache.ttl_minutes
+- stub:   local stand-in that registers nothing and sends the prefix inline,
+          so offline runs and benchmarks go through the same code path
+
+Caches are keyed by (model, prefix hash). Prefixes shorter than
+llm.prefix_cache.min_tokens are sent inline (providers reject small caches).
+Adjudication rewrites the game state, so every cache of a season is deleted
+when the season ends (and on exit) instead of waiting out its TTL.
+"""
+
+import atexit
+import hashlib
+import threading
+import time
+from typing import Any, Dict, Optional, Set, Tuple
+
+from .llm import get_backend, LLMBackend
+from .response_cache import CachedModel, get_cache_mode, get_response_cache
+from .utils import estimate_tokens
+
+
+# Recreate a cache this long before the provider would expire it
+EXPIRY_MARGIN_SECONDS = 30
+
+
+class PrefixEntry:
+    """One registered prefix."""
+
+    def __init__(self, season: Optional[str]):
+        self.lock = threading.Lock()
+        self.season = season
+        self.handle: Any = None  # Backend cache object (None for the inline stand-in)
+        self.model: Any = None
+        self.expires = 0.0
+        self.uses = 0  # Chats started after this prefix
+
+
+class PrefixCache:
+    """Registered prompt prefixes of one backend."""
+
+    def __init__(self, backend: LLMBackend, ttl_seconds: float, min_tokens: int):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.min_tokens = min_tokens
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, str], PrefixEntry] = {}
+        self._unsupported: Set[str] = set()  # Models whose provider refused a cache
+        self._season: Optional[str] = None
+
+    def accepts(self, prefix: str) -> bool:
+        return bool(prefix) and estimate_tokens(prefix) >= self.min_tokens
+
+    def model_for(self, model_name: str, prefix: str, season: Optional[str]) -> Any:
+        """Model handle whose chats continue after the prefix, registering it on first use.
+
+        A prefix from a new season releases the previous season's caches.
+        If the provider refuses, the model falls back to sending prefixes inline.
+        """
+        if season != self._season:
+            self.release(keep_season=season)
+        key = (model_name, hashlib.sha256(prefix.encode('utf-8')).hexdigest())
+        with self._lock:
+            self._season = season
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = PrefixEntry(season)
+                self._entries[key] = entry
+
+        with entry.lock:
+            if entry.model is None or time.time() >= entry.expires - EXPIRY_MARGIN_SECONDS:
+                entry.handle, entry.model = self._create(model_name, prefix)
+                entry.expires = time.time() + self.ttl_seconds
+            entry.uses += 1
+            return entry.model
+
+    def _create(self, model_name: str, prefix: str) -> Tuple[Any, Any]:
+        if model_name not in self._unsupported:
+            try:
+                return self.backend.create_cached_prefix(model_name, prefix, self.ttl_seconds)
+            except Exception as e:
+                with self._lock:
+                    self._unsupported.add(model_name)
+                print(f"  ! Prefix caching unavailable for {model_name}, sending prompts inline: {e}")
+        return LLMBackend.create_cached_prefix(self.backend, model_name, prefix, self.ttl_seconds)
+
+    def release(self, keep_season: Optional[str] = None) -> Tuple[int, int]:
+        """Delete cached prefixes (all, or all but keep_season's). Returns (prefixes, chats that used them)."""
+        with self._lock:
+            released = {key: entry for key, entry in self._entries.items()
+                        if keep_season is None or entry.season != keep_season}
+            for key in released:
+                del self._entries[key]
+
+        uses = 0
+        for entry in released.values():
+            uses += entry.uses
+            if entry.handle is not None:
+                try:
+                    self.backend.delete_cached_prefix(entry.handle)
+                except Exception as e:
+                    print(f"  ! Could not delete cached prefix (it expires on its own): {e}")
+        return len(released), uses
+
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+_caches_lock = threading.Lock()
+_caches: Dict[int, PrefixCache] = {}
+
+
+def get_prefix_cache(config: dict) -> Optional[PrefixCache]:
+    """Process-wide prefix cache for the configured backend, or None when disabled."""
+    settings = (config.get('llm', {}) or {}).get('prefix_cache', {}) or {}
+    if not settings.get('enabled', False):
+        return None
+    backend = get_backend(config)
+    with _caches_lock:
+        cache = _caches.get(id(backend))
+        if cache is None:
+            cache = PrefixCache(backend,
+                                float(settings.get('ttl_minutes', 60)) * 60,
+                                int(settings.get('min_tokens', 4096)))
+            _caches[id(backend)] = cache
+        return cache
+
+
+def get_prefixed_model(model_name: str, config: dict, prefix: str, season: Optional[str]) -> Optional[Any]:
+    """Model handle whose chats start after a cached prefix, or None to send it inline.
+
+    In record/replay cache modes the handle is wrapped in a CachedModel, so
+    replayed calls never register a prefix with the provider.
+    """
+    cache = get_prefix_cache(config)
+    if cache is None or not cache.accepts(prefix):
+        return None
+    mode = get_cache_mode(config)
+    if mode == "off":
+        return cache.model_for(model_name, prefix, season)
+    return CachedModel(model_name, lambda: cache.model_for(model_name, prefix, season),
+                       get_response_cache(config), mode, prefix)
+
+
+def release_prefix_caches(config: dict):
+    """Delete the cached prefixes of the season that just ended."""
+    cache = get_prefix_cache(config)
+    if cache is None:
+        return
+    released, uses = cache.release()
+    if released:
+        print(f"  ✓ Released {released} cached prompt prefix{'es' if released > 1 else ''} "
+              f"(used by {uses} chats; cached tokens per call: python diplomacy.py stats)")
+
+
+@atexit.register
+def _release_all():
+    with _caches_lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        cache.release()
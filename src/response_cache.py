@@ -0,0 +1,261 @@
+"""
+Persistent LLM response cache for Diplomacy LLM.
+Content-addressed on-disk store keyed by (model, prompt) so seasons can be
+recorded once and replayed offline, e.g. to debug parsing or file-permission
+bugs without paying for every call again.
+
+Modes (config.yaml, llm.cache.mode):
+- off:    no caching
+- record: every call goes to the model and the response is stored
+- replay: responses come from the cache; a miss raises ResponseCacheMiss
+
+Entries are zlib-compressed UTF-8 files under <dir>/<first 2 hex>/<sha256>.
+When the store grows past max_mb, least recently used entries are evicted.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+
+CACHE_MODES = ("off", "record", "replay")
+
+
+class PermanentLLMError(Exception):
+    """An LLM call failure that retrying cannot fix."""
+
+
+class ResponseCacheMiss(PermanentLLMError):
+    """Replay mode found no recorded response for a prompt."""
+
+
+class ResponseCache:
+    """Size-bounded, content-addressed store of LLM responses."""
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None  # Computed on first write
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(model_name: str, prompt: str, history: Optional[List[str]] = None) -> str:
+        """Cache key for a prompt sent to model_name after the given chat history."""
+        payload = json.dumps([model_name, history or [], prompt], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / key
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the stored response for key, or None."""
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        os.utime(path)  # Mark as recently used for eviction
+        with self._lock:
+            self.hits += 1
+        return zlib.decompress(data).decode('utf-8')
+
+    def put(self, key: str, text: str):
+        """Store a response and evict old entries if the store is over its size limit."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = zlib.compress(text.encode('utf-8'), 6)
+
+        tmp_path = path.with_name(f"{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        previous = path.stat().st_size if path.exists() else 0
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_size()
+            else:
+                self._total_bytes += len(data) - previous
+            if self.max_bytes and self._total_bytes > self.max_bytes:
+                self._evict_locked()
+
+    def _entries(self) -> List[os.DirEntry]:
+        entries = []
+        if not self.directory.exists():
+            return entries
+        for shard in os.scandir(self.directory):
+            if shard.is_dir():
+                entries.extend(e for e in os.scandir(shard.path) if e.is_file() and not e.name.endswith('.tmp'))
+        return entries
+
+    def _scan_size(self) -> int:
+        return sum(entry.stat().st_size for entry in self._entries())
+
+    def _evict_locked(self):
+        """Delete least recently used entries until the store is at 90% of max_bytes."""
+        target = int(self.max_bytes * 0.9)
+        entries = sorted(self._entries(), key=lambda e: e.stat().st_mtime_ns)
+        for entry in entries:
+            if self._total_bytes <= target:
+                break
+            size = entry.stat().st_size
+            try:
+                os.unlink(entry.path)
+            except FileNotFoundError:
+                continue
+            self._total_bytes -= size
+
+
+class CachedResponse:
+    """Response object with the .text attribute agents read.
+
+    Iterating yields the response itself, so a cached response can stand in
+    for a streamed one (a single chunk).
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def __iter__(self):
+        yield self
+
+
+class CachedStream:
+    """Streamed live response; the full text is stored once the stream is consumed."""
+
+    def __init__(self, chat: "CachedChat", key: str, prompt: str, stream: Any):
+        self._chat = chat
+        self._key = key
+        self._prompt = prompt
+        self._stream = stream
+        self._text: Optional[str] = None
+
+    def __iter__(self):
+        parts = []
+        for chunk in self._stream:
+            parts.append(chunk.text)
+            yield chunk
+        self._text = ''.join(parts)
+        self._chat._store(self._key, self._prompt, self._text)
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            for _ in self:
+                pass
+        return self._text
+
+
+class CachedChat:
+    """Chat wrapper that records or replays responses.
+
+    The key covers every earlier prompt/response in this chat, so multi-turn
+    chats replay correctly too. A cached prefix counts as part of the first
+    prompt.
+    """
+
+    def __init__(self, model: "CachedModel", history: Optional[List[Any]]):
+        self.model = model
+        self._initial_history = history
+        self._inner = None
+        self._transcript: List[str] = []
+        self._prefix = model.prefix
+
+    def _inner_chat(self):
+        """Create the live chat only when the model actually has to be called."""
+        if self._inner is None:
+            self._inner = self.model.inner().start_chat(history=self._initial_history)
+        return self._inner
+
+    def _lookup(self, prompt: str):
+        key = self.model.cache.key(self.model.model_name, self._prefix + prompt, self._transcript)
+        if self.model.mode == "replay":
+            text = self.model.cache.get(key)
+            if text is None:
+                raise ResponseCacheMiss(
+                    f"No recorded response for this {self.model.model_name} prompt (replay mode)")
+            return key, text
+        return key, None
+
+    def _store(self, key: str, prompt: str, text: str) -> CachedResponse:
+        if self.model.mode == "record":
+            self.model.cache.put(key, text)
+        self._transcript.extend([self._prefix + prompt, text])
+        self._prefix = ''
+        return CachedResponse(text)
+
+    def send_message(self, prompt: str, stream: bool = False):
+        key, text = self._lookup(prompt)
+        if text is None:
+            if stream:
+                return CachedStream(self, key, prompt, self._inner_chat().send_message(prompt, stream=True))
+            text = self._inner_chat().send_message(prompt).text
+        return self._store(key, prompt, text)
+
+    async def send_message_async(self, prompt: str) -> CachedResponse:
+        key, text = self._lookup(prompt)
+        if text is None:
+            text = (await self._inner_chat().send_message_async(prompt)).text
+        return self._store(key, prompt, text)
+
+
+class CachedModel:
+    """Model wrapper placing the response cache in front of a backend model.
+
+    The backend model is created lazily, so replaying a recorded season
+    needs neither network access nor an API key (nor a cached prefix).
+    """
+
+    def __init__(self, model_name: str, factory: Callable[[], Any], cache: ResponseCache, mode: str,
+                 prefix: str = ''):
+        self.model_name = model_name
+        self._factory = factory
+        self._inner = None
+        self.cache = cache
+        self.mode = mode
+        self.prefix = prefix  # Cached prompt prefix the backend model continues after
+
+    def inner(self) -> Any:
+        if self._inner is None:
+            self._inner = self._factory()
+        return self._inner
+
+    def start_chat(self, history: Optional[List[Any]] = None) -> CachedChat:
+        return CachedChat(self, history)
+
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+_caches_lock = threading.Lock()
+_caches: Dict[str, ResponseCache] = {}
+
+
+def get_cache_mode(config: dict) -> str:
+    """Cache mode from config (llm.cache.mode). YAML's bare `off` reads as False."""
+    settings = (config.get('llm', {}) or {}).get('cache', {}) or {}
+    mode = settings.get('mode') or "off"
+    if mode not in CACHE_MODES:
+        raise ValueError(f"Unknown llm.cache.mode '{mode}' (expected one of: {', '.join(CACHE_MODES)})")
+    return mode
+
+
+def get_response_cache(config: dict) -> ResponseCache:
+    """Return the process-wide ResponseCache for the configured directory."""
+    settings = (config.get('llm', {}) or {}).get('cache', {}) or {}
+    directory = os.path.abspath(settings.get('dir') or '.llm_cache')
+    max_bytes = int(float(settings.get('max_mb', 500) or 0) * 1024 * 1024)
+    with _caches_lock:
+        cache = _caches.get(directory)
+        if cache is None:
+            cache = ResponseCache(Path(directory), max_bytes)
+            _caches[directory] = cache
+        return cache
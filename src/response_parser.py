@@ -0,0 +1,117 @@
+"""
+Single-pass parser for agent action tags.
+Scans an LLM response once for MESSAGE, FILE and NOTE tags, in document
+order, and reports malformed or unclosed tags with their offsets instead of
+silently dropping them.
+
+Input can be fed incrementally (feed() per streamed chunk, then close()), so
+completed tags are available before the response finishes.
+
+Tags don't nest: if a new opening tag appears while another tag is still
+open, the open one is reported as unclosed and parsing continues with the
+new tag, so one missing close tag doesn't swallow the rest of the response.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+
+TAG_PATTERN = re.compile(r'<(/?)(MESSAGE|FILE|NOTE)\b([^<>]*)>', re.IGNORECASE)
+ATTRIBUTE_PATTERN = re.compile(r'(\w+)\s*=\s*"([^"]*)"')
+
+
+@dataclass
+class ParsedTag:
+    """A complete action tag. Offsets are character positions in the full response."""
+    name: str  # Upper-case tag name: MESSAGE, FILE or NOTE
+    attributes: Dict[str, str]
+    content: str
+    start: int
+    end: int
+
+
+@dataclass
+class ParseIssue:
+    """A malformed, unclosed or stray tag."""
+    offset: int
+    message: str
+
+    def __str__(self) -> str:
+        return f"{self.message} at offset {self.offset}"
+
+
+@dataclass
+class _OpenTag:
+    name: str
+    attributes: Dict[str, str]
+    start: int
+    content_start: int
+
+
+class ResponseParser:
+    """Incremental single-pass tokenizer for MESSAGE/FILE/NOTE tags."""
+
+    def __init__(self):
+        self._text = ""
+        self._pos = 0  # Scanning resumes here; everything before is resolved
+        self._open: Optional[_OpenTag] = None
+        self.issues: List[ParseIssue] = []
+        self.closed = False
+
+    def feed(self, chunk: str) -> List[ParsedTag]:
+        """Add response text and return the tags completed by it."""
+        self._text += chunk
+        completed = []
+
+        for match in TAG_PATTERN.finditer(self._text, self._pos):
+            is_close, name = match.group(1) == '/', match.group(2).upper()
+
+            if is_close:
+                if self._open is not None and self._open.name == name:
+                    completed.append(ParsedTag(
+                        name=name,
+                        attributes=self._open.attributes,
+                        content=self._text[self._open.content_start:match.start()],
+                        start=self._open.start,
+                        end=match.end(),
+                    ))
+                    self._open = None
+                elif self._open is not None:
+                    self.issues.append(ParseIssue(match.start(), f"Mismatched </{name}> inside <{self._open.name}>"))
+                else:
+                    self.issues.append(ParseIssue(match.start(), f"Stray </{name}> without an opening tag"))
+            else:
+                if self._open is not None:
+                    self.issues.append(ParseIssue(self._open.start, f"Unclosed <{self._open.name}>"))
+                attributes = {k.lower(): v for k, v in ATTRIBUTE_PATTERN.findall(match.group(3))}
+                self._open = _OpenTag(name, attributes, match.start(), match.end())
+
+            self._pos = match.end()
+
+        # A tag can only start at '<', so rescanning can skip to the last unresolved one
+        last_lt = self._text.rfind('<', self._pos)
+        self._pos = last_lt if last_lt != -1 else len(self._text)
+        return completed
+
+    def close(self) -> List[ParsedTag]:
+        """Finish parsing. Reports a tag left open at the end of the response."""
+        if not self.closed:
+            self.closed = True
+            if self._open is not None:
+                self.issues.append(ParseIssue(self._open.start, f"Unclosed <{self._open.name}>"))
+                self._open = None
+        return []
+
+    @property
+    def text(self) -> str:
+        """All response text fed so far."""
+        return self._text
+
+
+def parse_tags(response_text: str) -> Tuple[List[ParsedTag], List[ParseIssue]]:
+    """Parse a complete response in one pass."""
+    parser = ResponseParser()
+    tags = parser.feed(response_text)
+    parser.close()
+    return tags, parser.issues
@@ -0,0 +1,303 @@
+"""
+Rate-limit-aware request scheduler for Diplomacy LLM.
+Every LLM call goes through one process-wide scheduler, so concurrent agents
+share per-model request and token budgets instead of each retrying blindly.
+
+- Token buckets per model for requests/minute and tokens/minute
+  (config.yaml, api.rate_limits). Callers reserve capacity up front and wait
+  their turn, so bursts are smoothed rather than rejected by the API.
+- Failures are classified: permanent errors (bad request, auth, replay cache
+  miss) are raised at once; transient ones (429, 5xx, timeouts) are retried
+  with jittered exponential backoff.
+- A retry-after hint from the API pauses every caller of that model, not just
+  the one that got the 429.
+"""
+
+import asyncio
+import random
+import re
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+from .response_cache import PermanentLLMError, get_cache_mode
+
+T = TypeVar('T')
+
+
+# HTTP status codes worth retrying: timeout, conflict, rate limit, server errors
+TRANSIENT_STATUS = {408, 409, 429, 500, 502, 503, 504}
+# Status codes retrying can't fix: bad request, auth, not found
+PERMANENT_STATUS = {400, 401, 403, 404}
+
+STATUS_NAMES = {
+    'ResourceExhausted': 429,
+    'TooManyRequests': 429,
+    'ServiceUnavailable': 503,
+    'InternalServerError': 500,
+    'BadGateway': 502,
+    'DeadlineExceeded': 504,
+    'GatewayTimeout': 504,
+    'InvalidArgument': 400,
+    'BadRequest': 400,
+    'Unauthenticated': 401,
+    'Unauthorized': 401,
+    'PermissionDenied': 403,
+    'Forbidden': 403,
+    'NotFound': 404,
+}
+
+RETRY_AFTER_PATTERNS = [
+    re.compile(r'retry[_ -]?delay\s*\{\s*seconds:\s*(\d+)', re.IGNORECASE),
+    re.compile(r'retry (?:in|after) ([\d.]+)\s*s', re.IGNORECASE),
+]
+
+
+# =============================================================================
+# Error Classification
+# =============================================================================
+
+def error_status(error: Exception) -> Optional[int]:
+    """HTTP-style status code of an API error, if it has one."""
+    for attr in ('code', 'status_code', 'status'):
+        value = getattr(error, attr, None)
+        value = getattr(value, 'value', value)  # grpc/HTTP status enums
+        if isinstance(value, int) and 100 <= value < 600:
+            return value
+    return STATUS_NAMES.get(type(error).__name__)
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Seconds the API asked us to wait (Retry-After header or retry delay in the message)."""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        value = headers.get('Retry-After') or headers.get('retry-after')
+        if value is not None:
+            return float(value)
+    except (TypeError, ValueError, AttributeError):
+        pass
+
+    message = str(error)
+    for pattern in RETRY_AFTER_PATTERNS:
+        match = pattern.search(message)
+        if match:
+            return float(match.group(1))
+    return None
+
+
+def classify_error(error: Exception) -> Tuple[bool, Optional[float]]:
+    """Return (transient, retry_after_seconds) for a failed call.
+
+    Unrecognized errors count as transient, matching the old retry-everything
+    behavior; only errors known to be permanent are raised without retrying.
+    """
+    if isinstance(error, PermanentLLMError):
+        return False, None
+    status = error_status(error)
+    if status in PERMANENT_STATUS:
+        return False, None
+    hint = retry_after(error)
+    if status in TRANSIENT_STATUS or hint is not None:
+        return True, hint
+
+    message = str(error).lower()
+    if any(word in message for word in ('quota', 'rate limit', 'timed out', 'timeout', 'unavailable')):
+        return True, hint
+    return True, None
+
+
+# =============================================================================
+# Token Buckets
+# =============================================================================
+
+class TokenBucket:
+    """Per-minute budget that refills continuously.
+
+    reserve() takes capacity immediately (the level may go negative) and
+    returns how long the caller must wait, so waiting callers are served in
+    the order they arrived.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill_locked(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Reserve amount and return the seconds to wait before using it."""
+        with self._lock:
+            self._refill_locked(time.monotonic())
+            self.level -= min(amount, self.capacity)
+            return max(0.0, -self.level / self.rate)
+
+    def charge(self, amount: float):
+        """Deduct usage learned after the call (e.g. response tokens)."""
+        with self._lock:
+            self._refill_locked(time.monotonic())
+            self.level -= min(amount, self.capacity)
+
+
+class ModelLimiter:
+    """Request and token buckets for one model, plus a shared retry-after pause."""
+
+    def __init__(self, rpm: float = 0, tpm: float = 0):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: int) -> float:
+        """Reserve one request of about `tokens` tokens; returns seconds to wait."""
+        delays = [0.0]
+        if self.requests:
+            delays.append(self.requests.reserve(1))
+        if self.tokens and tokens:
+            delays.append(self.tokens.reserve(tokens))
+        with self._lock:
+            delays.append(self.paused_until - time.monotonic())
+        return max(delays)
+
+    def charge(self, tokens: int):
+        if self.tokens and tokens:
+            self.tokens.charge(tokens)
+
+    def pause(self, seconds: float):
+        """Hold every caller of this model for `seconds` (retry-after hint)."""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+# =============================================================================
+# Scheduler
+# =============================================================================
+
+def _note_attempt(info: Optional[dict], attempt: int, delay: float):
+    """Record an attempt in a caller's telemetry event."""
+    if info is not None:
+        info['retries'] = attempt
+        info['throttle_seconds'] = round(info.get('throttle_seconds', 0.0) + delay, 3)
+
+
+class RequestScheduler:
+    """Process-wide gate for LLM calls: rate limits, retry and backoff.
+
+    Settings (config.yaml, api):
+        max_retries: retries for transient errors
+        backoff_base / backoff_max: jittered exponential backoff bounds in seconds
+        rate_limits: {default: {rpm, tpm}, <model name>: {rpm, tpm}}; 0 = unlimited
+    """
+
+    def __init__(self, settings: dict, limits_enabled: bool = True):
+        self.max_retries = settings.get('max_retries', 2)
+        self.backoff_base = float(settings.get('backoff_base', 1.0))
+        self.backoff_max = float(settings.get('backoff_max', 60.0))
+        self.rate_limits = (settings.get('rate_limits') or {}) if limits_enabled else {}
+        self._lock = threading.Lock()
+        self._limiters: Dict[str, ModelLimiter] = {}
+        self.stats = {'calls': 0, 'throttled': 0, 'throttle_seconds': 0.0, 'retries': 0, 'permanent_errors': 0}
+
+    def limiter(self, model_name: str) -> ModelLimiter:
+        with self._lock:
+            limiter = self._limiters.get(model_name)
+            if limiter is None:
+                limits = {**(self.rate_limits.get('default') or {}), **(self.rate_limits.get(model_name) or {})}
+                limiter = ModelLimiter(limits.get('rpm', 0) or 0, limits.get('tpm', 0) or 0)
+                self._limiters[model_name] = limiter
+            return limiter
+
+    def backoff(self, attempt: int, hint: Optional[float] = None) -> float:
+        """Full-jitter exponential backoff; follows the API's retry-after hint, both capped at backoff_max."""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        if hint is not None:
+            delay = min(self.backoff_max, hint + random.uniform(0, self.backoff_base))
+        return delay
+
+    def _before_call(self, limiter: ModelLimiter, tokens: int) -> float:
+        delay = limiter.reserve(tokens)
+        with self._lock:
+            self.stats['calls'] += 1
+            if delay > 0:
+                self.stats['throttled'] += 1
+                self.stats['throttle_seconds'] += delay
+        return delay
+
+    def _after_failure(self, limiter: ModelLimiter, error: Exception, attempt: int, description: str) -> float:
+        """Return the backoff before the next attempt, or re-raise if the call can't be retried."""
+        transient, hint = classify_error(error)
+        if not transient:
+            with self._lock:
+                self.stats['permanent_errors'] += 1
+            raise error
+        if attempt >= self.max_retries:
+            raise error
+
+        wait_time = self.backoff(attempt, hint)
+        if hint is not None:
+            limiter.pause(wait_time)
+        with self._lock:
+            self.stats['retries'] += 1
+        print(f"  ! {description} failed (attempt {attempt + 1}/{self.max_retries + 1}): {error}")
+        print(f"    Retrying in {wait_time:.1f}s...")
+        return wait_time
+
+    def call(self, model_name: str, fn: Callable[[], T], tokens: int = 0, description: str = "API call",
+             info: Optional[dict] = None) -> T:
+        """Run fn() once capacity is available, retrying transient failures.
+
+        info, if given, gets this call's retries and throttle_seconds (telemetry).
+        """
+        limiter = self.limiter(model_name)
+        for attempt in range(self.max_retries + 1):
+            delay = self._before_call(limiter, tokens)
+            _note_attempt(info, attempt, delay)
+            if delay > 0:
+                time.sleep(delay)
+            try:
+                return fn()
+            except Exception as e:
+                time.sleep(self._after_failure(limiter, e, attempt, description))
+
+    async def call_async(self, model_name: str, fn: Callable[[], Awaitable[T]], tokens: int = 0,
+                         description: str = "API call", info: Optional[dict] = None) -> T:
+        """Async version of call: waits without blocking the event loop."""
+        limiter = self.limiter(model_name)
+        for attempt in range(self.max_retries + 1):
+            delay = self._before_call(limiter, tokens)
+            _note_attempt(info, attempt, delay)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                return await fn()
+            except Exception as e:
+                await asyncio.sleep(self._after_failure(limiter, e, attempt, description))
+
+    def charge(self, model_name: str, tokens: int):
+        """Count tokens only known after the call (the response) against the model's budget."""
+        self.limiter(model_name).charge(tokens)
+
+
+_schedulers_lock = threading.Lock()
+_schedulers: Dict[str, RequestScheduler] = {}
+
+
+def get_scheduler(config: dict) -> RequestScheduler:
+    """Return the process-wide scheduler for the configured API settings.
+
+    Rate limits are skipped in replay mode, where no call reaches the API.
+    """
+    settings = config.get('api', {}) or {}
+    limits_enabled = get_cache_mode(config) != "replay"
+    key = f"{settings!r}:{limits_enabled}"
+    with _schedulers_lock:
+        scheduler = _schedulers.get(key)
+        if scheduler is None:
+            scheduler = RequestScheduler(settings, limits_enabled)
+            _schedulers[key] = scheduler
+        return scheduler
@@ -0,0 +1,114 @@
+"""
+Persistent chat sessions for Diplomacy LLM (opt-in, llm.sessions.enabled).
+By default every phase starts a fresh chat and resends the whole context.
+With sessions, each country keeps one chat per model for the season: the
+first prompt carries the full context, later ones only what changed since
+the last prompt (changed files and new conversation lines, see
+ContextLoader.format_context_update).
+
+A session is dropped and the next prompt rebuilds the full context when:
+- the season or the stable context prefix (rules, state, history) changed
+- it is older than llm.sessions.ttl_minutes
+- the update would be over llm.sessions.max_update_tokens
+- the previous call on it failed, so the chat may be missing a turn
+"""
+
+import hashlib
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from .utils import get_data_dir
+
+
+Sections = Dict[str, Dict[str, str]]  # {'files': {name: text}, 'conversations': {label: text}}
+
+
+class ChatSession:
+    """One country's chat for a season and the context it has been shown."""
+
+    def __init__(self, chat: Any, season: str, prefix: str, cached_prefix: str):
+        self.chat = chat
+        self.season = season
+        self.prefix_hash = _hash(prefix)
+        self.cached_prefix = cached_prefix  # Prefix held by the prefix cache ('' if sent inline)
+        self.started = time.time()
+        self.sent: Sections = {'files': {}, 'conversations': {}}
+        self.pending: Optional[Sections] = None  # Sections of the call in flight
+        self.history_tokens = 0  # Earlier prompts and responses, resent with every message
+        self.prompts = 0
+
+    def stale_reason(self, season: str, prefix: str, ttl_seconds: float) -> Optional[str]:
+        """Why this session can't be continued, or None."""
+        if self.pending is not None:
+            return "previous call failed"
+        if season != self.season:
+            return "new season"
+        if _hash(prefix) != self.prefix_hash:
+            return "game state changed"
+        if time.time() - self.started >= ttl_seconds:
+            return "expired"
+        return None
+
+    def begin(self, sections: Sections):
+        """A prompt showing `sections` is about to be sent."""
+        self.pending = sections
+
+    def commit(self, prompt_tokens: int, response_tokens: int):
+        """The call succeeded: its prompt and response are now part of the chat."""
+        if self.pending is not None:
+            self.sent = self.pending
+            self.pending = None
+        self.history_tokens += prompt_tokens + response_tokens
+        self.prompts += 1
+
+
+def _hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+# =============================================================================
+# Configuration and Registry
+# =============================================================================
+
+_sessions_lock = threading.Lock()
+_sessions: Dict[Tuple[str, str, str], ChatSession] = {}
+
+
+def get_session_settings(config: dict) -> dict:
+    """llm.sessions with defaults (enabled, max_update_tokens, ttl_seconds)."""
+    settings = (config.get('llm', {}) or {}).get('sessions', {}) or {}
+    return {
+        'enabled': bool(settings.get('enabled', False)),
+        'max_update_tokens': int(settings.get('max_update_tokens', 2000)),
+        'ttl_seconds': float(settings.get('ttl_minutes', 30)) * 60,
+    }
+
+
+def _key(config: dict, country: str, model_name: str) -> Tuple[str, str, str]:
+    # The data directory is part of the key so batch games in one process stay apart
+    return os.path.abspath(get_data_dir(config)), country, model_name
+
+
+def get_session(config: dict, country: str, model_name: str) -> Optional[ChatSession]:
+    with _sessions_lock:
+        return _sessions.get(_key(config, country, model_name))
+
+
+def save_session(config: dict, country: str, model_name: str, session: ChatSession):
+    with _sessions_lock:
+        _sessions[_key(config, country, model_name)] = session
+
+
+def end_session(config: dict, country: str, model_name: str):
+    with _sessions_lock:
+        _sessions.pop(_key(config, country, model_name), None)
+
+
+def end_sessions(config: dict):
+    """Drop every session of this game (called when the season ends)."""
+    data_dir = os.path.abspath(get_data_dir(config))
+    with _sessions_lock:
+        for key in [key for key in _sessions if key[0] == data_dir]:
+            del _sessions[key]
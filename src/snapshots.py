@@ -0,0 +1,309 @@
+"""
+Season snapshots for Diplomacy LLM.
+Keeps a snapshot of the data directory at the start of every season, so
+any earlier season can be inspected, diffed or restored.
+
+Snapshots are cheap because file contents are stored once:
+- blobs/<2 hex>/<sha256>: zlib-compressed file contents, shared by every
+  snapshot that contains the same file version
+- manifests/<id>.json: the snapshot itself, mapping each relative path to
+  its blob hash, size and mtime
+
+Taking a snapshot only reads files whose size or mtime changed since the
+previous snapshot (like git's index), and only writes blobs for contents
+the store hasn't seen. Unchanged country files cost nothing per season.
+"""
+
+import difflib
+import hashlib
+import json
+import os
+import shutil
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .utils import load_config, get_data_dir, atomic_write_text, print_section_header
+
+
+FileEntry = Dict[str, int]  # {'size', 'mtime_ns'} plus 'hash' (str) once known
+
+
+class SnapshotStore:
+    """Content-addressed snapshots of one data directory."""
+
+    def __init__(self, root: Path, data_dir: Path):
+        self.root = Path(root)
+        self.data_dir = Path(data_dir)
+
+    # --- Blobs ---
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.root / 'blobs' / digest[:2] / digest
+
+    def _store_blob(self, data: bytes) -> Tuple[str, int]:
+        """Store file contents; returns (hash, bytes written, 0 if already stored)."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        if path.exists():
+            return digest, 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        compressed = zlib.compress(data, 6)
+        tmp_path = path.with_name(f"{digest}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(compressed)
+        os.replace(tmp_path, path)
+        return digest, len(compressed)
+
+    def read_blob(self, digest: str) -> bytes:
+        return zlib.decompress(self._blob_path(digest).read_bytes())
+
+    # --- Manifests ---
+
+    def manifests(self) -> List[dict]:
+        """All snapshots, oldest first."""
+        directory = self.root / 'manifests'
+        if not directory.exists():
+            return []
+        manifests = [json.loads(path.read_text()) for path in directory.glob('*.json')]
+        return sorted(manifests, key=lambda m: m['id'])
+
+    def find(self, ref: str) -> Optional[dict]:
+        """Snapshot by id, 'latest', or season label (most recent match)."""
+        manifests = self.manifests()
+        if not manifests:
+            return None
+        if ref == 'latest':
+            return manifests[-1]
+        if ref.isdigit():
+            return next((m for m in manifests if m['id'] == int(ref)), None)
+        matches = [m for m in manifests if m['label'].lower().startswith(ref.lower())]
+        return matches[-1] if matches else None
+
+    def scan(self, previous: Optional[Dict[str, FileEntry]] = None) -> Tuple[Dict[str, FileEntry], List[str], int]:
+        """Hash the data directory, reusing hashes of files unchanged since `previous`.
+
+        Returns (files, changed paths, new blob bytes).
+        """
+        previous = previous or {}
+        files: Dict[str, FileEntry] = {}
+        changed = []
+        new_bytes = 0
+        for dirpath, dirnames, filenames in os.walk(self.data_dir):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                if filename.endswith('.tmp'):
+                    continue
+                path = Path(dirpath) / filename
+                relative = path.relative_to(self.data_dir).as_posix()
+                stat = path.stat()
+                old = previous.get(relative)
+                if old and old['size'] == stat.st_size and old['mtime_ns'] == stat.st_mtime_ns:
+                    files[relative] = old
+                    continue
+                digest, written = self._store_blob(path.read_bytes())
+                new_bytes += written
+                files[relative] = {'hash': digest, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+                if not old or old['hash'] != digest:
+                    changed.append(relative)
+        return files, changed, new_bytes
+
+    def take(self, label: str, kind: str = 'season') -> dict:
+        """Snapshot the data directory. kind is 'season' (automatic) or 'manual'."""
+        manifests = self.manifests()
+        previous = manifests[-1]['files'] if manifests else {}
+        files, changed, new_bytes = self.scan(previous)
+        removed = [path for path in previous if path not in files]
+
+        manifest = {
+            'id': manifests[-1]['id'] + 1 if manifests else 1,
+            'label': label,
+            'kind': kind,
+            'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'files': files,
+            'changed': len(changed) + len(removed),
+            'new_bytes': new_bytes,
+        }
+        directory = self.root / 'manifests'
+        directory.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(directory / f"{manifest['id']:05d}.json", json.dumps(manifest) + '\n')
+        return manifest
+
+    def restore(self, manifest: dict):
+        """Replace the data directory with the snapshot's contents.
+
+        The snapshot is rebuilt next to the data directory and swapped in, so
+        a failure midway leaves the current files untouched.
+        """
+        staging = self.data_dir.with_name(self.data_dir.name + '.restoring')
+        if staging.exists():
+            shutil.rmtree(staging)
+        for relative, entry in manifest['files'].items():
+            path = staging / relative
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(self.read_blob(entry['hash']))
+
+        old = self.data_dir.with_name(self.data_dir.name + '.replaced')
+        if old.exists():
+            shutil.rmtree(old)
+        if self.data_dir.exists():
+            os.replace(self.data_dir, old)
+        staging.mkdir(exist_ok=True)
+        os.replace(staging, self.data_dir)
+        shutil.rmtree(old, ignore_errors=True)
+
+    def prune(self, keep: int) -> int:
+        """Delete all but the newest `keep` snapshots and blobs no snapshot uses. Returns snapshots removed."""
+        manifests = self.manifests()
+        if keep <= 0 or len(manifests) <= keep:
+            return 0
+        for manifest in manifests[:-keep]:
+            (self.root / 'manifests' / f"{manifest['id']:05d}.json").unlink()
+        used = {entry['hash'] for manifest in manifests[-keep:] for entry in manifest['files'].values()}
+        for shard in (self.root / 'blobs').iterdir():
+            for blob in shard.iterdir():
+                if blob.name not in used and not blob.name.endswith('.tmp'):
+                    blob.unlink()
+        return len(manifests) - keep
+
+
+def diff_files(before: Dict[str, FileEntry], after: Dict[str, FileEntry]) -> List[Tuple[str, str]]:
+    """(status, path) for files added (+), removed (-) or changed (~) between two file maps."""
+    entries = []
+    for path in sorted(set(before) | set(after)):
+        if path not in before:
+            entries.append(('+', path))
+        elif path not in after:
+            entries.append(('-', path))
+        elif before[path]['hash'] != after[path]['hash']:
+            entries.append(('~', path))
+    return entries
+
+
+# =============================================================================
+# Configuration and Commands
+# =============================================================================
+
+def get_snapshot_store(config: dict) -> SnapshotStore:
+    """Snapshot store for the configured data directory (paths.snapshots_dir)."""
+    root = config.get('paths', {}).get('snapshots_dir', 'snapshots')
+    return SnapshotStore(Path(root), get_data_dir(config))
+
+
+def take_season_snapshot(config: dict, label: str) -> dict:
+    """Snapshot taken automatically at the start of each season; prunes to snapshots.keep."""
+    store = get_snapshot_store(config)
+    manifest = store.take(label, kind='season')
+    print(f"  ✓ Snapshot {manifest['id']} ({label}): {len(manifest['files'])} files, "
+          f"{manifest['changed']} changed, {_format_bytes(manifest['new_bytes'])} stored")
+    removed = store.prune(int(config.get('snapshots', {}).get('keep', 0) or 0))
+    if removed:
+        print(f"  ✓ Pruned {removed} old snapshot{'s' if removed > 1 else ''}")
+    return manifest
+
+
+def restore_latest_season(config: dict) -> Optional[dict]:
+    """Restore the most recent season-start snapshot (used to redo an interrupted season)."""
+    store = get_snapshot_store(config)
+    seasons = [m for m in store.manifests() if m['kind'] == 'season']
+    if not seasons:
+        return None
+    store.restore(seasons[-1])
+    print(f"Restored {store.data_dir} from snapshot {seasons[-1]['id']} ({seasons[-1]['label']})")
+    return seasons[-1]
+
+
+def _format_bytes(size: int) -> str:
+    return f"{size / 1024:.1f} KB" if size < 1024 * 1024 else f"{size / (1024 * 1024):.1f} MB"
+
+
+def list_snapshots(config: dict):
+    store = get_snapshot_store(config)
+    manifests = store.manifests()
+    print_section_header("SNAPSHOTS")
+    if not manifests:
+        print("No snapshots yet (one is taken at the start of every season).")
+        return
+    print(f"{'id':>4}  {'label':<28}{'created':<21}{'files':>6}{'changed':>9}{'stored':>11}")
+    for m in manifests:
+        print(f"{m['id']:>4}  {m['label']:<28}{m['created']:<21}{len(m['files']):>6}{m['changed']:>9}"
+              f"{_format_bytes(m['new_bytes']):>11}")
+
+
+def restore_snapshot(config: dict, ref: str):
+    store = get_snapshot_store(config)
+    manifest = store.find(ref)
+    if manifest is None:
+        print(f"Error: no snapshot '{ref}' (see: python diplomacy.py snapshot list)")
+        return
+    # Keep the current state too, so the restore can be undone
+    current = store.take(f"before restoring {manifest['id']}", kind='manual')
+    store.restore(manifest)
+    print(f"  ✓ Restored snapshot {manifest['id']} ({manifest['label']})")
+    print(f"    Previous state saved as snapshot {current['id']}")
+
+
+def diff_snapshots(config: dict, ref_a: str, ref_b: Optional[str] = None, full: bool = False):
+    """Show what changed between two snapshots (or a snapshot and the current files)."""
+    store = get_snapshot_store(config)
+    before = store.find(ref_a)
+    if before is None:
+        print(f"Error: no snapshot '{ref_a}'")
+        return
+    if ref_b:
+        after = store.find(ref_b)
+        if after is None:
+            print(f"Error: no snapshot '{ref_b}'")
+            return
+        after_files, after_name = after['files'], f"snapshot {after['id']}"
+    else:
+        latest = store.manifests()[-1]['files']
+        after_files, after_name = store.scan(latest)[0], "current files"
+
+    print_section_header(f"DIFF: snapshot {before['id']} ({before['label']}) → {after_name}")
+    entries = diff_files(before['files'], after_files)
+    if not entries:
+        print("No differences.")
+        return
+
+    def lines_of(entry: Optional[FileEntry]) -> List[str]:
+        if entry is None:
+            return []
+        lines = store.read_blob(entry['hash']).decode('utf-8', errors='replace').splitlines(keepends=True)
+        if lines and not lines[-1].endswith('\n'):
+            lines[-1] += '\n'
+        return lines
+
+    for status, path in entries:
+        old, new = lines_of(before['files'].get(path)), lines_of(after_files.get(path))
+        delta = list(difflib.unified_diff(old, new, f"a/{path}", f"b/{path}"))
+        added = sum(1 for line in delta if line.startswith('+') and not line.startswith('+++'))
+        removed = sum(1 for line in delta if line.startswith('-') and not line.startswith('---'))
+        print(f"  {status} {path} (+{added}/-{removed})")
+        if full and delta:
+            print(''.join(delta).rstrip())
+            print()
+
+
+def snapshot_command(args: List[str]):
+    """Entry point for `python diplomacy.py snapshot <list|take|restore|diff>`."""
+    config = load_config()
+    action = args[0] if args else 'list'
+    rest = [a for a in args[1:] if not a.startswith('--')]
+
+    if action == 'list':
+        list_snapshots(config)
+    elif action == 'take':
+        label = ' '.join(rest) or 'manual'
+        manifest = get_snapshot_store(config).take(label, kind='manual')
+        print(f"  ✓ Snapshot {manifest['id']} ({label}): {len(manifest['files'])} files, "
+              f"{manifest['changed']} changed")
+    elif action == 'restore' and rest:
+        restore_snapshot(config, rest[0])
+    elif action == 'diff' and rest:
+        diff_snapshots(config, rest[0], rest[1] if len(rest) > 1 else None, full='--full' in args)
+    else:
+        print("Usage: python diplomacy.py snapshot list")
+        print("       python diplomacy.py snapshot take [label]")
+        print("       python diplomacy.py snapshot restore <id|label|latest>")
+        print("       python diplomacy.py snapshot diff <id> [id] [--full]")
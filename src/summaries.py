@@ -0,0 +1,281 @@
+"""
+Season summaries for Diplomacy LLM (context.summaries).
+game_history.md and the conversation files only ever grow. With summaries
+enabled, the context shows each file's latest context.summaries.recent_seasons
+seasons verbatim and older seasons as short summaries written by the cheap
+model between seasons (at the start of every `season`, or with
+`python diplomacy.py summarize`).
+
+Summaries are hierarchical:
+- each season of a file ("## Spring 1901 ..." sections) gets its own summary
+- beyond max_season_summaries, the oldest seasons are folded one at a time
+  into a single rolling "earlier seasons" summary
+
+Summaries are stored next to the game data in paths.summaries_dir (one JSON
+file per source file) and keyed by the SHA-256 of the season text they
+summarize, so one is only recomputed when its season text changes. From the
+first season without a current summary on, the file is shown verbatim.
+"""
+
+import hashlib
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .utils import (
+    load_config,
+    is_fow,
+    get_all_countries,
+    get_current_season,
+    get_data_dir,
+    get_country_dir,
+    get_conversations_dir,
+    atomic_write_text,
+    estimate_tokens,
+)
+
+
+SEASON_HEADER_PATTERN = re.compile(r'^## ((?:Spring|Summer|Fall|Autumn|Winter) \d{4})\b.*$', re.MULTILINE)
+
+Chunk = Tuple[str, str, str]  # (season, text, sha256 of text)
+
+
+def get_summary_settings(config: dict) -> dict:
+    """context.summaries with defaults."""
+    settings = config.get('context', {}).get('summaries', {}) or {}
+    return {
+        'enabled': bool(settings.get('enabled', False)),
+        'recent_seasons': int(settings.get('recent_seasons', 2)),
+        'max_season_summaries': int(settings.get('max_season_summaries', 6)),
+        'max_words': int(settings.get('max_words', 150)),
+    }
+
+
+def split_seasons(text: str) -> Tuple[str, List[Chunk]]:
+    """Split a file into (text before the first season, season chunks in file order).
+
+    Consecutive sections of one season (e.g. "## Spring 1901" and
+    "## Spring 1901 Results") form one chunk.
+    """
+    matches = list(SEASON_HEADER_PATTERN.finditer(text))
+    if not matches:
+        return text, []
+
+    sections: List[Tuple[str, str]] = []
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        body = text[match.start():end]
+        if sections and sections[-1][0] == match.group(1):
+            sections[-1] = (match.group(1), sections[-1][1] + body)
+        else:
+            sections.append((match.group(1), body))
+    chunks = [(season, body, hashlib.sha256(body.encode('utf-8')).hexdigest()) for season, body in sections]
+    return text[:matches[0].start()], chunks
+
+
+def plan_chunks(chunks: List[Chunk], settings: dict, current_season: str) -> Tuple[List[Chunk], List[Chunk], List[Chunk]]:
+    """Divide chunks into (folded into the earlier summary, summarized one by one, verbatim).
+
+    The season in progress and the recent_seasons before it stay verbatim.
+    """
+    finished = list(chunks)
+    while finished and finished[-1][0] == current_season:
+        finished.pop()
+    recent = max(0, settings['recent_seasons'])
+    older = finished[:len(finished) - recent] if recent else finished
+    verbatim = chunks[len(older):]
+    keep = max(0, settings['max_season_summaries'])
+    fold = older[:len(older) - keep] if len(older) > keep else []
+    return fold, older[len(fold):], verbatim
+
+
+def _fold_key(chunks: List[Chunk]) -> List[str]:
+    return [digest for _, _, digest in chunks]
+
+
+def _season_range(first: str, last: str) -> str:
+    return first if first == last else f"{first} to {last}"
+
+
+def split_summarized(text: str, store: dict, settings: dict, current_season: str) -> Tuple[str, str]:
+    """Split a file into (its older seasons as stored summaries, the rest verbatim).
+
+    The summarized part stops at the first older season without a current
+    summary, so everything after it is shown as written.
+    """
+    head, chunks = split_seasons(text)
+    if not chunks:
+        return '', text
+    fold, separate, _ = plan_chunks(chunks, settings, current_season)
+    summaries = store.get('chunks', {})
+    earlier = store.get('earlier') or {}
+
+    parts = [head]
+    done = 0  # Chunks covered by a summary
+    folded = earlier.get('hashes') or []
+    if folded and _fold_key(fold)[:len(folded)] == folded:
+        # The rolling summary may lag a season behind; the seasons it misses are listed separately
+        done = len(folded)
+        seasons = _season_range(fold[0][0], fold[done - 1][0])
+        parts.append(f"## Earlier seasons: {seasons} (summary)\n{earlier['summary']}\n\n")
+    separate = fold[done:] + separate
+    for season, _, digest in separate:
+        if digest not in summaries:
+            break
+        parts.append(f"## {season} (summary)\n{summaries[digest]}\n\n")
+        done += 1
+    if not done:
+        return '', text
+    return ''.join(parts), ''.join(body for _, body, _ in chunks[done:])
+
+
+# =============================================================================
+# Storage
+# =============================================================================
+
+def get_summary_path(config: dict, source: Path) -> Path:
+    """Where a source file's summaries are kept (paths.summaries_dir mirrors data_dir)."""
+    data_dir = get_data_dir(config)
+    relative = Path(source).relative_to(data_dir).as_posix()
+    return data_dir / config['paths'].get('summaries_dir', '_summaries') / f"{relative}.json"
+
+
+def parse_store(text: Optional[str]) -> dict:
+    """A summary file's contents ({'chunks': {hash: summary}, 'earlier': {...}}); empty if unreadable."""
+    try:
+        store = json.loads(text) if text else {}
+    except ValueError:
+        store = {}
+    return store if isinstance(store, dict) else {}
+
+
+def summary_sources(config: dict) -> List[Path]:
+    """Files that get summaries: game history (per country in fog of war) and every conversation."""
+    name = config['paths']['game_history']
+    if is_fow(config):
+        sources = [get_country_dir(config, country) / name for country in get_all_countries(config)]
+    else:
+        sources = [get_data_dir(config) / name]
+    conversations_dir = get_conversations_dir(config)
+    if conversations_dir.exists():
+        sources.extend(sorted(conversations_dir.glob("*.md")))
+    return [source for source in sources if source.exists()]
+
+
+# =============================================================================
+# Summarizing
+# =============================================================================
+
+class Summarizer:
+    """Writes summaries with the cheap model, through the shared scheduler and telemetry."""
+
+    def __init__(self, config: dict):
+        from .llm import get_model
+        from .scheduler import get_scheduler
+
+        self.config = config
+        self.settings = get_summary_settings(config)
+        self.model_name = config.get('cheap_model', config['model'])
+        self.model = get_model(self.model_name, config)
+        self.scheduler = get_scheduler(config)
+        self.season = get_current_season(config)
+
+    def summarize(self, kind: str, seasons: str, text: str) -> str:
+        """One LLM call: summarize `text` (covering `seasons`) of a game history or conversation."""
+        from .mode_loader import ModeLoader
+        from .telemetry import finish_call, track_call
+
+        prompt = ModeLoader(self.config).get_prompt("summarize", {
+            "kind": kind,
+            "seasons": seasons,
+            "max_words": self.settings['max_words'],
+            "text": text.strip(),
+        })
+        chat = self.model.start_chat(history=[])
+        with track_call(self.config, None, 'summarize', self.season, self.model_name, prompt) as call:
+            summary = self.scheduler.call(self.model_name, lambda: chat.send_message(prompt).text,
+                                          call['prompt_tokens'], f"Summary of {kind}, {seasons}", call)
+            call['response_tokens'] = estimate_tokens(summary)
+        self.scheduler.charge(self.model_name, call['response_tokens'])
+        finish_call(self.config, call)
+        return summary.strip()
+
+    def update(self, source: Path) -> Tuple[int, int]:
+        """Bring one source file's summaries up to date. Returns (summaries written, reused)."""
+        kind = "game history"
+        if source.parent == get_conversations_dir(self.config):
+            kind = f"conversation between {', '.join(source.stem.split('-'))}"
+
+        path = get_summary_path(self.config, source)
+        store = parse_store(path.read_text() if path.exists() else None)
+        old_chunks = store.get('chunks', {})
+        _, chunks = split_seasons(source.read_text(encoding='utf-8'))
+        fold, separate, _ = plan_chunks(chunks, self.settings, self.season)
+
+        # Level 1: every older season (folded ones too, the fold is built from them)
+        summaries: Dict[str, str] = {}
+        written = reused = 0
+        for season, body, digest in fold + separate:
+            if digest in old_chunks:
+                reused += 1
+            else:
+                old_chunks[digest] = self.summarize(kind, season, body)
+                written += 1
+            summaries[digest] = old_chunks[digest]
+
+        # Level 2: roll the oldest seasons into one summary, continuing the stored one if it still applies
+        earlier = store.get('earlier') or {}
+        hashes = _fold_key(fold)
+        if not fold:
+            earlier = {}
+        elif earlier.get('hashes') != hashes:
+            done = earlier.get('hashes') or []
+            if not done or done != hashes[:len(done)]:
+                done, text = hashes[:1], summaries[hashes[0]]
+            else:
+                text = earlier['summary']
+            for season, _, digest in fold[len(done):]:
+                text = self.summarize(kind, _season_range(fold[0][0], season),
+                                      f"## Earlier seasons\n{text}\n\n## {season}\n{summaries[digest]}")
+                written += 1
+            earlier = {'hashes': hashes, 'summary': text}
+
+        new_store = {'source': source.name, 'chunks': summaries, 'earlier': earlier}
+        if new_store != store:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write_text(path, json.dumps(new_store, indent=2) + '\n')
+        return written, reused
+
+
+def update_summaries(config: dict = None):
+    """Summarize the older seasons of every history and conversation file that changed.
+
+    Files are summarized concurrently (concurrency.max_in_flight workers); the
+    scheduler keeps the calls within the cheap model's rate limits.
+    """
+    if config is None:
+        config = load_config()
+    if not get_summary_settings(config)['enabled']:
+        print("Summaries are off (context.summaries.enabled in config.yaml)")
+        return
+
+    summarizer = Summarizer(config)
+    sources = summary_sources(config)
+
+    def update(source: Path) -> Tuple[int, int]:
+        # A failed file keeps its old summaries (or its verbatim text); the season goes on
+        try:
+            return summarizer.update(source)
+        except Exception as e:
+            print(f"  ! Could not summarize {source.name}: {e}")
+            return 0, 0
+
+    workers = max(1, config.get('concurrency', {}).get('max_in_flight', 4))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(update, sources))
+
+    written = sum(w for w, _ in results)
+    reused = sum(r for _, r in results)
+    print(f"  ✓ Summaries: {written} written, {reused} unchanged ({len(sources)} files)")
@@ -0,0 +1,297 @@
+"""
+Per-call telemetry for Diplomacy LLM.
+Every LLM call made by an agent or the overseer becomes one JSON line in
+paths.telemetry: country, phase, season, model, prompt size, response
+tokens, latency, retries and how the response parsed.
+
+Events are handed to a background writer thread, so logging never blocks a
+turn: the caller only puts a dict on a queue. The writer batches lines and
+appends them every telemetry.flush_seconds (and on exit).
+`python diplomacy.py stats` summarizes the log per phase and season.
+
+Token counts are estimates (see utils.estimate_tokens), the same numbers
+the scheduler budgets with.
+"""
+
+import atexit
+import json
+import queue
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from .timing import percentile
+from .utils import estimate_tokens, load_config, print_section_header
+
+
+_STOP = object()
+
+
+class TelemetryLog:
+    """Append-only JSONL log written by a background thread."""
+
+    def __init__(self, path: Path, flush_seconds: float = 1.0):
+        self.path = Path(path)
+        self.flush_seconds = flush_seconds
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="telemetry-writer", daemon=True)
+        self._thread.start()
+
+    def emit(self, event: dict):
+        """Queue an event (the dict must not be changed afterwards)."""
+        self._queue.put(event)
+
+    def flush(self, timeout: float = 5.0):
+        """Block until everything emitted so far is on disk."""
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(5.0)
+
+    def _write(self, lines: List[str]):
+        if not lines:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(''.join(lines))
+        except OSError as e:
+            print(f"  ! Telemetry write failed ({self.path}): {e}")
+        lines.clear()
+
+    def _run(self):
+        lines: List[str] = []
+        deadline = time.monotonic() + self.flush_seconds
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+            if isinstance(item, dict):
+                lines.append(json.dumps(item) + '\n')
+                if time.monotonic() < deadline:
+                    continue
+            self._write(lines)
+            deadline = time.monotonic() + self.flush_seconds
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is _STOP:
+                return
+
+
+_logs_lock = threading.Lock()
+_logs: Dict[Path, TelemetryLog] = {}
+
+
+def get_telemetry_path(config: dict) -> Path:
+    """Telemetry log (paths.telemetry, relative to the game directory)."""
+    return Path(config.get('paths', {}).get('telemetry', 'telemetry.jsonl'))
+
+
+def get_telemetry(config: dict) -> Optional[TelemetryLog]:
+    """Process-wide log for the configured path, or None when telemetry is off."""
+    settings = config.get('telemetry', {}) or {}
+    if not settings.get('enabled', True):
+        return None
+    path = get_telemetry_path(config).resolve()
+    with _logs_lock:
+        log = _logs.get(path)
+        if log is None:
+            log = TelemetryLog(path, float(settings.get('flush_seconds', 1.0)))
+            _logs[path] = log
+        return log
+
+
+def flush_telemetry():
+    """Write out every queued event (e.g. before a batch worker moves on)."""
+    with _logs_lock:
+        logs = list(_logs.values())
+    for log in logs:
+        log.flush()
+
+
+@atexit.register
+def _close_logs():
+    with _logs_lock:
+        logs = list(_logs.values())
+    for log in logs:
+        log.close()
+
+
+# =============================================================================
+# Call Events
+# =============================================================================
+
+@contextmanager
+def track_call(config: dict, country: Optional[str], phase: str, season: str, model: str,
+               prompt: str, streamed: bool = False, cached_prefix: str = '',
+               history_tokens: int = 0) -> Iterator[dict]:
+    """Time one LLM call and yield its event.
+
+    Pass the event to the scheduler as info= (it fills in retries and
+    throttle time). A failed call is logged right away; a successful one is
+    logged by finish_call once the response has been parsed. Prompt sizes
+    include a cached prefix (cached_tokens) and, for a continued chat, the
+    earlier turns resent with it (history_tokens).
+    """
+    event = {
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'season': season,
+        'country': country,
+        'phase': phase,
+        'model': model,
+        'prompt_chars': len(cached_prefix) + len(prompt),
+        'prompt_tokens': estimate_tokens(cached_prefix) + history_tokens + estimate_tokens(prompt),
+        'cached_tokens': estimate_tokens(cached_prefix),
+        'history_tokens': history_tokens,
+        'response_tokens': 0,
+        'latency': 0.0,
+        'retries': 0,
+        'throttle_seconds': 0.0,
+        'streamed': streamed,
+    }
+    start = time.perf_counter()
+    try:
+        yield event
+    except Exception as e:
+        event['latency'] = round(time.perf_counter() - start, 3)
+        finish_call(config, event, error=e)
+        raise
+    event['latency'] = round(time.perf_counter() - start, 3)
+
+
+def finish_call(config: dict, event: dict, issues: Optional[List[str]] = None, error: Exception = None):
+    """Record the parse outcome and log the event.
+
+    outcome: ok, issues (malformed or rejected tags), unparsed (free-text
+    answers such as queries) or error (the call itself failed).
+    """
+    if error is not None:
+        event['outcome'] = 'error'
+        event['error'] = f"{type(error).__name__}: {error}"[:300]
+    elif issues is None:
+        event['outcome'] = 'unparsed'
+    else:
+        event['outcome'] = 'issues' if issues else 'ok'
+        event['issues'] = len(issues)
+    log = get_telemetry(config)
+    if log is not None:
+        log.emit(event)
+
+
+# =============================================================================
+# Stats
+# =============================================================================
+
+def read_events(path: Path) -> List[dict]:
+    """All events in a telemetry log (a torn last line is skipped)."""
+    if not path.exists():
+        return []
+    events = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                events.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return events
+
+
+def _cost(event: dict, prices: dict) -> float:
+    """Dollar cost from telemetry.prices (per million input/cached_input/output tokens)."""
+    price = prices.get(event.get('model')) or prices.get('default') or {}
+    cached = event.get('cached_tokens', 0)
+    return ((event.get('prompt_tokens', 0) - cached) * price.get('input', 0)
+            + cached * price.get('cached_input', price.get('input', 0))
+            + event.get('response_tokens', 0) * price.get('output', 0)) / 1_000_000
+
+
+def _season_key(season: str):
+    """Sort seasons chronologically (Spring < Fall < Winter within a year)."""
+    parts = (season or '').split()
+    order = {'spring': 0, 'fall': 1, 'autumn': 1, 'winter': 2}
+    if len(parts) == 2 and parts[1].isdigit():
+        return (int(parts[1]), order.get(parts[0].lower(), 3), season)
+    return (9999, 9, season or '')
+
+
+def summarize(events: List[dict], key: str, prices: dict) -> List[dict]:
+    """Per-group totals and latency percentiles, groups in a stable order."""
+    groups: Dict[str, List[dict]] = defaultdict(list)
+    for event in events:
+        groups[event.get(key) or '-'].append(event)
+
+    names = sorted(groups, key=_season_key) if key == 'season' else sorted(groups)
+    rows = []
+    for name in names:
+        group = groups[name]
+        latencies = [e.get('latency', 0.0) for e in group]
+        rows.append({
+            'name': name,
+            'calls': len(group),
+            'errors': sum(1 for e in group if e.get('outcome') == 'error'),
+            'issues': sum(1 for e in group if e.get('outcome') == 'issues'),
+            'retries': sum(e.get('retries', 0) for e in group),
+            'prompt_tokens': sum(e.get('prompt_tokens', 0) for e in group),
+            'cached_tokens': sum(e.get('cached_tokens', 0) for e in group),
+            'response_tokens': sum(e.get('response_tokens', 0) for e in group),
+            'cost': sum(_cost(e, prices) for e in group),
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'seconds': sum(latencies),
+        })
+    return rows
+
+
+def print_stats(args: List[str] = None):
+    """`python diplomacy.py stats [--by phase|season|country|model] [--season S]`."""
+    args = args or []
+    config = load_config()
+    path = get_telemetry_path(config)
+    events = read_events(path)
+
+    if '--season' in args and args.index('--season') + 1 < len(args):
+        season = args[args.index('--season') + 1]
+        events = [e for e in events if (e.get('season') or '').lower() == season.lower()]
+    if not events:
+        print(f"No telemetry in {path} yet (one event is logged per LLM call).")
+        return
+
+    groupings = ['phase', 'season']
+    if '--by' in args and args.index('--by') + 1 < len(args):
+        groupings = [args[args.index('--by') + 1]]
+
+    prices = (config.get('telemetry', {}) or {}).get('prices') or {}
+    for key in groupings:
+        rows = summarize(events, key, prices)
+        print_section_header(f"LLM CALLS BY {key.upper()}")
+        header = f"{key:<16}{'calls':>6}{'errors':>7}{'issues':>7}{'retries':>8}{'in tok':>10}{'cached':>9}{'out tok':>9}"
+        header += f"{'p50 s':>8}{'p95 s':>8}{'total s':>9}"
+        if prices:
+            header += f"{'cost $':>9}"
+        print(header)
+        for row in rows:
+            line = (f"{str(row['name'])[:15]:<16}{row['calls']:>6}{row['errors']:>7}{row['issues']:>7}"
+                    f"{row['retries']:>8}{row['prompt_tokens']:>10}{row['cached_tokens']:>9}{row['response_tokens']:>9}"
+                    f"{row['p50']:>8.2f}{row['p95']:>8.2f}{row['seconds']:>9.1f}")
+            if prices:
+                line += f"{row['cost']:>9.3f}"
+            print(line)
+        print()
+
+    total = summarize(events, 'model', prices)
+    calls = sum(row['calls'] for row in total)
+    tokens_in = sum(row['prompt_tokens'] for row in total)
+    tokens_cached = sum(row['cached_tokens'] for row in total)
+    tokens_out = sum(row['response_tokens'] for row in total)
+    summary = f"Total: {calls} calls, {tokens_in} input ({tokens_cached} cached) / {tokens_out} output tokens (estimated)"
+    if prices:
+        summary += f", ${sum(row['cost'] for row in total):.2f}"
+    print(summary)
@@ -0,0 +1,69 @@
+"""
+Lightweight phase timing for Diplomacy LLM.
+Agents wrap their phases (context building, prompt rendering, LLM call,
+parsing, file I/O) in timed(); samples are only kept while recording is
+enabled, e.g. during `python diplomacy.py bench`.
+"""
+
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+
+_lock = threading.Lock()
+_enabled = False
+_samples: Dict[str, List[float]] = defaultdict(list)
+
+
+def enable(reset: bool = True):
+    """Start recording samples (clears previous samples by default)."""
+    global _enabled
+    with _lock:
+        if reset:
+            _samples.clear()
+        _enabled = True
+
+
+def disable():
+    """Stop recording samples."""
+    global _enabled
+    with _lock:
+        _enabled = False
+
+
+def record(name: str, value: float):
+    """Record a sample (seconds for timings, raw numbers for sizes)."""
+    if not _enabled:
+        return
+    with _lock:
+        _samples[name].append(value)
+
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    """Record how long the block takes under name (no-op when disabled)."""
+    if not _enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def snapshot() -> Dict[str, List[float]]:
+    """Return a copy of all recorded samples."""
+    with _lock:
+        return {name: list(values) for name, values in _samples.items()}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of values (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
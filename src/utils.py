@@ -3,10 +3,16 @@ Shared utility functions for Diplomacy LLM.
 Centralizes common patterns used across modules.
 """
 
+import io
+import os
+import sys
+import threading
 import traceback
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, List
-import yaml
+from typing import Iterator, Optional, List, Tuple
+
+from .config import Config, ConfigError, load_config, reload_config  # noqa: F401 (re-exported)
 
 
 # =============================================================================
@@ -19,15 +25,9 @@ MIN_FILE_SIZE = 100
 
 
 # =============================================================================
-# Configuration
+# Configuration (loading and validation live in config.py)
 # =============================================================================
 
-def load_config(config_path: str = "config.yaml") -> dict:
-    """Load and return the game configuration."""
-    with open(config_path, 'r') as f:
-        return yaml.safe_load(f)
-
-
 def is_fow(config: dict) -> bool:
     """Check if fog of war mode is enabled."""
     return config.get('features', {}).get('fog_of_war', False)
@@ -70,7 +70,7 @@ def get_current_season(config: dict) -> str:
 
 def get_all_countries(config: dict) -> List[str]:
     """Get list of all countries from config."""
-    return config.get('countries', [])
+    return list(config.get('countries', []))
 
 
 def find_country(name: str, countries: List[str]) -> Optional[str]:
@@ -97,6 +97,64 @@ def print_divider():
     print("-" * DIVIDER_WIDTH)
 
 
+# =============================================================================
+# Console Output Buffering
+# =============================================================================
+
+class _ThreadLocalStream:
+    """Stream proxy that sends writes to a per-thread buffer when one is set.
+
+    Installed over sys.stdout/sys.stderr so concurrent phases can capture their
+    own output without interleaving with other threads.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+
+    def _target(self):
+        return getattr(self._local, 'buffer', None) or self._stream
+
+    def write(self, text: str) -> int:
+        return self._target().write(text)
+
+    def flush(self):
+        self._target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+_proxy_lock = threading.Lock()
+
+
+def _install_stream_proxies():
+    """Wrap sys.stdout and sys.stderr in thread-local proxies (idempotent)."""
+    with _proxy_lock:
+        if not isinstance(sys.stdout, _ThreadLocalStream):
+            sys.stdout = _ThreadLocalStream(sys.stdout)
+        if not isinstance(sys.stderr, _ThreadLocalStream):
+            sys.stderr = _ThreadLocalStream(sys.stderr)
+
+
+@contextmanager
+def buffered_output() -> Iterator[io.StringIO]:
+    """Capture everything the current thread prints (stdout and stderr).
+
+    Other threads keep printing normally. The caller decides when to replay
+    the captured text, e.g. in turn order once a country finishes.
+    """
+    _install_stream_proxies()
+    buffer = io.StringIO()
+    sys.stdout._local.buffer = buffer
+    sys.stderr._local.buffer = buffer
+    try:
+        yield buffer
+    finally:
+        sys.stdout._local.buffer = None
+        sys.stderr._local.buffer = None
+
+
 # =============================================================================
 # Mode Helpers
 # =============================================================================
@@ -130,6 +188,127 @@ def get_country_dir(config: dict, country: str) -> Path:
     return get_data_dir(config) / country
 
 
+def get_game_state_path(config: dict, country: str) -> Path:
+    """Game state as seen by a country. FoW uses per-country files; classic/gunboat use shared."""
+    if is_fow(config):
+        return get_country_dir(config, country) / config['paths']['game_state']
+    return get_data_dir(config) / config['paths']['game_state']
+
+
+# =============================================================================
+# Token Estimation
+# =============================================================================
+
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Fast local token estimate (~4 characters per token for English prose)."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def trim_to_tokens(text: str, budget: int, keep: str = "tail") -> Tuple[str, int]:
+    """Trim text by whole lines to fit an estimated token budget.
+
+    keep="tail" keeps the most recent (last) lines, keep="head" the first ones.
+    A marker line notes how many lines were dropped. Returns (text, tokens trimmed).
+    """
+    original = estimate_tokens(text)
+    if original <= budget:
+        return text, 0
+
+    lines = text.split('\n')
+    marker_cost = estimate_tokens("[... 0000 earlier lines trimmed to fit the token budget ...]") + 1
+    ordered = lines if keep == "head" else list(reversed(lines))
+    kept = []
+    used = 0
+    for line in ordered:
+        cost = estimate_tokens(line) + 1  # +1 for the newline
+        if used + cost > budget - marker_cost:
+            break
+        kept.append(line)
+        used += cost
+
+    dropped = len(lines) - len(kept)
+    noun = "line" if dropped == 1 else "lines"
+    if keep == "head":
+        result = '\n'.join(kept + [f"[... {dropped} later {noun} trimmed to fit the token budget ...]"])
+    else:
+        result = '\n'.join([f"[... {dropped} earlier {noun} trimmed to fit the token budget ...]"] + list(reversed(kept)))
+    return result, original - estimate_tokens(result)
+
+
+# =============================================================================
+# File Helpers
+# =============================================================================
+
+TAIL_BLOCK_SIZE = 8192
+
+
+def read_tail_lines(path: Path, count: int, block_size: int = TAIL_BLOCK_SIZE) -> Tuple[List[str], bool]:
+    """Return the last `count` lines of a file without reading the whole file.
+
+    Reads fixed-size blocks backwards from the end until enough newlines are
+    found. The result matches content.split('\n')[-count:] (so a trailing
+    newline gives a final empty line). The flag is True if earlier lines were
+    dropped.
+    """
+    with open(path, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END)
+        chunks = []
+        newlines = 0
+        while pos > 0 and newlines < count:
+            size = min(block_size, pos)
+            pos -= size
+            f.seek(pos)
+            chunk = f.read(size)
+            chunks.append(chunk)
+            newlines += chunk.count(b'\n')
+
+    lines = b''.join(reversed(chunks)).split(b'\n')
+    truncated = pos > 0 or len(lines) > count
+    # Splitting on b'\n' is safe for UTF-8: the byte never occurs inside a multi-byte character
+    return [line.decode('utf-8') for line in lines[-count:]], truncated
+
+
+def append_line(path: Path, content: str):
+    """Append content plus a newline to a file, creating it if needed.
+
+    Only the last byte of the existing file is read (to add a separating
+    newline if it doesn't end with one), so appends cost O(len(content))
+    regardless of the file's size.
+    """
+    with open(path, 'ab+') as f:
+        size = f.seek(0, os.SEEK_END)
+        prefix = b''
+        if size:
+            f.seek(size - 1)
+            if f.read(1) != b'\n':
+                prefix = b'\n'
+        # Writes in append mode always go to the end, whatever the read position
+        f.write(prefix + content.encode('utf-8') + b'\n')
+
+
+def atomic_write_text(path: Path, content: str):
+    """Replace a file's contents atomically (temp file in the same directory + rename).
+
+    A crash mid-write leaves either the old file or the new one, never a
+    truncated file. The temp name doesn't end in .md so it is never picked
+    up as a country file.
+    """
+    # Unique per process and thread; opened with 'x' so the file honours the umask
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, 'x', encoding='utf-8') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
 # =============================================================================
 # Error Handling
 # =============================================================================
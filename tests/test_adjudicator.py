@@ -0,0 +1,122 @@
+"""
+DATC regression cases for the movement adjudicator (src/adjudicator.py).
+Numbers refer to the Diplomacy Adjudicator Test Cases by Lucas Kruijswijk.
+Each case lists the units, each country's orders.md text, the units after
+the phase and the dislodged units ("Country T Loc").
+"""
+
+import pytest
+
+from src.adjudicator import resolve_movement
+from src.board import BoardState, LOCATION_PROVINCE, Unit, parse_location
+
+
+CASES = {
+    '6.C.1 three army circular movement': (
+        {'Turkey': ['F Ank', 'A Con', 'A Smy']},
+        {'Turkey': ['F Ank - Con', 'A Con - Smy', 'A Smy - Ank']},
+        ['Turkey F Con', 'Turkey A Smy', 'Turkey A Ank'],
+        [],
+    ),
+    '6.C.3 disrupted circular movement': (
+        {'Turkey': ['F Ank', 'A Con', 'A Smy', 'A Bul']},
+        {'Turkey': ['F Ank - Con', 'A Con - Smy', 'A Smy - Ank', 'A Bul - Con']},
+        ['Turkey F Ank', 'Turkey A Con', 'Turkey A Smy', 'Turkey A Bul'],
+        [],
+    ),
+    '6.C.4 circular movement with attacked convoy': (
+        {'Austria': ['A Tri', 'A Ser'], 'Turkey': ['A Bul', 'F Aeg', 'F Ion', 'F Adr'], 'Italy': ['F Nap']},
+        {'Austria': ['A Tri - Ser', 'A Ser - Bul'],
+         'Turkey': ['A Bul - Tri', 'F Aeg C A Bul - Tri', 'F Ion C A Bul - Tri', 'F Adr C A Bul - Tri'],
+         'Italy': ['F Nap - Ion']},
+        ['Austria A Ser', 'Austria A Bul', 'Turkey A Tri', 'Turkey F Aeg', 'Turkey F Ion', 'Turkey F Adr',
+         'Italy F Nap'],
+        [],
+    ),
+    '6.C.5 disrupted circular movement due to dislodged convoy': (
+        {'Austria': ['A Tri', 'A Ser'], 'Turkey': ['A Bul', 'F Aeg', 'F Ion', 'F Adr'],
+         'Italy': ['F Nap', 'F Tun']},
+        {'Austria': ['A Tri - Ser', 'A Ser - Bul'],
+         'Turkey': ['A Bul - Tri', 'F Aeg C A Bul - Tri', 'F Ion C A Bul - Tri', 'F Adr C A Bul - Tri'],
+         'Italy': ['F Nap - Ion', 'F Tun S F Nap - Ion']},
+        ['Austria A Tri', 'Austria A Ser', 'Turkey A Bul', 'Turkey F Aeg', 'Turkey F Adr',
+         'Italy F Ion', 'Italy F Tun'],
+        ['Turkey F Ion'],
+    ),
+    '6.C.6 two armies with two convoys': (
+        {'England': ['F Nth', 'A Lon'], 'France': ['F Eng', 'A Bel']},
+        {'England': ['F Nth C A Lon - Bel', 'A Lon - Bel'], 'France': ['F Eng C A Bel - Lon', 'A Bel - Lon']},
+        ['England F Nth', 'England A Bel', 'France F Eng', 'France A Lon'],
+        [],
+    ),
+    '6.D.10 self dislodgment prohibited': (
+        {'Germany': ['A Ber', 'F Kie', 'A Mun']},
+        {'Germany': ['A Ber Hold', 'F Kie - Ber', 'A Mun S F Kie - Ber']},
+        ['Germany A Ber', 'Germany F Kie', 'Germany A Mun'],
+        [],
+    ),
+    "6.E.1 dislodged unit has no effect on attacker's area": (
+        {'Germany': ['A Ber', 'F Kie', 'A Sil'], 'Russia': ['A Pru']},
+        {'Germany': ['A Ber - Pru', 'F Kie - Ber', 'A Sil S A Ber - Pru'], 'Russia': ['A Pru - Ber']},
+        ['Germany A Pru', 'Germany F Ber', 'Germany A Sil'],
+        ['Russia A Pru'],
+    ),
+    '6.F.14 simple convoy paradox': (
+        {'England': ['F Lon', 'F Wal'], 'France': ['A Bre', 'F Eng']},
+        {'England': ['F Lon S F Wal - Eng', 'F Wal - Eng'], 'France': ['A Bre - Lon', 'F Eng C A Bre - Lon']},
+        ['England F Lon', 'England F Eng', 'France A Bre'],
+        ['France F Eng'],
+    ),
+    "6.F.16 pandin's paradox": (
+        {'England': ['F Lon', 'F Wal'], 'France': ['A Bre', 'F Eng'], 'Germany': ['F Nth', 'F Bel']},
+        {'England': ['F Lon S F Wal - Eng', 'F Wal - Eng'], 'France': ['A Bre - Lon', 'F Eng C A Bre - Lon'],
+         'Germany': ['F Nth S F Bel - Eng', 'F Bel - Eng']},
+        ['England F Lon', 'England F Wal', 'France A Bre', 'France F Eng', 'Germany F Nth', 'Germany F Bel'],
+        [],
+    ),
+    "6.F.17 pandin's extended paradox": (
+        {'England': ['F Lon', 'F Wal'], 'France': ['A Bre', 'F Eng', 'F Yor'], 'Germany': ['F Nth', 'F Bel']},
+        {'England': ['F Lon S F Wal - Eng', 'F Wal - Eng'],
+         'France': ['A Bre - Lon', 'F Eng C A Bre - Lon', 'F Yor S A Bre - Lon'],
+         'Germany': ['F Nth S F Bel - Eng', 'F Bel - Eng']},
+        ['England F Lon', 'England F Wal', 'France A Bre', 'France F Eng', 'France F Yor',
+         'Germany F Nth', 'Germany F Bel'],
+        [],
+    ),
+    '6.F.18 betrayal paradox': (
+        {'England': ['F Nth', 'A Lon', 'F Eng'], 'France': ['F Bel'], 'Germany': ['F Hel', 'F Ska']},
+        {'England': ['F Nth C A Lon - Bel', 'A Lon - Bel', 'F Eng S A Lon - Bel'], 'France': ['F Bel S F Nth'],
+         'Germany': ['F Hel S F Ska - Nth', 'F Ska - Nth']},
+        ['England F Nth', 'England A Lon', 'England F Eng', 'France F Bel', 'Germany F Hel', 'Germany F Ska'],
+        [],
+    ),
+    '6.G.1 two units can swap places by convoy': (
+        {'England': ['A Nwy', 'F Ska'], 'Russia': ['A Swe']},
+        {'England': ['A Nwy - Swe', 'F Ska C A Nwy - Swe'], 'Russia': ['A Swe - Nwy']},
+        ['England A Swe', 'England F Ska', 'Russia A Nwy'],
+        [],
+    ),
+    '6.G.1 written via convoy': (
+        {'England': ['A Nwy', 'F Ska'], 'Russia': ['A Swe']},
+        {'England': ['A Nwy - Swe via convoy', 'F Ska C A Nwy - Swe'], 'Russia': ['A Swe - Nwy']},
+        ['England A Swe', 'England F Ska', 'Russia A Nwy'],
+        [],
+    ),
+}
+
+
+def board(units):
+    state = BoardState(season="Spring 1901")
+    for country, names in units.items():
+        for name in names:
+            unit_type, location = name.split()
+            loc = parse_location(location)
+            state.units[LOCATION_PROVINCE[loc]] = Unit(country, unit_type, loc)
+    return state
+
+
+@pytest.mark.parametrize('units, orders, expected, dislodged', CASES.values(), ids=list(CASES))
+def test_movement(units, orders, expected, dislodged):
+    _, after = resolve_movement(board(units), {country: '\n'.join(lines) for country, lines in orders.items()})
+    assert sorted(f"{unit.country} {unit}" for unit in after.units.values()) == sorted(expected)
+    assert sorted(f"{unit.country} {unit}" for unit, _ in after.dislodged.values()) == sorted(dislodged)